@@ -0,0 +1,81 @@
+import hashlib
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import json_codec
+from atomic_write import atomic_write_path
+from card_walker import PROFILE_CARD_SELECTORS
+from profile_extract import url_pattern
+
+AGENT_TRACE_FILENAME_SUFFIX = ".json"
+FINGERPRINT_MAX_DEPTH = 6
+FINGERPRINT_MAX_CHILDREN = 20
+
+# Describes the first profile card by tag, data-testid and role only.
+# Class names are left out because the app ships hashed CSS-module names
+# that change between deploys without changing the layout.
+RESULTS_PAGE_SKELETON_SCRIPT = """
+([selectors, maxDepth, maxChildren]) => {
+  const describe = (node, depth) => {
+    let label = node.tagName.toLowerCase();
+    const testId = node.getAttribute("data-testid");
+    if (testId) label += "#" + testId;
+    const role = node.getAttribute("role");
+    if (role) label += "@" + role;
+    if (depth >= maxDepth) return label;
+    const children = Array.from(node.children)
+      .slice(0, maxChildren)
+      .map((child) => describe(child, depth + 1))
+      .join(",");
+    return children ? label + "(" + children + ")" : label;
+  };
+  for (const selector of selectors) {
+    const cards = document.querySelectorAll(selector);
+    if (cards.length > 0) {
+      return { selector, cardCount: cards.length, card: describe(cards[0], 0) };
+    }
+  }
+  return { selector: null, cardCount: 0, card: describe(document.body, maxDepth - 2) };
+}
+"""
+
+
+async def results_page_fingerprint(page) -> str:
+    skeleton = await page.evaluate(
+        RESULTS_PAGE_SKELETON_SCRIPT,
+        [list(PROFILE_CARD_SELECTORS), FINGERPRINT_MAX_DEPTH, FINGERPRINT_MAX_CHILDREN],
+    )
+    fingerprint_source = {
+        "path": url_pattern(urlsplit(page.url).path),
+        "skeleton": skeleton,
+    }
+    return hashlib.sha256(json_codec.dumps_bytes(fingerprint_source)).hexdigest()[:32]
+
+
+class AgentTraceCache:
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+
+    def trace_path(self, fingerprint: str) -> Path:
+        return self.cache_dir / f"{fingerprint}{AGENT_TRACE_FILENAME_SUFFIX}"
+
+    def lookup(self, fingerprint: str) -> Path | None:
+        path = self.trace_path(fingerprint)
+        return path if path.is_file() else None
+
+    def store(
+        self,
+        fingerprint: str,
+        history: Any,
+        sensitive_data: dict[str, str] | None = None,
+    ) -> Path:
+        # Write next to the final path and rename, so a concurrent job never
+        # loads a half-written trace.
+        path = self.trace_path(fingerprint)
+        with atomic_write_path(path) as partial_path:
+            history.save_to_file(partial_path, sensitive_data=sensitive_data)
+        return path
+
+    def discard(self, fingerprint: str) -> None:
+        self.trace_path(fingerprint).unlink(missing_ok=True)
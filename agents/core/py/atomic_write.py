@@ -0,0 +1,23 @@
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def atomic_write_path(path: Path) -> Iterator[Path]:
+    # Yields a sibling path to write; it is renamed over `path` only once the
+    # block finishes, so a reader or a crash never sees a half-written file.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = path.with_name(f".{path.name}.{os.getpid()}.partial")
+    try:
+        yield partial_path
+        os.replace(partial_path, path)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+
+
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    with atomic_write_path(path) as partial_path:
+        partial_path.write_bytes(data)
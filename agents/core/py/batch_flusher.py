@@ -0,0 +1,75 @@
+import asyncio
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+BatchItem = TypeVar("BatchItem")
+
+
+class BatchFlusher(Generic[BatchItem]):
+    # Buffers items and hands them to write_batch once batch_size are
+    # waiting, or flush_interval_ms after the first one. A batch leaves the
+    # buffer only after write_batch returns. A timer flush has no caller to
+    # raise to, so the first write error is kept and re-raised from the next
+    # add(), flush() or close() instead of being lost in the event loop.
+    def __init__(
+        self,
+        write_batch: Callable[[list[BatchItem]], None],
+        *,
+        name: str,
+        batch_size: int,
+        flush_interval_ms: float,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_ms / 1000
+        self._write_batch = write_batch
+        self._pending: list[BatchItem] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._error: BaseException | None = None
+
+    def add(self, item: BatchItem) -> None:
+        self.raise_if_failed()
+        self._pending.append(item)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()
+                return
+            self._flush_handle = loop.call_later(
+                self.flush_interval_seconds, self._flush_from_timer
+            )
+
+    def flush(self) -> None:
+        self._cancel_timer()
+        self.raise_if_failed()
+        if not self._pending:
+            return
+        batch = list(self._pending)
+        try:
+            self._write_batch(batch)
+        except Exception as error:
+            self._error = error
+            self.raise_if_failed()
+        del self._pending[: len(batch)]
+
+    def raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"{self.name} write failed") from self._error
+
+    def _flush_from_timer(self) -> None:
+        self._flush_handle = None
+        try:
+            self.flush()
+        except Exception:
+            # Kept in self._error by flush(); surfaces on the next call.
+            pass
+
+    def _cancel_timer(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
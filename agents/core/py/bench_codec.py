@@ -0,0 +1,96 @@
+import argparse
+import base64
+import io
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+import json_codec
+from bench_extract import load_records, synthetic_records
+from cdp_capture import decode_response_body
+from profile_extract import find_profile_payloads
+from scraper_output import USER_PAYLOAD_PREFIX
+
+USER_PAYLOAD_PREFIX_BYTES = USER_PAYLOAD_PREFIX.encode("ascii")
+
+
+# Baseline: base64 -> bytes -> str -> json.loads, then one ASCII-escaped
+# json.dumps per candidate, as the capture and emit path did before.
+def str_decode_path(result: dict[str, Any], output: io.StringIO) -> None:
+    body = result["body"]
+    text = base64.b64decode(body).decode("utf-8") if result["base64Encoded"] else body
+    for payload in find_profile_payloads(json.loads(text)):
+        output.write(f"{USER_PAYLOAD_PREFIX}{json.dumps(payload, ensure_ascii=True)}\n")
+
+
+def codec_path(result: dict[str, Any], output: io.BytesIO) -> None:
+    for payload in find_profile_payloads(json_codec.loads(decode_response_body(result))):
+        output.write(USER_PAYLOAD_PREFIX_BYTES + json_codec.dumps_bytes(payload) + b"\n")
+
+
+def cdp_results(records: list[tuple[str, Any]], base64_encoded: bool) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    for _url, payload in records:
+        body = json.dumps(payload).encode("utf-8")
+        results.append(
+            {
+                "body": base64.b64encode(body).decode("ascii")
+                if base64_encoded
+                else body.decode("utf-8"),
+                "base64Encoded": base64_encoded,
+            }
+        )
+    return results
+
+
+def time_per_response(results: list[dict[str, Any]], run, output_type, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    output_size = 0
+    for _ in range(repeat):
+        output = output_type()
+        started_at = time.perf_counter()
+        for result in results:
+            run(result, output)
+        best = min(best, time.perf_counter() - started_at)
+        output_size = len(output.getvalue())
+    return best / max(len(results), 1) * 1_000_000, output_size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--capture-dir",
+        action="append",
+        default=[],
+        help="Capture directory to benchmark. Synthetic payloads are used when omitted.",
+    )
+    parser.add_argument("--synthetic-records", type=int, default=500)
+    parser.add_argument("--synthetic-page-size", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    records = (
+        load_records([Path(capture_dir) for capture_dir in args.capture_dir])
+        if args.capture_dir
+        else synthetic_records(args.synthetic_records, args.synthetic_page_size)
+    )
+    if not records:
+        raise SystemExit("No capture records found")
+
+    print(f"records={len(records)} repeat={args.repeat} backend={json_codec.JSON_BACKEND}")
+    for base64_encoded in (True, False):
+        results = cdp_results(records, base64_encoded)
+        baseline, baseline_size = time_per_response(
+            results, str_decode_path, io.StringIO, args.repeat
+        )
+        codec, codec_size = time_per_response(results, codec_path, io.BytesIO, args.repeat)
+        label = "base64" if base64_encoded else "plain"
+        print(
+            f"{label:>6}: str path {baseline:9.2f} us/response ({baseline_size} chars out), "
+            f"codec path {codec:9.2f} us/response ({codec_size} bytes out)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import Any
+
+from capture_store import iter_capture_files, read_capture_file
+from profile_extract import (
+    PREFERRED_CANDIDATE_KEYS,
+    PROFILE_WRAPPER_KEYS,
+    ProfileExtractor,
+    find_profile_payloads,
+    list_looks_like_candidates,
+    looks_like_candidate_dict,
+)
+
+BenchRecord = tuple[str, Any]
+
+
+# Baseline: the recursive extractor this benchmark was written to replace.
+def recursive_find_page_results(payload: Any) -> list[Any] | None:
+    if isinstance(payload, dict):
+        for key in PREFERRED_CANDIDATE_KEYS:
+            maybe_items = payload.get(key)
+            if isinstance(maybe_items, list) and list_looks_like_candidates(maybe_items):
+                return maybe_items
+        for nested_value in payload.values():
+            nested_page_results = recursive_find_page_results(nested_value)
+            if nested_page_results is not None:
+                return nested_page_results
+        return None
+
+    if isinstance(payload, list):
+        if list_looks_like_candidates(payload):
+            return payload
+        for item in payload:
+            nested_page_results = recursive_find_page_results(item)
+            if nested_page_results is not None:
+                return nested_page_results
+    return None
+
+
+def recursive_find_profile_payloads(payload: Any) -> list[dict[str, Any]]:
+    if looks_like_candidate_dict(payload):
+        return [payload]
+
+    if isinstance(payload, dict):
+        for key in PROFILE_WRAPPER_KEYS:
+            nested_payload = payload.get(key)
+            if looks_like_candidate_dict(nested_payload):
+                return [nested_payload]
+        page_results = recursive_find_page_results(payload)
+        if isinstance(page_results, list):
+            return [item for item in page_results if isinstance(item, dict)]
+        for nested_value in payload.values():
+            nested_payloads = recursive_find_profile_payloads(nested_value)
+            if nested_payloads:
+                return nested_payloads
+        return []
+
+    if isinstance(payload, list):
+        if list_looks_like_candidates(payload):
+            return [item for item in payload if isinstance(item, dict)]
+        for item in payload:
+            nested_payloads = recursive_find_profile_payloads(item)
+            if nested_payloads:
+                return nested_payloads
+    return []
+
+
+def synthetic_records(count: int, page_size: int) -> list[BenchRecord]:
+    rng = random.Random(7)
+    records: list[BenchRecord] = []
+    for record_index in range(count):
+        candidates = [
+            {
+                "id": f"cand-{record_index}-{candidate_index}",
+                "full_name": f"Candidate {candidate_index}",
+                "experience": [
+                    {"company_name": f"Company {rng.randint(0, 500)}", "title": {"name": "Engineer"}}
+                    for _ in range(rng.randint(2, 8))
+                ],
+                "education": [{"school": {"name": "University"}} for _ in range(2)],
+            }
+            for candidate_index in range(page_size)
+        ]
+        # Search metadata precedes the results and nests several levels deep,
+        # like the filter/facet blocks in real page results responses.
+        filters: dict[str, Any] = {"value": record_index}
+        for depth in range(12):
+            filters = {f"level{depth}": filters, "enabled": True, "label": "filter"}
+        payload = {
+            "meta": {"requestId": record_index, "filters": filters},
+            "data": {"search": {"total": 1000, "pageResults": candidates}},
+        }
+        records.append(("https://app.juicebox.ai/api/profile/search", payload))
+    return records
+
+
+def load_records(capture_dirs: list[Path]) -> list[BenchRecord]:
+    return [
+        (str(record.get("url", "")), record["json"])
+        for capture_dir in capture_dirs
+        for path in iter_capture_files(capture_dir)
+        for record in read_capture_file(path)
+    ]
+
+
+def time_per_record(records: list[BenchRecord], extract, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        for url, payload in records:
+            extract(payload, url)
+        best = min(best, time.perf_counter() - started_at)
+    return best / max(len(records), 1) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--capture-dir",
+        action="append",
+        default=[],
+        help="Capture directory to benchmark. Synthetic payloads are used when omitted.",
+    )
+    parser.add_argument("--synthetic-records", type=int, default=500)
+    parser.add_argument("--synthetic-page-size", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    records = (
+        load_records([Path(capture_dir) for capture_dir in args.capture_dir])
+        if args.capture_dir
+        else synthetic_records(args.synthetic_records, args.synthetic_page_size)
+    )
+    if not records:
+        raise SystemExit("No capture records found")
+
+    for url, payload in records:
+        if recursive_find_profile_payloads(payload) != find_profile_payloads(payload):
+            raise SystemExit(f"Extractor mismatch for response from {url}")
+
+    extractor = ProfileExtractor()
+    results = {
+        "recursive": time_per_record(
+            records, lambda payload, _url: recursive_find_profile_payloads(payload), args.repeat
+        ),
+        "iterative": time_per_record(
+            records, lambda payload, _url: find_profile_payloads(payload), args.repeat
+        ),
+        "learned": time_per_record(records, extractor.extract, args.repeat),
+    }
+    print(f"records={len(records)} repeat={args.repeat}")
+    for name, microseconds in results.items():
+        print(f"{name:>10}: {microseconds:9.2f} us/response")
+    print(
+        f"learned fast path hits={extractor.fast_path_hits} "
+        f"misses={extractor.fast_path_misses} patterns={len(extractor.learned_paths)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
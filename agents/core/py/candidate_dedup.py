@@ -0,0 +1,235 @@
+import hashlib
+import json
+import sqlite3
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from candidate_fields import candidate_view, pick_field
+
+# Same key aliases lib/core/user-payload.ts normalizes, checked in the same
+# order, so an identity here matches the id the TypeScript side stores.
+CANDIDATE_ID_KEYS = (
+    "id",
+    "candidateId",
+    "candidate_id",
+    "profileId",
+    "profile_id",
+    "publicId",
+    "public_id",
+    "person_id",
+)
+LINKEDIN_ID_KEYS = ("linkedin_id", "linkedinId")
+LINKEDIN_URL_KEYS = ("linkedin_url", "linkedinUrl", "linkedin")
+WORK_EMAIL_KEYS = ("work_email", "workEmail", "email")
+PERSONAL_EMAIL_KEYS = ("personal_emails", "personalEmails")
+# Fields that say who a candidate is and what their profile holds. Content
+# hashes cover only these, so timestamps, scores or signed image URLs that
+# change on every fetch do not make a known payload look new.
+CANDIDATE_CONTENT_FIELDS = (
+    "full_name",
+    "first_name",
+    "last_name",
+    "summary",
+    "location_name",
+    "job_title",
+    "job_company_name",
+    "linkedin_url",
+    "work_email",
+    "skills",
+    "education",
+    "experience",
+)
+DEDUP_INDEX_COMMIT_INTERVAL = 100
+# PRAGMA user_version of an index file whose seen_candidates rows are
+# (identity, candidate_content_hash) pairs.
+DEDUP_INDEX_SCHEMA_VERSION = 2
+SEEN_CANDIDATES_TABLE = (
+    "CREATE TABLE IF NOT EXISTS seen_candidates ("
+    "identity TEXT NOT NULL, "
+    "content_hash TEXT NOT NULL, "
+    "first_seen_at TEXT NOT NULL, "
+    "PRIMARY KEY (identity, content_hash))"
+)
+
+
+def _string_value(payload: dict[str, Any], keys: tuple[str, ...]) -> str | None:
+    for key in keys:
+        value = payload.get(key)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
+
+
+def normalize_linkedin_url(url: str) -> str | None:
+    # "https://www.LinkedIn.com/in/Jane-Doe/?trk=x" -> "linkedin.com/in/jane-doe"
+    parts = urlsplit(url if "//" in url else f"//{url}")
+    host = parts.netloc.lower().removeprefix("www.")
+    if not host.endswith("linkedin.com"):
+        return None
+    path = parts.path.rstrip("/").lower()
+    if not path:
+        return None
+    return f"linkedin.com{path}"
+
+
+def candidate_identities(payload: Any) -> list[str]:
+    if not isinstance(payload, dict):
+        return []
+
+    candidate = candidate_view(payload)
+    identities: list[str] = []
+
+    candidate_id = _string_value(candidate, CANDIDATE_ID_KEYS)
+    if candidate_id is not None:
+        identities.append(f"id:{candidate_id}")
+
+    linkedin_id = _string_value(candidate, LINKEDIN_ID_KEYS)
+    if linkedin_id is not None:
+        identities.append(f"linkedin-id:{linkedin_id}")
+
+    linkedin_url = _string_value(candidate, LINKEDIN_URL_KEYS)
+    normalized_url = normalize_linkedin_url(linkedin_url) if linkedin_url else None
+    if normalized_url is not None:
+        identities.append(f"linkedin:{normalized_url}")
+
+    work_email = _string_value(candidate, WORK_EMAIL_KEYS)
+    if work_email is not None:
+        identities.append(f"email:{work_email.lower()}")
+    personal_emails = next(
+        (candidate[key] for key in PERSONAL_EMAIL_KEYS if key in candidate), None
+    )
+    if isinstance(personal_emails, list):
+        identities.extend(
+            f"email:{email.strip().lower()}"
+            for email in personal_emails
+            if isinstance(email, str) and email.strip()
+        )
+    return identities
+
+
+def payload_hash(payload: Any) -> str:
+    encoded = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def candidate_content_hash(
+    payload: Any, fields: tuple[str, ...] = CANDIDATE_CONTENT_FIELDS
+) -> str:
+    candidate = candidate_view(payload) if isinstance(payload, dict) else {}
+    hashed_fields = {
+        field_name: pick_field(candidate, field_name) for field_name in fields
+    }
+    return payload_hash(hashed_fields)
+
+
+def candidate_identity(payload: Any) -> str:
+    # Payloads without any identifying field fall back to a content hash,
+    # which still catches the same card being clicked twice.
+    identities = candidate_identities(payload)
+    if identities:
+        return identities[0]
+    return f"content:{payload_hash(payload)}"
+
+
+class CandidateDedupIndex:
+    def __init__(self, index_path: Path | None = None) -> None:
+        self.index_path = index_path
+        # (identity, content hash) of every payload emitted for a candidate.
+        # A summary card and the full profile differ in content, so both are
+        # kept rather than the latest one replacing the other.
+        self._seen: set[tuple[str, str]] = set()
+        # Identities emitted by an earlier, checkpointed attempt of this crawl.
+        self._seeded: set[str] = set()
+        self._connection: sqlite3.Connection | None = None
+        self._pending_commit_count = 0
+
+    def open(self) -> None:
+        if self.index_path is None or self._connection is not None:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.index_path, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._migrate_index(self._connection)
+        self._connection.execute(SEEN_CANDIDATES_TABLE)
+        self._connection.execute(f"PRAGMA user_version = {DEDUP_INDEX_SCHEMA_VERSION}")
+        self._connection.commit()
+
+    def _migrate_index(self, connection: sqlite3.Connection) -> None:
+        # Earlier index files keyed seen_candidates on identity alone, or
+        # hashed the whole raw payload, volatile fields included. Neither
+        # can match a candidate_content_hash, so the table starts over;
+        # those candidates are emitted once more and recorded again.
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version >= DEDUP_INDEX_SCHEMA_VERSION:
+            return
+        with connection:
+            connection.execute("DROP TABLE IF EXISTS seen_candidates")
+
+    def close(self) -> None:
+        if self._connection is None:
+            return
+        self._connection.commit()
+        self._connection.close()
+        self._connection = None
+
+    def __enter__(self) -> "CandidateDedupIndex":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def seed(self, identities: Iterable[str]) -> None:
+        # Seeded candidates are suppressed whatever their content, since the
+        # consumer already has a payload for them.
+        self._seeded.update(identities)
+
+    def add(self, payload: Any) -> bool:
+        # Returns False when the same candidate was already emitted with the
+        # same content fields, in this run or (with an index file) an earlier one.
+        # A richer payload for a known candidate, such as the full profile
+        # after its search-result summary, still goes through.
+        identities = candidate_identities(payload) or [candidate_identity(payload)]
+        if not self._seeded.isdisjoint(identities):
+            return False
+        content_hash = candidate_content_hash(payload)
+        seen_pairs = [(identity, content_hash) for identity in identities]
+        is_duplicate = any(
+            pair in self._seen for pair in seen_pairs
+        ) or self._seen_in_index(identities, content_hash)
+        self._seen.update(seen_pairs)
+        if not is_duplicate:
+            self._record_in_index(identities, content_hash)
+        return not is_duplicate
+
+    def _seen_in_index(self, identities: list[str], content_hash: str) -> bool:
+        if self._connection is None:
+            return False
+        placeholders = ",".join("?" for _ in identities)
+        row = self._connection.execute(
+            "SELECT 1 FROM seen_candidates "
+            f"WHERE identity IN ({placeholders}) AND content_hash = ? LIMIT 1",
+            [*identities, content_hash],
+        ).fetchone()
+        return row is not None
+
+    def _record_in_index(self, identities: list[str], content_hash: str) -> None:
+        if self._connection is None:
+            return
+        seen_at = datetime.now(timezone.utc).isoformat()
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO seen_candidates "
+            "(identity, content_hash, first_seen_at) VALUES (?, ?, ?)",
+            [(identity, content_hash, seen_at) for identity in identities],
+        )
+        self._pending_commit_count += 1
+        if self._pending_commit_count >= DEDUP_INDEX_COMMIT_INTERVAL:
+            self._connection.commit()
+            self._pending_commit_count = 0
@@ -0,0 +1,259 @@
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from candidate_dedup import (
+    CANDIDATE_CONTENT_FIELDS,
+    candidate_content_hash,
+    candidate_identities,
+    candidate_identity,
+)
+
+DEFAULT_DIFF_FIELDS = CANDIDATE_CONTENT_FIELDS
+DIFF_STORE_COMMIT_INTERVAL = 100
+# PRAGMA user_version of a store whose candidate_hashes rows are keyed on
+# (search_url, identity, content_hash), with every alias of a candidate in
+# candidate_aliases.
+DIFF_STORE_SCHEMA_VERSION = 2
+CANDIDATE_HASHES_TABLE = (
+    "CREATE TABLE IF NOT EXISTS candidate_hashes ("
+    "search_url TEXT NOT NULL, "
+    "identity TEXT NOT NULL, "
+    "content_hash TEXT NOT NULL, "
+    "first_seen_at TEXT NOT NULL, "
+    "last_seen_at TEXT NOT NULL, "
+    "removed_at TEXT, "
+    "PRIMARY KEY (search_url, identity, content_hash))"
+)
+# Maps each identity a candidate has been seen with to the one its hashes
+# are stored under, so a payload carrying any of them finds the candidate.
+CANDIDATE_ALIASES_TABLE = (
+    "CREATE TABLE IF NOT EXISTS candidate_aliases ("
+    "search_url TEXT NOT NULL, "
+    "alias TEXT NOT NULL, "
+    "identity TEXT NOT NULL, "
+    "PRIMARY KEY (search_url, alias))"
+)
+
+CANDIDATE_NEW = "new"
+CANDIDATE_CHANGED = "changed"
+CANDIDATE_UNCHANGED = "unchanged"
+
+
+@dataclass(slots=True)
+class DiffCounts:
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+    @property
+    def emitted(self) -> int:
+        return self.new + self.changed
+
+    def to_json(self) -> dict[str, int]:
+        return {
+            "newCandidates": self.new,
+            "changedCandidates": self.changed,
+            "unchangedCandidates": self.unchanged,
+            "removedCandidates": self.removed,
+        }
+
+
+class CandidateDiffStore:
+    def __init__(
+        self,
+        store_path: Path,
+        search_url: str,
+        fields: tuple[str, ...] = DEFAULT_DIFF_FIELDS,
+    ) -> None:
+        self.store_path = store_path
+        self.search_url = search_url
+        self.fields = fields
+        self.counts = DiffCounts()
+        self._connection: sqlite3.Connection | None = None
+        self._run_started_at = ""
+        self._pending_commit_count = 0
+
+    def open(self) -> None:
+        if self._connection is not None:
+            return
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.store_path, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._migrate_store(self._connection)
+        self._connection.execute(CANDIDATE_HASHES_TABLE)
+        self._connection.execute(CANDIDATE_ALIASES_TABLE)
+        self._connection.execute(f"PRAGMA user_version = {DIFF_STORE_SCHEMA_VERSION}")
+        self._connection.commit()
+        self._run_started_at = datetime.now(timezone.utc).isoformat()
+
+    def _migrate_store(self, connection: sqlite3.Connection) -> None:
+        # Stores from before user_version 1 kept one hash per candidate; the
+        # rows carry over as they are, now keyed by their hash as well.
+        # Before user_version 2 the stored identity was the only alias.
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version >= DIFF_STORE_SCHEMA_VERSION:
+            return
+        if not connection.execute("PRAGMA table_info(candidate_hashes)").fetchall():
+            return
+        with connection:
+            # DDL is transactional in SQLite; an explicit BEGIN keeps the
+            # rename, copy and drop all-or-nothing.
+            connection.execute("BEGIN")
+            if version < 1:
+                connection.execute(
+                    "ALTER TABLE candidate_hashes "
+                    "RENAME TO candidate_hashes_unversioned"
+                )
+                connection.execute(CANDIDATE_HASHES_TABLE)
+                connection.execute(
+                    "INSERT OR IGNORE INTO candidate_hashes "
+                    "SELECT search_url, identity, content_hash, first_seen_at, "
+                    "last_seen_at, removed_at FROM candidate_hashes_unversioned"
+                )
+                connection.execute("DROP TABLE candidate_hashes_unversioned")
+            connection.execute(CANDIDATE_ALIASES_TABLE)
+            connection.execute(
+                "INSERT OR IGNORE INTO candidate_aliases "
+                "SELECT DISTINCT search_url, identity, identity "
+                "FROM candidate_hashes"
+            )
+
+    def classify(self, payload: Any) -> str:
+        if self._connection is None:
+            raise RuntimeError("Candidate diff store is not open")
+
+        # Every hash a candidate is known by is kept: its search-result
+        # summary and its full profile share an identity but not content,
+        # and a single stored hash would make each look changed.
+        identity = self._resolve_identity(
+            self._connection,
+            candidate_identities(payload) or [candidate_identity(payload)],
+        )
+        content_hash = candidate_content_hash(payload, self.fields)
+        known_hashes = self._connection.execute(
+            "SELECT content_hash, first_seen_at FROM candidate_hashes "
+            "WHERE search_url = ? AND identity = ? AND removed_at IS NULL",
+            (self.search_url, identity),
+        ).fetchall()
+        # A tombstoned candidate that came back counts as new, and so does
+        # another view of a candidate first seen during this run.
+        if any(known_hash == content_hash for known_hash, _ in known_hashes):
+            status = CANDIDATE_UNCHANGED
+            self.counts.unchanged += 1
+        elif all(seen_at >= self._run_started_at for _, seen_at in known_hashes):
+            status = CANDIDATE_NEW
+            self.counts.new += 1
+        else:
+            status = CANDIDATE_CHANGED
+            self.counts.changed += 1
+
+        self._connection.execute(
+            "INSERT INTO candidate_hashes "
+            "(search_url, identity, content_hash, first_seen_at, last_seen_at) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (search_url, identity, content_hash) DO UPDATE SET "
+            "last_seen_at = excluded.last_seen_at, "
+            "removed_at = NULL",
+            (
+                self.search_url,
+                identity,
+                content_hash,
+                self._run_started_at,
+                self._run_started_at,
+            ),
+        )
+        self._pending_commit_count += 1
+        if self._pending_commit_count >= DIFF_STORE_COMMIT_INTERVAL:
+            self._connection.commit()
+            self._pending_commit_count = 0
+        return status
+
+    def _resolve_identity(
+        self, connection: sqlite3.Connection, aliases: list[str]
+    ) -> str:
+        # Like the dedup index, a candidate is matched on any of its
+        # identities, so gaining or losing an id field between runs does not
+        # make it new. Its hashes stay under the identity it was first stored
+        # with; that keeps one identity per candidate for removal counts.
+        placeholders = ", ".join("?" * len(aliases))
+        stored = dict(
+            connection.execute(
+                "SELECT alias, identity FROM candidate_aliases "
+                f"WHERE search_url = ? AND alias IN ({placeholders})",
+                (self.search_url, *aliases),
+            ).fetchall()
+        )
+        known = [stored[alias] for alias in aliases if alias in stored]
+        identity = known[0] if known else aliases[0]
+        # Aliases stored under different identities were one candidate seen
+        # through disjoint identities; fold them into the first.
+        for other in dict.fromkeys(known[1:]):
+            if other == identity:
+                continue
+            params = (identity, self.search_url, other)
+            connection.execute(
+                "UPDATE OR IGNORE candidate_hashes SET identity = ? "
+                "WHERE search_url = ? AND identity = ?",
+                params,
+            )
+            connection.execute(
+                "DELETE FROM candidate_hashes WHERE search_url = ? AND identity = ?",
+                params[1:],
+            )
+            connection.execute(
+                "UPDATE candidate_aliases SET identity = ? "
+                "WHERE search_url = ? AND identity = ?",
+                params,
+            )
+        connection.executemany(
+            "INSERT INTO candidate_aliases (search_url, alias, identity) "
+            "VALUES (?, ?, ?) "
+            "ON CONFLICT (search_url, alias) DO UPDATE SET "
+            "identity = excluded.identity",
+            [(self.search_url, alias, identity) for alias in aliases],
+        )
+        return identity
+
+    def close(self, *, crawl_completed: bool) -> None:
+        # Only a crawl that walked every page saw every candidate, so only
+        # then is "not seen this run" evidence that a candidate disappeared.
+        if self._connection is None:
+            return
+        if crawl_completed:
+            self._record_removals()
+        self._connection.commit()
+        self._connection.close()
+        self._connection = None
+
+    def _record_removals(self) -> None:
+        connection = self._connection
+        if connection is None:
+            return
+        params = (self.search_url, self._run_started_at)
+        seen_this_run = (
+            "SELECT identity FROM candidate_hashes "
+            "WHERE search_url = ? AND last_seen_at >= ?"
+        )
+        # Hashes a candidate seen this run no longer has are stale content,
+        # not a removal; drop them so old content is not "unchanged" later.
+        connection.execute(
+            "DELETE FROM candidate_hashes "
+            "WHERE search_url = ? AND last_seen_at < ? "
+            f"AND identity IN ({seen_this_run})",
+            (*params, *params),
+        )
+        not_seen = (
+            "WHERE search_url = ? AND removed_at IS NULL AND last_seen_at < ?"
+        )
+        self.counts.removed = connection.execute(
+            f"SELECT COUNT(DISTINCT identity) FROM candidate_hashes {not_seen}",
+            params,
+        ).fetchone()[0]
+        connection.execute(
+            f"UPDATE candidate_hashes SET removed_at = ? {not_seen}",
+            (datetime.now(timezone.utc).isoformat(), *params),
+        )
@@ -0,0 +1,60 @@
+from typing import Any
+
+# Canonical candidate fields and the payload keys they may arrive under,
+# in the order lib/core/user-payload.ts checks them.
+CANDIDATE_FIELD_ALIASES: dict[str, tuple[str, ...]] = {
+    "id": (
+        "id",
+        "candidateId",
+        "candidate_id",
+        "profileId",
+        "profile_id",
+        "publicId",
+        "public_id",
+        "person_id",
+        "linkedin_id",
+        "linkedinId",
+    ),
+    "first_name": ("first_name", "firstName"),
+    "last_name": ("last_name", "lastName"),
+    "full_name": ("full_name", "fullName"),
+    "summary": ("summary", "description", "bio"),
+    "profileHighlight": ("profileHighlight", "profile_highlight"),
+    "location_name": ("location_name", "locationName", "location"),
+    "location_country": ("location_country", "locationCountry", "country"),
+    "location_locality": ("location_locality", "locationLocality", "locality", "city"),
+    "job_title": ("job_title", "jobTitle", "title", "headline"),
+    "job_company_name": ("job_company_name", "jobCompanyName", "company", "companyName"),
+    "linkedin_url": ("linkedin_url", "linkedinUrl", "linkedin"),
+    "linkedin_id": ("linkedin_id", "linkedinId"),
+    "github_url": ("github_url", "githubUrl"),
+    "work_email": ("work_email", "workEmail", "email"),
+    "personal_emails": ("personal_emails", "personalEmails"),
+    "phone_numbers": ("phone_numbers", "phoneNumbers"),
+    "mobile_phone": ("mobile_phone", "mobilePhone"),
+    "skills": ("skills", "skill_set"),
+    "ai_skills": ("ai_skills", "aiSkills"),
+    "sd_skills": ("sd_skills", "sdSkills"),
+    "languages": ("languages", "language"),
+    "education": ("education", "educations"),
+    "experience": ("experience", "experiences"),
+    "profiles": ("profiles", "network_profiles", "networkProfiles"),
+}
+
+
+def candidate_view(payload: dict[str, Any]) -> dict[str, Any]:
+    # Some responses wrap the candidate in "result"; its keys win, as in
+    # normalizePayload on the TypeScript side.
+    result = payload.get("result")
+    return {**payload, **result} if isinstance(result, dict) else payload
+
+
+def pick_field(candidate: dict[str, Any], field_name: str) -> Any:
+    for key in CANDIDATE_FIELD_ALIASES.get(field_name, (field_name,)):
+        value = candidate.get(key)
+        if value is None:
+            continue
+        if isinstance(value, str) and not value.strip():
+            continue
+        return value
+    return None
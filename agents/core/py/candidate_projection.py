@@ -0,0 +1,252 @@
+from dataclasses import dataclass
+from typing import Any
+
+from candidate_fields import CANDIDATE_FIELD_ALIASES, candidate_view, pick_field
+
+# A projection maps each kept key to None (keep the value as it is) or to
+# the projection for the object, or list of objects, under it. These mirror
+# the schemas in agents/core/jb-schema.ts, plus the alternative keys
+# lib/core/user-payload.ts falls back to while normalising nested entries.
+FieldProjection = dict[str, "FieldProjection | None"]
+
+LOCATION_FIELDS: FieldProjection = dict.fromkeys(
+    (
+        "continent",
+        "country",
+        "locality",
+        "name",
+        "region",
+        "address_line_2",
+        "geo",
+        "postal_code",
+        "street_address",
+    )
+)
+
+EXPERIENCE_COMPANY_FIELDS: FieldProjection = dict.fromkeys(
+    (
+        "id",
+        "name",
+        "website",
+        "linkedin_url",
+        "linkedin_id",
+        "facebook_url",
+        "twitter_url",
+        "founded",
+        "industry",
+        "industry_v2",
+        "headline",
+        "summary",
+        "size",
+        "type",
+        "ticker",
+        "employee_count",
+        "average_employee_tenure",
+        "alternative_names",
+        "tags",
+        "inferred_tags",
+        "location",
+    )
+)
+
+JOB_TITLE_FIELDS: FieldProjection = dict.fromkeys(("levels", "name", "role", "sub_role"))
+
+EXPERIENCE_FIELDS: FieldProjection = {
+    **dict.fromkeys(
+        (
+            "company_name",
+            "companyName",
+            "organization",
+            "role_title",
+            "jobTitle",
+            "description",
+            "start_date",
+            "startDate",
+            "end_date",
+            "endDate",
+            "is_primary",
+            "location_names",
+            "locationNames",
+            "locations",
+            "summary",
+            "type",
+            "historical_funding_stages",
+        )
+    ),
+    "company": EXPERIENCE_COMPANY_FIELDS,
+    "title": JOB_TITLE_FIELDS,
+}
+
+SCHOOL_FIELDS: FieldProjection = {
+    **dict.fromkeys(
+        (
+            "id",
+            "name",
+            "domain",
+            "facebook_url",
+            "linkedin_id",
+            "linkedin_url",
+            "twitter_url",
+            "type",
+            "website",
+        )
+    ),
+    "location": LOCATION_FIELDS,
+}
+
+EDUCATION_FIELDS: FieldProjection = {
+    **dict.fromkeys(
+        (
+            "institution_name",
+            "schoolName",
+            "name",
+            "degree",
+            "degrees",
+            "field_of_study",
+            "fieldOfStudy",
+            "majors",
+            "minors",
+            "description",
+            "start_date",
+            "startDate",
+            "end_date",
+            "endDate",
+            "gpa",
+            "summary",
+        )
+    ),
+    "school": SCHOOL_FIELDS,
+}
+
+NETWORK_PROFILE_FIELDS: FieldProjection = dict.fromkeys(
+    ("network", "type", "label", "url", "link", "href")
+)
+
+LANGUAGE_FIELDS: FieldProjection = dict.fromkeys(("name", "proficiency"))
+
+# JuiceboxCandidateSchema, in schema order. experiences and network_profiles
+# are left out: they are aliases of experience and profiles, which the
+# Node side copies back after normalising.
+CANDIDATE_FIELDS: FieldProjection = {
+    **dict.fromkeys(
+        (
+            "id",
+            "pdlSource",
+            "lastContacted",
+            "lastContactedOnLinkedin",
+            "lastEmailed",
+            "lastReplied",
+            "lastSequenceRun",
+            "lastContactInfoRefresh",
+            "lastExported",
+            "lastActivityDate",
+            "saved",
+            "savedAt",
+            "l_invalid",
+            "work_email",
+            "recommended_personal_email",
+            "personal_emails",
+            "phone_numbers",
+            "mobile_phone",
+            "manualEmails",
+            "manualPhoneNumbers",
+            "supplemented_emails",
+            "supplemented_phone_number",
+            "contact_info_availability",
+            "first_name",
+            "last_name",
+            "full_name",
+            "summary",
+            "profileHighlight",
+            "text",
+            "location_name",
+            "location_country",
+            "location_locality",
+            "job_title",
+            "job_company_name",
+            "job_company_id",
+            "job_company_website",
+            "job_start_date",
+            "job_end_date",
+            "ai_skills",
+            "sd_skills",
+            "skills",
+        )
+    ),
+    "languages": LANGUAGE_FIELDS,
+    **dict.fromkeys(
+        (
+            "tags",
+            "_tags",
+            "average_tenure",
+            "total_experience_months",
+            "open_to_work_reasons",
+            "highlights",
+            "other_notes",
+        )
+    ),
+    "education": EDUCATION_FIELDS,
+    "experience": EXPERIENCE_FIELDS,
+    "profiles": NETWORK_PROFILE_FIELDS,
+    **dict.fromkeys(
+        (
+            "publications",
+            "competitions",
+            "links",
+            "isConnectedTo",
+            "juicebox_profile_url",
+            "juicebox_profile_api_url",
+            "linkedin_url",
+            "linkedin_id",
+            "github_url",
+            "twitter_url",
+            "facebook_url",
+            "github_data",
+            "autopilot",
+        )
+    ),
+}
+
+
+def project_value(value: Any, projection: FieldProjection | None) -> Any:
+    if projection is None:
+        return value
+    if isinstance(value, dict):
+        return {
+            key: project_value(value[key], nested)
+            for key, nested in projection.items()
+            if value.get(key) is not None
+        }
+    if isinstance(value, list):
+        return [project_value(entry, projection) for entry in value]
+    return value
+
+
+def project_candidate(payload: dict[str, Any]) -> dict[str, Any]:
+    # Top-level fields resolve through the same aliases the Node side
+    # normalises, so the record keeps only canonical keys; absent fields are
+    # left out rather than sent as null.
+    candidate = candidate_view(payload)
+    record: dict[str, Any] = {}
+    for key, nested in CANDIDATE_FIELDS.items():
+        if key in CANDIDATE_FIELD_ALIASES:
+            value = pick_field(candidate, key)
+        else:
+            value = candidate.get(key)
+        if value is not None:
+            record[key] = project_value(value, nested)
+    return record
+
+
+@dataclass(slots=True)
+class CandidateProjector:
+    # Only counts; ScraperOutput, which serialises each record anyway,
+    # measures the bytes projection saved.
+    projected_count: int = 0
+
+    def project(self, payload: dict[str, Any]) -> dict[str, Any]:
+        self.projected_count += 1
+        return project_candidate(payload)
+
+    def to_json(self) -> dict[str, int]:
+        return {"projectedCandidates": self.projected_count}
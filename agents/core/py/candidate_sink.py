@@ -0,0 +1,135 @@
+import sqlite3
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Protocol
+
+import json_codec
+from batch_flusher import BatchFlusher
+from candidate_dedup import candidate_identity
+
+SQLITE_SINK_BATCH_SIZE = 100
+SQLITE_SINK_FLUSH_INTERVAL_MS = 1_000
+
+
+@dataclass(slots=True)
+class CandidateContext:
+    # Where an emitted candidate came from: the page-results page it was on,
+    # when known, and when its response was captured.
+    captured_at: datetime
+    page_number: int | None = None
+
+
+class CandidateSink(Protocol):
+    def write(self, payload: Any, context: CandidateContext) -> None: ...
+
+    def flush(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class SqliteCandidateSink:
+    # Rows go through a BatchFlusher and are upserted a batch per
+    # transaction, so emit latency does not include an fsync per candidate;
+    # a failed timer flush is re-raised from the next write, flush or close.
+    # Key is (search URL, identity); run_id says which run last saw a row, so
+    # a parent whose scraper crashed can read that run's candidates back.
+    def __init__(
+        self,
+        store_path: Path,
+        search_url: str,
+        run_id: str | None = None,
+        batch_size: int = SQLITE_SINK_BATCH_SIZE,
+        flush_interval_ms: float = SQLITE_SINK_FLUSH_INTERVAL_MS,
+    ) -> None:
+        self.store_path = store_path
+        self.search_url = search_url
+        self.run_id = run_id or uuid.uuid4().hex
+        self.written_count = 0
+        self._connection: sqlite3.Connection | None = None
+        self._rows: BatchFlusher[tuple[Any, ...]] = BatchFlusher(
+            self._upsert_rows,
+            name="SQLite candidate sink",
+            batch_size=batch_size,
+            flush_interval_ms=flush_interval_ms,
+        )
+
+    def open(self) -> None:
+        if self._connection is not None:
+            return
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.store_path, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # WAL with synchronous=NORMAL can lose the last commits on power
+        # loss but never corrupts; a crashed process loses nothing committed.
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            "search_url TEXT NOT NULL, "
+            "identity TEXT NOT NULL, "
+            "run_id TEXT NOT NULL, "
+            "page_number INTEGER, "
+            "first_captured_at TEXT NOT NULL, "
+            "captured_at TEXT NOT NULL, "
+            "payload TEXT NOT NULL, "
+            "PRIMARY KEY (search_url, identity))"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS candidates_run_id ON candidates (run_id)"
+        )
+        self._connection.commit()
+
+    def write(self, payload: Any, context: CandidateContext) -> None:
+        if self._connection is None:
+            raise RuntimeError("SQLite candidate sink is not open")
+        captured_at = context.captured_at.isoformat()
+        self._rows.add(
+            (
+                self.search_url,
+                candidate_identity(payload),
+                self.run_id,
+                context.page_number,
+                captured_at,
+                captured_at,
+                json_codec.dumps_bytes(payload).decode("utf-8"),
+            )
+        )
+
+    def flush(self) -> None:
+        self._rows.flush()
+
+    def _upsert_rows(self, rows: list[tuple[Any, ...]]) -> None:
+        if self._connection is None:
+            raise RuntimeError("SQLite candidate sink is not open")
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO candidates "
+                "(search_url, identity, run_id, page_number, first_captured_at, "
+                "captured_at, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (search_url, identity) DO UPDATE SET "
+                "run_id = excluded.run_id, "
+                "page_number = COALESCE(excluded.page_number, page_number), "
+                "captured_at = excluded.captured_at, "
+                "payload = excluded.payload",
+                rows,
+            )
+        self.written_count += len(rows)
+
+    def close(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._connection.close()
+            self._connection = None
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "type": "sqlite",
+            "path": str(self.store_path),
+            "runId": self.run_id,
+            "searchUrl": self.search_url,
+        }
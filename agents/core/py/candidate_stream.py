@@ -0,0 +1,109 @@
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+DEFAULT_STREAM_MAX_QUEUED = 256
+DEFAULT_STREAM_MAX_LATENCY_MS = 100
+
+_STREAM_END = object()
+
+
+class CandidateStream:
+    # Emitted candidates for one `async for` consumer. The queue is bounded:
+    # a consumer that falls behind makes the capture's fetch workers wait,
+    # the same backpressure an awaitable on_profile_payload callback gives.
+    # Use `async with` (or call aclose()) when leaving the loop early, so
+    # the capture stops feeding a queue nobody reads.
+    def __init__(
+        self,
+        *,
+        batch_size: int | None = None,
+        max_latency_ms: float = DEFAULT_STREAM_MAX_LATENCY_MS,
+        max_queued: int = DEFAULT_STREAM_MAX_QUEUED,
+        on_close: Callable[["CandidateStream"], None] | None = None,
+    ) -> None:
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.batch_size = batch_size
+        self.max_latency_seconds = max_latency_ms / 1000
+        self._queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=max_queued)
+        # Set whenever the consumer takes an item or the stream closes, so
+        # every producer blocked on a full queue re-checks.
+        self._space_available = asyncio.Event()
+        self._on_close = on_close
+        self._ended = False
+        self._closed = False
+
+    async def put(self, payload: Any) -> None:
+        while not (self._ended or self._closed):
+            try:
+                self._queue.put_nowait(payload)
+                return
+            except asyncio.QueueFull:
+                self._space_available.clear()
+                await self._space_available.wait()
+
+    def end(self) -> None:
+        # Called by the capture once nothing more will be put. A full queue
+        # needs no marker: the consumer sees _ended once it drains it.
+        if self._ended:
+            return
+        self._ended = True
+        try:
+            self._queue.put_nowait(_STREAM_END)
+        except asyncio.QueueFull:
+            pass
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._ended = True
+        if self._on_close is not None:
+            self._on_close(self)
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._space_available.set()
+
+    async def __aenter__(self) -> "CandidateStream":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    def __aiter__(self) -> "CandidateStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        first = await self._next_item()
+        if first is _STREAM_END:
+            raise StopAsyncIteration
+        if self.batch_size is None:
+            return first
+
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_latency_seconds
+        while len(batch) < self.batch_size:
+            if self._queue.empty():
+                remaining = deadline - loop.time()
+                if self._ended or remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            self._space_available.set()
+            if item is _STREAM_END:
+                break
+            batch.append(item)
+        return batch
+
+    async def _next_item(self) -> Any:
+        if self._closed or (self._ended and self._queue.empty()):
+            return _STREAM_END
+        item = await self._queue.get()
+        self._space_available.set()
+        return item
@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from candidate_projection import CandidateProjector
+from capture_store import iter_capture_files, read_capture_file
+from cdp_capture import CaptureState, ProfilePayloadEmitter, capture_stats
+from profile_extract import ProfileExtractor
+from scraper_output import ScraperOutput
+
+ExtractedRecord = list[dict[str, Any]]
+
+# One extractor per process, so each pool worker learns its own fast paths.
+_extractor = ProfileExtractor()
+
+
+def extract_capture_file(
+    path: Path, profile_match_substring: str
+) -> list[ExtractedRecord]:
+    return [
+        _extractor.extract(record["json"], str(record.get("url", "")))
+        for record in read_capture_file(path)
+        if profile_match_substring in str(record.get("url", ""))
+    ]
+
+
+async def replay_captures(
+    capture_dirs: list[Path],
+    profile_match_substring: str,
+    workers: int,
+    output: ScraperOutput,
+    project_fields: bool = False,
+) -> CaptureState:
+    state = CaptureState(projector=CandidateProjector() if project_fields else None)
+    emitter = ProfilePayloadEmitter(state, output.emit_user_payload)
+    capture_files = [
+        path for capture_dir in capture_dirs for path in iter_capture_files(capture_dir)
+    ]
+    print(
+        f"[Replay] Replaying {len(capture_files)} capture files with {workers} workers",
+        file=sys.stderr,
+        flush=True,
+    )
+
+    async def emit_records(records: list[ExtractedRecord]) -> None:
+        for profile_payloads in records:
+            state.api_request_count += 1
+            state.profile_match_count += 1
+            await emitter.emit(profile_payloads)
+            state.saved_profile_count += 1
+
+    if workers <= 1:
+        for path in capture_files:
+            await emit_records(extract_capture_file(path, profile_match_substring))
+        return state
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() keeps file order, so output order matches a serial replay.
+        for records in executor.map(
+            extract_capture_file,
+            capture_files,
+            [profile_match_substring] * len(capture_files),
+        ):
+            await emit_records(records)
+    return state
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--capture-dir",
+        action="append",
+        required=True,
+        help="Capture directory to replay. Repeat to replay several; searched recursively.",
+    )
+    parser.add_argument(
+        "--match",
+        default="/api/profile",
+        help="Substring to match profile API responses",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes used to parse and extract capture files.",
+    )
+    parser.add_argument(
+        "--project-fields",
+        action="store_true",
+        help="Emit only the candidate fields agents/core/jb-schema.ts declares.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    replay_output = ScraperOutput()
+    replay_state = asyncio.run(
+        replay_captures(
+            capture_dirs=[Path(capture_dir) for capture_dir in args.capture_dir],
+            profile_match_substring=args.match,
+            workers=args.workers,
+            output=replay_output,
+            project_fields=args.project_fields,
+        )
+    )
+    replay_output.emit_capture_stats(
+        {**capture_stats(replay_state), **replay_output.candidate_stats()}
+    )
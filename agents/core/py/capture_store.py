@@ -0,0 +1,288 @@
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import json_codec
+
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+SEGMENT_MAX_AGE_SECONDS = 15 * 60
+WRITER_FLUSH_INTERVAL_SECONDS = 1.0
+WRITER_BATCH_MAX_RECORDS = 256
+SEGMENT_FILENAME_PREFIX = "segment_"
+SEGMENT_FILENAME_SUFFIX = ".ndjson"
+INDEX_FILENAME = "index.ndjson"
+
+_STOP = object()
+
+
+@dataclass(slots=True)
+class CaptureIndexEntry:
+    request_id: str
+    url: str
+    segment: str
+    offset: int
+    length: int
+    captured_at: str
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "requestId": self.request_id,
+            "url": self.url,
+            "segment": self.segment,
+            "offset": self.offset,
+            "length": self.length,
+            "capturedAt": self.captured_at,
+        }
+
+    @classmethod
+    def from_json(cls, value: dict[str, Any]) -> "CaptureIndexEntry":
+        return cls(
+            request_id=str(value["requestId"]),
+            url=str(value["url"]),
+            segment=str(value["segment"]),
+            offset=int(value["offset"]),
+            length=int(value["length"]),
+            captured_at=str(value.get("capturedAt", "")),
+        )
+
+
+class NdjsonCaptureStore:
+    def __init__(
+        self,
+        output_dir: Path,
+        *,
+        segment_max_bytes: int = SEGMENT_MAX_BYTES,
+        segment_max_age_seconds: float = SEGMENT_MAX_AGE_SECONDS,
+        flush_interval_seconds: float = WRITER_FLUSH_INTERVAL_SECONDS,
+    ) -> None:
+        self.output_dir = output_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_age_seconds = segment_max_age_seconds
+        self.flush_interval_seconds = flush_interval_seconds
+        self.written_record_count = 0
+        self.segment_count = 0
+        self.error: BaseException | None = None
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._segment_file = None
+        self._segment_name = ""
+        self._segment_size = 0
+        self._segment_opened_at = 0.0
+        self._index_file = None
+
+    def start(self) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._index_file = (self.output_dir / INDEX_FILENAME).open("ab")
+        self._thread = threading.Thread(
+            target=self._run, name="capture-store-writer", daemon=True
+        )
+        self._thread.start()
+
+    def append(
+        self,
+        record: dict[str, Any],
+        *,
+        raw_json: bytes | str | None = None,
+        parsed_json: Any = None,
+    ) -> None:
+        # The record's "json" field is taken from raw_json when possible, so
+        # the response body is copied into the segment instead of re-encoded.
+        if self._thread is None:
+            raise RuntimeError("Capture store is not started")
+        self._queue.put((record, raw_json, parsed_json))
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval_seconds)
+                except queue.Empty:
+                    self._flush()
+                    self._rotate_if_expired()
+                    continue
+
+                batch = [item]
+                while len(batch) < WRITER_BATCH_MAX_RECORDS:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                should_stop = False
+                for batch_item in batch:
+                    if batch_item is _STOP:
+                        should_stop = True
+                        continue
+                    self._write_record(*batch_item)
+                self._flush()
+                if should_stop:
+                    break
+        except BaseException as error:
+            self.error = error
+        finally:
+            self._close_segment()
+            if self._index_file is not None:
+                self._index_file.flush()
+                os.fsync(self._index_file.fileno())
+                self._index_file.close()
+                self._index_file = None
+
+    def _write_record(
+        self,
+        record: dict[str, Any],
+        raw_json: bytes | str | None,
+        parsed_json: Any,
+    ) -> None:
+        line = encode_capture_line(record, raw_json, parsed_json)
+        if self._segment_file is not None and (
+            self._segment_size + len(line) > self.segment_max_bytes
+        ):
+            self._close_segment()
+        self._rotate_if_expired()
+        if self._segment_file is None:
+            self._open_segment()
+
+        offset = self._segment_size
+        self._segment_file.write(line)
+        self._segment_size += len(line)
+        self.written_record_count += 1
+
+        entry = CaptureIndexEntry(
+            request_id=str(record.get("requestId", "")),
+            url=str(record.get("url", "")),
+            segment=self._segment_name,
+            offset=offset,
+            length=len(line),
+            captured_at=str(record.get("capturedAt", "")),
+        )
+        self._index_file.write(json_codec.dumps_bytes(entry.to_json()) + b"\n")
+
+    def _open_segment(self) -> None:
+        self.segment_count += 1
+        opened_at = time.time()
+        self._segment_name = (
+            f"{SEGMENT_FILENAME_PREFIX}"
+            f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(opened_at))}_"
+            f"{self.segment_count:05d}{SEGMENT_FILENAME_SUFFIX}"
+        )
+        self._segment_file = (self.output_dir / self._segment_name).open("xb")
+        self._segment_size = 0
+        self._segment_opened_at = opened_at
+
+    def _rotate_if_expired(self) -> None:
+        if self._segment_file is None:
+            return
+        if time.time() - self._segment_opened_at >= self.segment_max_age_seconds:
+            self._close_segment()
+
+    def _flush(self) -> None:
+        if self._segment_file is not None:
+            self._segment_file.flush()
+        if self._index_file is not None:
+            self._index_file.flush()
+
+    def _close_segment(self) -> None:
+        if self._segment_file is None:
+            return
+        self._segment_file.flush()
+        os.fsync(self._segment_file.fileno())
+        self._segment_file.close()
+        self._segment_file = None
+
+
+def encode_capture_line(
+    record: dict[str, Any],
+    raw_json: bytes | str | None,
+    parsed_json: Any,
+) -> bytes:
+    if raw_json is not None:
+        raw_bytes = raw_json.encode("utf-8") if isinstance(raw_json, str) else raw_json
+        # Pretty-printed bodies would break the one-record-per-line format.
+        if b"\n" not in raw_bytes and b"\r" not in raw_bytes:
+            return b"".join(
+                (json_codec.dumps_bytes(record)[:-1], b',"json":', raw_bytes, b"}\n")
+            )
+    return json_codec.dumps_bytes({**record, "json": parsed_json}) + b"\n"
+
+
+def read_capture_index(output_dir: Path) -> list[CaptureIndexEntry]:
+    index_path = output_dir / INDEX_FILENAME
+    if not index_path.exists():
+        return []
+
+    entries: list[CaptureIndexEntry] = []
+    with index_path.open("rb") as index_file:
+        for line in index_file:
+            try:
+                entries.append(CaptureIndexEntry.from_json(json_codec.loads(line)))
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                # A crash can leave a torn last line; everything before it is valid.
+                continue
+    return entries
+
+
+def read_capture_record(
+    output_dir: Path, entry: CaptureIndexEntry
+) -> dict[str, Any]:
+    with (output_dir / entry.segment).open("rb") as segment_file:
+        segment_file.seek(entry.offset)
+        return json_codec.loads(segment_file.read(entry.length))
+
+
+def find_capture_record(
+    output_dir: Path,
+    *,
+    request_id: str | None = None,
+    url: str | None = None,
+) -> dict[str, Any] | None:
+    for entry in reversed(read_capture_index(output_dir)):
+        if request_id is not None and entry.request_id != request_id:
+            continue
+        if url is not None and entry.url != url:
+            continue
+        return read_capture_record(output_dir, entry)
+    return None
+
+
+def iter_capture_files(capture_dir: Path) -> list[Path]:
+    # Covers both NDJSON segments and the older one-JSON-file-per-response
+    # layout. Both embed a timestamp in the name, so name order is capture order.
+    return sorted(
+        path
+        for path in capture_dir.rglob("*")
+        if path.is_file()
+        and (
+            (
+                path.name.startswith(SEGMENT_FILENAME_PREFIX)
+                and path.name.endswith(SEGMENT_FILENAME_SUFFIX)
+            )
+            or path.suffix == ".json"
+        )
+    )
+
+
+def read_capture_file(path: Path) -> list[dict[str, Any]]:
+    records: list[dict[str, Any]] = []
+    with path.open("rb") as capture_file:
+        for line in capture_file:
+            if not line.strip():
+                continue
+            try:
+                record = json_codec.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and "json" in record:
+                records.append(record)
+    return records
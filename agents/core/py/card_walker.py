@@ -0,0 +1,131 @@
+import asyncio
+from dataclasses import dataclass
+
+from cdp_capture import JuiceboxProfileCdpCapture
+
+PROFILE_CARD_SELECTORS = (
+    "[data-testid*='profile-card']",
+    "[data-testid*='candidate-card']",
+    "[data-testid*='search-result']",
+    "[class*='ProfileCard']",
+    "[class*='profile-card']",
+    "[class*='CandidateCard']",
+)
+# Hidden cards are recognised by their badge or a flag on the card itself,
+# never by card text: "Hidden Road" is a company, not a hidden candidate.
+HIDDEN_CARD_BADGE_SELECTOR = ", ".join(
+    (
+        "[data-testid*='hidden-badge']",
+        "[data-testid*='hidden-indicator']",
+        "[class*='HiddenBadge']",
+        "[class*='hidden-badge']",
+    )
+)
+HIDDEN_CARD_ATTRIBUTES = ("data-hidden", "data-is-hidden")
+# Click near the top-left of the card (avatar/name) so we never land on the
+# hide button, which sits on the right edge of the card.
+CARD_CLICK_POSITION = {"x": 24, "y": 24}
+CARD_PROFILE_RESPONSE_TIMEOUT_SECONDS = 8
+CARD_WALKER_MAX_CONSECUTIVE_MISSES = 3
+# A selector that matches only a fraction of the page's results hit wrappers
+# or a lazily rendered subset, not one element per card.
+CARD_WALKER_MIN_RESULTS_FRACTION = 0.5
+
+
+@dataclass(slots=True)
+class CardWalkResult:
+    card_count: int = 0
+    clicked_count: int = 0
+    captured_count: int = 0
+    skipped_hidden_count: int = 0
+    # Candidates in the page results response the cards were rendered from.
+    results_count: int | None = None
+    stalled: bool = False
+
+
+def falls_short_of_results(card_count: int, results_count: int | None) -> bool:
+    if not results_count:
+        return False
+    return card_count < results_count * CARD_WALKER_MIN_RESULTS_FRACTION
+
+
+async def find_profile_cards(page, results_count: int | None = None):
+    # The first selector that matches roughly one element per result wins;
+    # without a results count, the first that matches anything.
+    fallback = None
+    for selector in PROFILE_CARD_SELECTORS:
+        locator = page.locator(selector)
+        card_count = await locator.count()
+        if card_count == 0:
+            continue
+        if not falls_short_of_results(card_count, results_count):
+            return locator
+        if fallback is None:
+            fallback = locator
+    return fallback
+
+
+async def is_hidden_card(card) -> bool:
+    for attribute in HIDDEN_CARD_ATTRIBUTES:
+        value = await card.get_attribute(attribute)
+        # A bare boolean attribute reads as "".
+        if value is not None and value.lower() in ("", "true"):
+            return True
+    return await card.locator(HIDDEN_CARD_BADGE_SELECTOR).count() > 0
+
+
+async def walk_profile_cards(
+    page,
+    capture: JuiceboxProfileCdpCapture,
+    response_timeout_seconds: float = CARD_PROFILE_RESPONSE_TIMEOUT_SECONDS,
+) -> CardWalkResult:
+    result = CardWalkResult(results_count=capture.page_results_count(page))
+    cards = await find_profile_cards(page, result.results_count)
+    if cards is None:
+        return result
+
+    result.card_count = await cards.count()
+    consecutive_misses = 0
+    loop = asyncio.get_running_loop()
+
+    for card_index in range(result.card_count):
+        card = cards.nth(card_index)
+        try:
+            if not await card.is_visible():
+                continue
+
+            if await is_hidden_card(card):
+                result.skipped_hidden_count += 1
+                continue
+
+            await card.scroll_into_view_if_needed()
+            clicked_at = loop.time()
+            await card.click(position=CARD_CLICK_POSITION, timeout=5_000)
+        except Exception:
+            consecutive_misses += 1
+            if consecutive_misses >= CARD_WALKER_MAX_CONSECUTIVE_MISSES:
+                result.stalled = True
+                break
+            continue
+
+        result.clicked_count += 1
+        did_capture = await capture.wait_for_profile_response(
+            after=clicked_at,
+            timeout_seconds=response_timeout_seconds,
+            page=page,
+        )
+        capture.raise_if_failed()
+        if did_capture:
+            result.captured_count += 1
+            consecutive_misses = 0
+            continue
+
+        consecutive_misses += 1
+        if consecutive_misses >= CARD_WALKER_MAX_CONSECUTIVE_MISSES:
+            result.stalled = True
+            break
+
+    walked_count = result.clicked_count + result.skipped_hidden_count
+    if falls_short_of_results(walked_count, result.results_count):
+        result.stalled = True
+    return result
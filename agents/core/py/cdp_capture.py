@@ -1,35 +1,252 @@
 import asyncio
 import base64
 import json
+import time
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from functools import partial
 from inspect import isawaitable
 from pathlib import Path
 from typing import Any
 
-from playwright.async_api import Browser, CDPSession, async_playwright
+from playwright.async_api import BrowserContext, CDPSession, Frame, Page
+
+import json_codec
+from candidate_dedup import (
+    CandidateDedupIndex,
+    candidate_identities,
+    candidate_identity,
+)
+from candidate_diff import CANDIDATE_UNCHANGED, CandidateDiffStore
+from candidate_projection import CandidateProjector
+from candidate_sink import CandidateContext, CandidateSink
+from candidate_stream import (
+    DEFAULT_STREAM_MAX_LATENCY_MS,
+    DEFAULT_STREAM_MAX_QUEUED,
+    CandidateStream,
+)
+from capture_store import NdjsonCaptureStore
+from cdp_connection import CdpConnection, CdpConnectionError
+from page_requests import (
+    PageRequestTemplate,
+    build_page_fetch_expression,
+    build_page_request,
+    replayable_headers,
+)
+from pagination import (
+    PaginationInfo,
+    extract_empty_page_pagination,
+    extract_pagination,
+)
+from phase_timings import PhaseTimings
+from request_trace import PendingRequestTable, RequestTimeline, RequestTraceRecorder
+
+# Extraction helpers are re-exported for existing `from cdp_capture import ...` users.
+from profile_extract import (  # noqa: F401
+    CANDIDATE_HINT_KEYS,
+    PREFERRED_CANDIDATE_KEYS,
+    PROFILE_WRAPPER_KEYS,
+    ProfileExtractor,
+    extract_page_results,
+    extract_page_results_path,
+    find_page_results,
+    find_profile_payloads,
+    list_looks_like_candidates,
+    looks_like_candidate_dict,
+)
 
 JsonDict = dict[str, Any]
-ProfilePayloadCallback = Callable[[Any], Awaitable[None] | None]
+# Called with the emitted record and the payload it was projected from; the
+# two are the same object when fields are not projected.
+ProfilePayloadCallback = Callable[[Any, Any], Awaitable[None] | None]
+
+DEFAULT_FETCH_WORKER_COUNT = 4
+DEFAULT_MAX_QUEUED_RESPONSES = 256
+STOP_DRAIN_TIMEOUT_SECONDS = 30
+
+
+@dataclass(slots=True)
+class TargetCaptureStats:
+    target_id: str
+    target_type: str
+    url: str
+    api_request_count: int = 0
+    profile_match_count: int = 0
+    saved_profile_count: int = 0
+    emitted_candidate_count: int = 0
+
+
+@dataclass(slots=True)
+class CaptureTarget:
+    target_id: str
+    session: CDPSession
+    stats: TargetCaptureStats
+    page: Page
+
+
+@dataclass(slots=True)
+class PendingProfileRequest:
+    url: str
+    started_at: float
+    target: CaptureTarget
+    request_id: str
+    timeline: RequestTimeline
+    request_template: PageRequestTemplate | None = None
+    has_post_data: bool = False
+    response_matched: bool = False
+    # The scraper's page counter for the tab when the request was sent.
+    page_number: int | None = None
 
 
 @dataclass(slots=True)
 class CaptureState:
-    pending_profile_requests: dict[str, str] = field(default_factory=dict)
+    pending_profile_requests: PendingRequestTable[PendingProfileRequest] = field(
+        default_factory=PendingRequestTable
+    )
+    page_request_template: PageRequestTemplate | None = None
+    target_stats: dict[str, TargetCaptureStats] = field(default_factory=dict)
     api_request_count: int = 0
     profile_match_count: int = 0
     saved_profile_count: int = 0
     emitted_candidate_count: int = 0
+    replayed_page_count: int = 0
+    queued_response_count: int = 0
+    max_queued_response_count: int = 0
+    in_flight_response_count: int = 0
+    dropped_response_count: int = 0
+    suppressed_duplicate_count: int = 0
+    unique_candidate_count: int = 0
+    emitted_candidate_ids: set[str] = field(default_factory=set)
+    # From the most recent page-results response.
+    pagination: PaginationInfo | None = None
+    # By the scraper's page number the response was requested under, so
+    # tabs and replays on different pages do not overwrite each other.
+    page_paginations: dict[int, PaginationInfo] = field(default_factory=dict)
+    # Set when emitted candidates are cut down to the schema's fields.
+    projector: CandidateProjector | None = None
+
 
+def capture_stats(state: CaptureState) -> JsonDict:
+    template_page_size = (
+        state.page_request_template.page_size
+        if state.page_request_template is not None
+        else None
+    )
+    return {
+        "apiRequests": state.api_request_count,
+        "searchMatches": state.profile_match_count,
+        "savedSearchResponses": state.saved_profile_count,
+        "emittedCandidates": state.emitted_candidate_count,
+        "replayedPages": state.replayed_page_count,
+        "droppedResponses": state.dropped_response_count,
+        "maxQueuedResponses": state.max_queued_response_count,
+        "suppressedDuplicates": state.suppressed_duplicate_count,
+        "pendingRequests": len(state.pending_profile_requests),
+        "evictedPendingRequests": state.pending_profile_requests.evicted_count,
+        "uniqueCandidates": state.unique_candidate_count,
+        "pagination": (
+            state.pagination.to_json(template_page_size)
+            if state.pagination is not None
+            else None
+        ),
+        **(state.projector.to_json() if state.projector is not None else {}),
+        "targets": [
+            {
+                "targetId": stats.target_id,
+                "type": stats.target_type,
+                "url": stats.url,
+                "apiRequests": stats.api_request_count,
+                "searchMatches": stats.profile_match_count,
+                "savedSearchResponses": stats.saved_profile_count,
+                "emittedCandidates": stats.emitted_candidate_count,
+            }
+            for stats in state.target_stats.values()
+        ],
+    }
+
+
+class ProfilePayloadEmitter:
+    def __init__(
+        self,
+        state: CaptureState,
+        on_profile_payload: ProfilePayloadCallback | None,
+        dedup_index: CandidateDedupIndex | None = None,
+        diff_store: CandidateDiffStore | None = None,
+        sinks: tuple[CandidateSink, ...] = (),
+    ) -> None:
+        self.state = state
+        self._on_profile_payload = on_profile_payload
+        self._dedup_index = dedup_index
+        self._diff_store = diff_store
+        self._sinks = sinks
+        self.streams: set[CandidateStream] = set()
+
+    async def emit(
+        self,
+        profile_payloads: list[dict[str, Any]],
+        context: CandidateContext | None = None,
+    ) -> None:
+        if self._on_profile_payload is None and not self.streams and not self._sinks:
+            return
+        if context is None and self._sinks:
+            context = CandidateContext(captured_at=datetime.now(timezone.utc))
 
-def decode_response_body(result: JsonDict) -> str:
+        for payload in profile_payloads:
+            # Classify before dedup can suppress anything: the diff store
+            # must see every candidate on the page, or a completed crawl
+            # tombstones the ones the cross-run index held back.
+            if (
+                self._diff_store is not None
+                and self._diff_store.classify(payload) == CANDIDATE_UNCHANGED
+            ):
+                continue
+            if self._dedup_index is not None and not self._dedup_index.add(payload):
+                self.state.suppressed_duplicate_count += 1
+                continue
+            # Dedup and diffing above need the raw payload; everything
+            # downstream only sees the projected record.
+            record = (
+                self.state.projector.project(payload)
+                if self.state.projector is not None
+                else payload
+            )
+            if self._on_profile_payload is not None:
+                callback_result = self._on_profile_payload(record, payload)
+                if isawaitable(callback_result):
+                    await callback_result
+            for sink in self._sinks:
+                sink.write(record, context)
+            for stream in tuple(self.streams):
+                await stream.put(record)
+            self.state.emitted_candidate_count += 1
+            # A search-result summary and the full profile of one candidate
+            # are both emitted but count once here.
+            identities = candidate_identities(payload) or [candidate_identity(payload)]
+            if self.state.emitted_candidate_ids.isdisjoint(identities):
+                self.state.unique_candidate_count += 1
+            self.state.emitted_candidate_ids.update(identities)
+
+    def end_streams(self) -> None:
+        for stream in self.streams:
+            stream.end()
+        self.streams.clear()
+
+
+def pending_request_key(target: CaptureTarget, request_id: str) -> str:
+    # Request ids are only unique within a target, so key them by both.
+    return f"{target.target_id}:{request_id}"
+
+
+def decode_response_body(result: JsonDict) -> bytes | str:
     body = result.get("body")
     if not isinstance(body, str):
         raise RuntimeError("Network.getResponseBody returned invalid body")
     if not result.get("base64Encoded"):
         return body
-    return base64.b64decode(body).decode("utf-8")
+    # Keep base64 bodies as bytes; the JSON codec parses them without an
+    # intermediate str copy.
+    return base64.b64decode(body)
 
 
 class JuiceboxProfileCdpCapture:
@@ -40,79 +257,542 @@ class JuiceboxProfileCdpCapture:
         output_dir: Path | None = None,
         profile_match_substring: str = "/api/profile",
         on_profile_payload: ProfilePayloadCallback | None = None,
+        connection: CdpConnection | None = None,
+        fetch_worker_count: int = DEFAULT_FETCH_WORKER_COUNT,
+        max_queued_responses: int = DEFAULT_MAX_QUEUED_RESPONSES,
+        dedup_index: CandidateDedupIndex | None = None,
+        diff_store: CandidateDiffStore | None = None,
+        timings: PhaseTimings | None = None,
+        trace_path: Path | None = None,
+        project_fields: bool = False,
+        sinks: tuple[CandidateSink, ...] = (),
     ) -> None:
+        if fetch_worker_count < 1:
+            raise ValueError("fetch_worker_count must be at least 1")
         self.cdp_url = cdp_url
         self.output_dir = output_dir
         self.profile_match_substring = profile_match_substring
-        self._on_profile_payload = on_profile_payload
-        self.state = CaptureState()
-        self._playwright = None
-        self._browser: Browser | None = None
-        self._session: CDPSession | None = None
-        self._write_lock = asyncio.Lock()
-        self._tasks: set[asyncio.Task[None]] = set()
+        self.state = CaptureState(
+            projector=CandidateProjector() if project_fields else None
+        )
+        self.trace_path = trace_path
+        self._request_trace = (
+            RequestTraceRecorder() if trace_path is not None else None
+        )
+        self.state.pending_profile_requests = PendingRequestTable(
+            on_evict=partial(self._finish_timeline, outcome="evicted")
+        )
+        self.timings = timings if timings is not None else PhaseTimings()
+        self._emitter = ProfilePayloadEmitter(
+            self.state, on_profile_payload, dedup_index, diff_store, sinks
+        )
+        self._extractor = ProfileExtractor()
+        self._owns_connection = connection is None
+        self._connection = connection or CdpConnection(cdp_url)
+        self._targets: dict[str, CaptureTarget] = {}
+        self._primary_target: CaptureTarget | None = None
+        self._watched_contexts: list[BrowserContext] = []
+        self._attach_tasks: set[asyncio.Task[None]] = set()
+        self._page_attach_tasks: dict[Page, asyncio.Task[CaptureTarget | None]] = {}
+        self._closed = False
+        self._store: NdjsonCaptureStore | None = None
+        self._fetch_worker_count = fetch_worker_count
+        self._response_queue: asyncio.Queue[PendingProfileRequest] = asyncio.Queue(
+            maxsize=max_queued_responses
+        )
+        self._workers: set[asyncio.Task[None]] = set()
         self._task_error: BaseException | None = None
+        self._response_waiters: list[
+            tuple[float, bool, Page | None, asyncio.Future[None]]
+        ] = []
+        self._last_response_started_at: float | None = None
+        self._last_page_results_started_at: float | None = None
+        self._saved_count_waiters: list[tuple[int, asyncio.Future[None]]] = []
+        self._last_started_at_by_page: dict[tuple[Page, bool], float] = {}
+        self._page_numbers: dict[Page, int | None] = {}
 
     async def start(self) -> None:
         try:
             if self.output_dir is not None:
-                self.output_dir.mkdir(parents=True, exist_ok=True)
+                self._store = NdjsonCaptureStore(self.output_dir)
+                self._store.start()
+
+            await self._attach_all_targets()
+            self._connection.add_reconnect_callback(self._on_reconnect)
+            for _ in range(self._fetch_worker_count):
+                self._track_task(asyncio.create_task(self._run_fetch_worker()))
+        except Exception:
+            await self._close_resources()
+            raise
 
-            self._playwright = await async_playwright().start()
-            self._browser = await self._playwright.chromium.connect_over_cdp(
-                self.cdp_url
+    async def _attach_all_targets(self) -> None:
+        browser = await self._connection.browser()
+        if not browser.contexts:
+            raise CdpConnectionError(
+                "No browser context found over CDP. Open the Core page first."
             )
-            if not self._browser.contexts:
-                raise RuntimeError(
-                    "No browser context found over CDP. Open the Core page first."
-                )
 
-            context = self._browser.contexts[0]
-            open_pages = [page for page in context.pages if not page.is_closed()]
-            if not open_pages:
-                raise RuntimeError(
-                    "No open page found in first context. Open the Core page first."
-                )
+        open_pages = [
+            page for page in browser.contexts[0].pages if not page.is_closed()
+        ]
+        if not open_pages:
+            raise CdpConnectionError(
+                "No open page found in first context. Open the Core page first."
+            )
+
+        for context in browser.contexts:
+            context.on("page", self._on_new_page)
+            self._watched_contexts.append(context)
+            for page in context.pages:
+                if page.is_closed():
+                    continue
+                target = await self._attach_page_once(page)
+                if page is open_pages[-1]:
+                    self._primary_target = target
+
+        if self._primary_target is None:
+            raise CdpConnectionError("Failed to attach CDP capture to the active page")
+
+    def _on_new_page(self, page: Page) -> None:
+        if self._closed:
+            return
+        self._attach_page_once(page)
+
+    def _attach_page_once(self, page: Page) -> asyncio.Task[CaptureTarget | None]:
+        # The context "page" event and ensure_page_attached() can race for
+        # the same tab; both share a single attach task.
+        task = self._page_attach_tasks.get(page)
+        if task is None:
+            task = asyncio.create_task(self._attach_page(page))
+            self._page_attach_tasks[page] = task
+        return task
+
+    async def ensure_page_attached(self, page: Page) -> CaptureTarget | None:
+        if self._closed:
+            raise RuntimeError("CDP capture is stopped")
+        return await asyncio.shield(self._attach_page_once(page))
 
-            page = open_pages[-1]
-            self._session = await context.new_cdp_session(page)
-            self._session.on("Network.responseReceived", self._on_response_received)
-            self._session.on("Network.loadingFinished", self._on_loading_finished)
-            self._session.on("Network.loadingFailed", self._on_loading_failed)
-            await self._session.send("Network.enable")
+    def _on_frame_attached(self, frame: Frame) -> None:
+        if self._closed:
+            return
+        task = asyncio.create_task(self._attach_frame(frame))
+        self._attach_tasks.add(task)
+        task.add_done_callback(self._attach_tasks.discard)
+
+    async def _attach_page(self, page: Page) -> CaptureTarget | None:
+        try:
+            target = await self._attach_target(page, "page")
+        except Exception as error:
+            # Pages can close between the event and the attach; that is fine.
+            if not page.is_closed():
+                print(f"[CDP] Failed to attach to page {page.url}: {error}", flush=True)
+            self._page_attach_tasks.pop(page, None)
+            return None
+        page.on("frameattached", self._on_frame_attached)
+        page.on("close", self._on_page_closed)
+        # Workers are not attached. Playwright's new_cdp_session only takes a
+        # Page or a Frame, so page.on("worker") and context.on("serviceworker")
+        # hand us objects we cannot open a session on. Juicebox requests its
+        # results from page script, and a fetch a service worker answers or
+        # passes through still shows up on the page's own Network events. Only
+        # requests a worker starts on its own would be missed.
+        for frame in page.frames[1:]:
+            await self._attach_frame(frame)
+        return target
+
+    async def _attach_frame(self, frame: Frame) -> None:
+        # Only out-of-process iframes get their own target; requests from
+        # in-process frames already arrive on the page session.
+        try:
+            await self._attach_target(frame, "iframe")
         except Exception:
-            await self._close_resources()
-            raise
+            return
+
+    async def _attach_target(
+        self, page_or_frame: Page | Frame, target_type: str
+    ) -> CaptureTarget:
+        page = page_or_frame if isinstance(page_or_frame, Page) else page_or_frame.page
+        session = await page.context.new_cdp_session(page_or_frame)
+        target_info = (await session.send("Target.getTargetInfo")).get("targetInfo", {})
+        target_id = str(target_info.get("targetId") or id(page_or_frame))
+        existing_target = self._targets.get(target_id)
+        if existing_target is not None:
+            await session.detach()
+            return existing_target
+
+        stats = self.state.target_stats.get(target_id) or TargetCaptureStats(
+            target_id=target_id,
+            target_type=str(target_info.get("type") or target_type),
+            url=str(target_info.get("url") or page_or_frame.url),
+        )
+        self.state.target_stats[target_id] = stats
+        target = CaptureTarget(
+            target_id=target_id, session=session, stats=stats, page=page
+        )
+        self._targets[target_id] = target
+        session.on(
+            "Network.requestWillBeSent", partial(self._on_request_will_be_sent, target)
+        )
+        session.on(
+            "Network.responseReceived", partial(self._on_response_received, target)
+        )
+        session.on("Network.loadingFinished", partial(self._on_loading_finished, target))
+        session.on("Network.loadingFailed", partial(self._on_loading_failed, target))
+        await session.send("Network.enable")
+        return target
+
+    def _on_page_closed(self, page: Page) -> None:
+        self._page_attach_tasks.pop(page, None)
+        self._page_numbers.pop(page, None)
+        self._last_started_at_by_page.pop((page, False), None)
+        self._last_started_at_by_page.pop((page, True), None)
+        closed_target_ids = {
+            target_id for target_id, target in self._targets.items() if target.page is page
+        }
+        for target_id in closed_target_ids:
+            del self._targets[target_id]
+        for request_key, pending_request in list(
+            self.state.pending_profile_requests.items()
+        ):
+            if pending_request.target.target_id in closed_target_ids:
+                del self.state.pending_profile_requests[request_key]
+                self._finish_timeline(pending_request, "targetClosed")
+
+    async def _on_reconnect(self) -> None:
+        # In-flight request ids belong to the dropped session and can no
+        # longer be fetched, so start the new session with a clean slate.
+        for pending_request in self.state.pending_profile_requests.values():
+            self._finish_timeline(pending_request, "reconnected")
+        self.state.pending_profile_requests.clear()
+        self._unwatch_contexts()
+        self._page_attach_tasks.clear()
+        self._targets.clear()
+        self._primary_target = None
+        try:
+            await self._attach_all_targets()
+        except Exception as error:
+            if self._task_error is None:
+                self._task_error = error
 
     async def stop(self) -> None:
         stop_error: Exception | None = None
         try:
-            if self._tasks:
-                await asyncio.gather(*self._tasks)
-            self._tasks.clear()
+            await self._drain_response_queue()
             self.raise_if_failed()
         except Exception as error:
             stop_error = error
         finally:
             await self._close_resources()
+            self._emitter.end_streams()
+            await self._write_request_trace()
 
         if stop_error is not None:
             raise stop_error
 
+    async def _write_request_trace(self) -> None:
+        if self._request_trace is None or self.trace_path is None:
+            return
+        for pending_request in self.state.pending_profile_requests.values():
+            self._finish_timeline(pending_request, "unfinished")
+        try:
+            await asyncio.to_thread(self._request_trace.write, self.trace_path)
+        except OSError as error:
+            print(f"[CDP] Could not write request trace: {error}", flush=True)
+            return
+        print(f"[CDP] Request trace written to {self.trace_path}", flush=True)
+
+    def _finish_timeline(
+        self, pending_request: PendingProfileRequest, outcome: str
+    ) -> None:
+        pending_request.timeline.outcome = outcome
+        if self._request_trace is not None:
+            self._request_trace.record(pending_request.timeline)
+
+    def stream(
+        self,
+        *,
+        batch_size: int | None = None,
+        max_latency_ms: float = DEFAULT_STREAM_MAX_LATENCY_MS,
+        max_queued: int = DEFAULT_STREAM_MAX_QUEUED,
+    ) -> CandidateStream:
+        # `async for candidate in capture.stream()` yields each emitted
+        # candidate; with batch_size it yields lists of up to that many,
+        # waiting at most max_latency_ms after the first. The stream ends
+        # when the capture stops or a fetch worker fails; call
+        # raise_if_failed() afterwards to tell the two apart.
+        stream = CandidateStream(
+            batch_size=batch_size,
+            max_latency_ms=max_latency_ms,
+            max_queued=max_queued,
+            on_close=self._emitter.streams.discard,
+        )
+        if self._closed or self._task_error is not None:
+            stream.end()
+        else:
+            self._emitter.streams.add(stream)
+        return stream
+
     def raise_if_failed(self) -> None:
         if self._task_error is not None:
             raise RuntimeError("CDP profile capture task failed") from self._task_error
+        if self._store is not None and self._store.error is not None:
+            raise RuntimeError("CDP capture store writer failed") from self._store.error
+
+    async def wait_for_profile_response(
+        self,
+        *,
+        after: float,
+        timeout_seconds: float,
+        page_results: bool = False,
+        page: Page | None = None,
+    ) -> bool:
+        # Pass page when several tabs are driven at once, so a response from
+        # another tab does not satisfy this wait.
+        # The response may already have been processed while the caller was
+        # still awaiting the click that triggered it.
+        if page is not None:
+            last_started_at = self._last_started_at_by_page.get((page, page_results))
+        elif page_results:
+            last_started_at = self._last_page_results_started_at
+        else:
+            last_started_at = self._last_response_started_at
+        if last_started_at is not None and last_started_at >= after:
+            return True
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (after, page_results, page, waiter)
+        self._response_waiters.append(entry)
+        try:
+            await asyncio.wait_for(waiter, timeout_seconds)
+            return True
+        except TimeoutError:
+            return False
+        finally:
+            if entry in self._response_waiters:
+                self._response_waiters.remove(entry)
+
+    async def wait_for_saved_profiles(self, count: int) -> None:
+        # Wakes on every saved response, including ones that yield no new
+        # candidates, which a candidate stream never sees.
+        if self.state.saved_profile_count >= count:
+            return
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (count, waiter)
+        self._saved_count_waiters.append(entry)
+        try:
+            await waiter
+        finally:
+            if entry in self._saved_count_waiters:
+                self._saved_count_waiters.remove(entry)
+
+    def _notify_saved_count_waiters(self) -> None:
+        for count, waiter in list(self._saved_count_waiters):
+            if not waiter.done() and self.state.saved_profile_count >= count:
+                waiter.set_result(None)
+
+    async def flush(self, timeout_seconds: float) -> bool:
+        # Waits until every response queued so far has been processed and
+        # emitted; returns False if that takes longer than the timeout.
+        try:
+            await asyncio.wait_for(self._response_queue.join(), timeout_seconds)
+        except TimeoutError:
+            return False
+        self.raise_if_failed()
+        return True
+
+    def results_page_count(self) -> int | None:
+        # Total results pages as reported (or implied) by the API, if known.
+        if self.state.pagination is None:
+            return None
+        return self.state.pagination.page_count(self._template_page_size())
+
+    def is_last_results_page(self, page_number: int) -> bool:
+        pagination = self.state.page_paginations.get(page_number)
+        if pagination is None:
+            return False
+        return pagination.is_last_page(page_number, self._template_page_size())
+
+    def page_results_count(self, page: Page) -> int | None:
+        # Candidates in the results response for the page the tab shows,
+        # which is what its cards were rendered from.
+        page_number = self._page_numbers.get(page)
+        if page_number is None:
+            return None
+        pagination = self.state.page_paginations.get(page_number)
+        return pagination.results_count if pagination is not None else None
+
+    def _template_page_size(self) -> int | None:
+        template = self.state.page_request_template
+        return template.page_size if template is not None else None
+
+    def set_page_number(self, page: Page, page_number: int | None) -> None:
+        # The scraper's own results page counter for a tab, set before it
+        # navigates. Responses are attributed to the counter their request
+        # was sent under, not to the API's pagination, which can be 0-based,
+        # missing, or from another tab.
+        self._page_numbers[page] = page_number
+
+    async def reload_page(self) -> None:
+        if self._primary_target is None:
+            raise RuntimeError("CDP capture is not started")
+        await self._primary_target.session.send("Page.reload", {"ignoreCache": False})
+
+    async def replay_page_request(
+        self,
+        page_number: int,
+        *,
+        timeout_seconds: float,
+        template_page_number: int = 1,
+    ) -> bool:
+        template = self.state.page_request_template
+        if self._primary_target is None or template is None:
+            return False
+
+        request = build_page_request(template, page_number, template_page_number)
+        if request is None:
+            return False
+
+        # The fetch runs in the primary tab, which stays on the page it
+        # shows; only the replayed request is counted as page_number.
+        target = self._primary_target
+        shown_page_number = self._page_numbers.get(target.page)
+        self._page_numbers[target.page] = page_number
+        try:
+            return await self._replay_page_request(
+                target, request, timeout_seconds=timeout_seconds
+            )
+        finally:
+            self._page_numbers[target.page] = shown_page_number
+
+    async def _replay_page_request(
+        self,
+        target: CaptureTarget,
+        request: PageRequestTemplate,
+        *,
+        timeout_seconds: float,
+    ) -> bool:
+        started_at = asyncio.get_running_loop().time()
+        try:
+            result = await target.session.send(
+                "Runtime.evaluate",
+                {
+                    "expression": build_page_fetch_expression(request),
+                    "awaitPromise": True,
+                    "returnByValue": True,
+                },
+            )
+        except Exception:
+            return False
+
+        if result.get("exceptionDetails") is not None:
+            return False
+
+        status = result.get("result", {}).get("value")
+        if not isinstance(status, int) or status < 200 or status >= 300:
+            return False
+
+        did_capture = await self.wait_for_profile_response(
+            after=started_at,
+            timeout_seconds=timeout_seconds,
+            page_results=True,
+        )
+        if did_capture:
+            self.state.replayed_page_count += 1
+        return did_capture
+
+    async def _drain_response_queue(self) -> None:
+        try:
+            await asyncio.wait_for(
+                self._response_queue.join(), STOP_DRAIN_TIMEOUT_SECONDS
+            )
+        except TimeoutError:
+            while not self._response_queue.empty():
+                self._response_queue.get_nowait()
+                self._response_queue.task_done()
+                self.state.queued_response_count -= 1
+                self.state.dropped_response_count += 1
+            print(
+                (
+                    "[CDP] Timed out draining profile responses; "
+                    f"dropped={self.state.dropped_response_count}"
+                ),
+                flush=True,
+            )
+        finally:
+            await self._stop_workers()
+
+    async def _stop_workers(self) -> None:
+        workers = list(self._workers)
+        for worker in workers:
+            worker.cancel()
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
 
     async def _close_resources(self) -> None:
-        if self._browser is not None:
-            await self._browser.close()
-            self._browser = None
+        self._closed = True
+        await self._stop_workers()
+        if self._store is not None:
+            await asyncio.to_thread(self._store.close)
+        self._connection.remove_reconnect_callback(self._on_reconnect)
+        self._unwatch_contexts()
+        for task in [*self._attach_tasks, *self._page_attach_tasks.values()]:
+            task.cancel()
+        self._page_attach_tasks.clear()
+        targets = list(self._targets.values())
+        self._targets.clear()
+        self._primary_target = None
+        if self._owns_connection:
+            await self._connection.close()
+            return
+
+        for target in targets:
+            try:
+                await target.session.detach()
+            except Exception:
+                pass
+
+    def _unwatch_contexts(self) -> None:
+        for context in self._watched_contexts:
+            context.remove_listener("page", self._on_new_page)
+        self._watched_contexts.clear()
+
+    def _on_request_will_be_sent(self, target: CaptureTarget, params: JsonDict) -> None:
+        request_id = params.get("requestId")
+        request = params.get("request")
+        if not isinstance(request_id, str) or not isinstance(request, dict):
+            return
+
+        url = request.get("url")
+        if not isinstance(url, str) or self.profile_match_substring not in url:
+            return
 
-        if self._playwright is not None:
-            await self._playwright.stop()
-            self._playwright = None
+        method = request.get("method")
+        headers = request.get("headers")
+        post_data = request.get("postData")
+        self.state.pending_profile_requests[
+            pending_request_key(target, request_id)
+        ] = PendingProfileRequest(
+            url=url,
+            started_at=asyncio.get_running_loop().time(),
+            target=target,
+            request_id=request_id,
+            timeline=RequestTimeline(
+                url=url,
+                target_id=target.target_id,
+                requested_at=time.perf_counter(),
+            ),
+            request_template=PageRequestTemplate(
+                url=url,
+                method=method if isinstance(method, str) else "GET",
+                headers=replayable_headers(headers if isinstance(headers, dict) else {}),
+                post_data=post_data if isinstance(post_data, str) else None,
+            ),
+            has_post_data=bool(request.get("hasPostData")),
+            page_number=self._page_numbers.get(target.page),
+        )
 
-    def _on_response_received(self, params: JsonDict) -> None:
+    def _on_response_received(self, target: CaptureTarget, params: JsonDict) -> None:
         request_id = params.get("requestId")
         response = params.get("response")
         if not isinstance(request_id, str) or not isinstance(response, dict):
@@ -125,198 +805,235 @@ class JuiceboxProfileCdpCapture:
         is_api_url = "/api/" in url
         if is_api_url:
             self.state.api_request_count += 1
+            target.stats.api_request_count += 1
 
         should_capture = self.profile_match_substring in url
         if should_capture:
             self.state.profile_match_count += 1
-            self.state.pending_profile_requests[request_id] = url
+            target.stats.profile_match_count += 1
+            request_key = pending_request_key(target, request_id)
+            pending_request = self.state.pending_profile_requests.get(request_key)
+            if pending_request is None:
+                pending_request = PendingProfileRequest(
+                    url=url,
+                    started_at=asyncio.get_running_loop().time(),
+                    target=target,
+                    request_id=request_id,
+                    timeline=RequestTimeline(url=url, target_id=target.target_id),
+                    page_number=self._page_numbers.get(target.page),
+                )
+                self.state.pending_profile_requests[request_key] = pending_request
+            pending_request.url = url
+            pending_request.response_matched = True
+            pending_request.timeline.response_received_at = time.perf_counter()
 
-    def _on_loading_finished(self, params: JsonDict) -> None:
+    def _on_loading_finished(self, target: CaptureTarget, params: JsonDict) -> None:
         request_id = params.get("requestId")
         if not isinstance(request_id, str):
             return
 
-        request_url = self.state.pending_profile_requests.pop(request_id, None)
-        if request_url is None:
+        pending_request = self.state.pending_profile_requests.pop(
+            pending_request_key(target, request_id), None
+        )
+        if pending_request is None:
+            return
+        if not pending_request.response_matched:
+            self._finish_timeline(pending_request, "unmatched")
+            return
+
+        pending_request.timeline.loading_finished_at = time.perf_counter()
+        try:
+            self._response_queue.put_nowait(pending_request)
+        except asyncio.QueueFull:
+            self.state.dropped_response_count += 1
+            self._finish_timeline(pending_request, "dropped")
             return
 
-        task = asyncio.create_task(self._save_profile_response(request_id, request_url))
-        self._track_task(task)
+        self.state.queued_response_count += 1
+        self.state.max_queued_response_count = max(
+            self.state.max_queued_response_count, self.state.queued_response_count
+        )
 
-    def _on_loading_failed(self, params: JsonDict) -> None:
+    def _on_loading_failed(self, target: CaptureTarget, params: JsonDict) -> None:
         request_id = params.get("requestId")
-        if isinstance(request_id, str):
-            self.state.pending_profile_requests.pop(request_id, None)
+        if not isinstance(request_id, str):
+            return
+        pending_request = self.state.pending_profile_requests.pop(
+            pending_request_key(target, request_id), None
+        )
+        if pending_request is not None:
+            self._finish_timeline(pending_request, "loadingFailed")
 
-    async def _save_profile_response(self, request_id: str, request_url: str) -> None:
-        if self._session is None:
-            raise RuntimeError("CDP capture is not started")
+    async def _run_fetch_worker(self) -> None:
+        while True:
+            pending_request = await self._response_queue.get()
+            timeline = pending_request.timeline
+            timeline.fetch_started_at = time.perf_counter()
+            self.timings.record(
+                "responseQueueWait",
+                timeline.fetch_started_at - timeline.loading_finished_at,
+            )
+            self.state.queued_response_count -= 1
+            self.state.in_flight_response_count += 1
+            outcome = "cancelled"
+            try:
+                outcome = await self._save_profile_response(pending_request)
+            except Exception as error:
+                outcome = "failed"
+                if self._task_error is None:
+                    self._task_error = error
+                self._emitter.end_streams()
+            finally:
+                self._finish_timeline(pending_request, outcome)
+                self.state.in_flight_response_count -= 1
+                self._response_queue.task_done()
 
+    async def _save_profile_response(self, pending_request: PendingProfileRequest) -> str:
+        # Returns the outcome recorded on the request's timeline.
+        request_id = pending_request.request_id
+        request_url = pending_request.url
+        target = pending_request.target
+        timeline = pending_request.timeline
+
+        # perf_counter pairs rather than PhaseTimings.measure: this runs once
+        # per response and the context manager would double the overhead.
+        timings = self.timings
+        started_at = time.perf_counter()
         try:
-            result = await self._session.send(
+            result = await target.session.send(
                 "Network.getResponseBody", {"requestId": request_id}
             )
-            text = decode_response_body(result)
+            fetched_at = timeline.body_fetched_at = time.perf_counter()
+            timings.record("getResponseBody", fetched_at - started_at)
+            body = decode_response_body(result)
         except Exception:
-            return
+            return "bodyUnavailable"
+        decoded_at = time.perf_counter()
+        timings.record("decodeResponseBody", decoded_at - fetched_at)
 
         try:
-            parsed_json: Any = json.loads(text)
-        except json.JSONDecodeError:
-            return
+            parsed_json: Any = json_codec.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return "invalidJson"
+        parsed_at = timeline.parsed_at = time.perf_counter()
+        timings.record("parseResponseJson", parsed_at - decoded_at)
 
         captured_at = datetime.now(timezone.utc)
-        profile_payloads = find_profile_payloads(parsed_json)
+        profile_payloads = self._extractor.extract(parsed_json, request_url)
+        found_page_results = extract_page_results_path(parsed_json)
+        page_results = found_page_results[1] if found_page_results else None
+        if found_page_results is not None:
+            pagination = extract_pagination(parsed_json, *found_page_results)
+        elif not profile_payloads:
+            pagination = extract_empty_page_pagination(parsed_json)
+        else:
+            pagination = None
+        if pagination is not None:
+            self.state.pagination = pagination
+            if pending_request.page_number is not None:
+                self.state.page_paginations[pending_request.page_number] = pagination
+        extracted_at = time.perf_counter()
+        timings.record("extractProfiles", extracted_at - parsed_at)
+        if page_results is not None and self.state.page_request_template is None:
+            await self._learn_page_request_template(pending_request, len(page_results))
 
-        if self._on_profile_payload is not None:
-            for payload in profile_payloads:
-                callback_result = self._on_profile_payload(payload)
-                if isawaitable(callback_result):
-                    await callback_result
-                self.state.emitted_candidate_count += 1
-
-        if self.output_dir is not None:
-            record: JsonDict = {
-                "capturedAt": captured_at.isoformat(),
-                "requestId": request_id,
-                "url": request_url,
-                "json": parsed_json,
-            }
+        emit_started_at = time.perf_counter()
+        emitted_before = self.state.emitted_candidate_count
+        await self._emitter.emit(
+            profile_payloads,
+            CandidateContext(
+                captured_at=captured_at, page_number=pending_request.page_number
+            ),
+        )
+        target.stats.emitted_candidate_count += (
+            self.state.emitted_candidate_count - emitted_before
+        )
+        timeline.emitted_at = time.perf_counter()
+        timings.record("emitCandidates", timeline.emitted_at - emit_started_at)
 
-            safe_request_id = "".join(
-                character if (character.isalnum() or character in {"_", "-"}) else "_"
-                for character in request_id
-            )
-            filename = (
-                f"{captured_at.strftime('%Y%m%dT%H%M%S_%fZ')}_{safe_request_id}.json"
+        if self._store is not None:
+            self._store.append(
+                {
+                    "capturedAt": captured_at.isoformat(),
+                    "requestId": request_id,
+                    "url": request_url,
+                },
+                raw_json=body,
+                parsed_json=parsed_json,
             )
-            output_path = self.output_dir / filename
-
-            async with self._write_lock:
-                with output_path.open("x", encoding="utf-8") as output_file:
-                    output_file.write(json.dumps(record, ensure_ascii=True))
-                    output_file.write("\n")
 
         self.state.saved_profile_count += 1
+        target.stats.saved_profile_count += 1
+        self._notify_saved_count_waiters()
+        self._notify_response_waiters(
+            pending_request.started_at, pagination is not None, target.page
+        )
+        return "emitted"
+
+    async def _learn_page_request_template(
+        self,
+        pending_request: PendingProfileRequest,
+        page_size: int,
+    ) -> None:
+        template = pending_request.request_template
+        if template is None:
+            return
+
+        if pending_request.has_post_data and template.post_data is None:
+            try:
+                result = await pending_request.target.session.send(
+                    "Network.getRequestPostData",
+                    {"requestId": pending_request.request_id},
+                )
+            except Exception:
+                return
+            post_data = result.get("postData")
+            if not isinstance(post_data, str):
+                return
+            template.post_data = post_data
+
+        template.page_size = page_size or None
+        self.state.page_request_template = template
+
+    def _notify_response_waiters(
+        self, started_at: float, is_page_results: bool, page: Page | None
+    ) -> None:
+        self._last_response_started_at = max(
+            started_at, self._last_response_started_at or started_at
+        )
+        if is_page_results:
+            self._last_page_results_started_at = max(
+                started_at, self._last_page_results_started_at or started_at
+            )
+        if page is not None:
+            page_keys = [(page, False), (page, True)] if is_page_results else [(page, False)]
+            for key in page_keys:
+                self._last_started_at_by_page[key] = max(
+                    started_at, self._last_started_at_by_page.get(key, started_at)
+                )
+        for after, page_results_only, waiter_page, waiter in list(
+            self._response_waiters
+        ):
+            if waiter.done() or started_at < after:
+                continue
+            if page_results_only and not is_page_results:
+                continue
+            if waiter_page is not None and waiter_page is not page:
+                continue
+            waiter.set_result(None)
 
     def _track_task(self, task: asyncio.Task[None]) -> None:
-        self._tasks.add(task)
+        self._workers.add(task)
         task.add_done_callback(self._on_task_done)
 
     def _on_task_done(self, task: asyncio.Task[None]) -> None:
-        self._tasks.discard(task)
+        self._workers.discard(task)
         if task.cancelled():
             return
         error = task.exception()
         if error is not None and self._task_error is None:
             self._task_error = error
-
-
-PREFERRED_CANDIDATE_KEYS = (
-    "pageResults",
-    "profiles",
-    "candidates",
-    "results",
-    "contacts",
-    "items",
-)
-CANDIDATE_HINT_KEYS = {
-    "name",
-    "fullName",
-    "firstName",
-    "lastName",
-    "headline",
-    "title",
-    "company",
-    "linkedin",
-    "linkedinUrl",
-    "email",
-    "location",
-}
-
-
-def list_looks_like_candidates(items: list[Any]) -> bool:
-    candidate_dict_count = 0
-    for item in items:
-        if not isinstance(item, dict):
-            continue
-        if any(key in item for key in CANDIDATE_HINT_KEYS):
-            return True
-        candidate_dict_count += 1
-    return candidate_dict_count > 0
-
-
-def find_page_results(payload: Any) -> list[Any] | None:
-    if isinstance(payload, dict):
-        for key in PREFERRED_CANDIDATE_KEYS:
-            maybe_items = payload.get(key)
-            if isinstance(maybe_items, list) and list_looks_like_candidates(maybe_items):
-                return maybe_items
-
-        for nested_value in payload.values():
-            nested_page_results = find_page_results(nested_value)
-            if nested_page_results is not None:
-                return nested_page_results
-        return None
-
-    if isinstance(payload, list):
-        if list_looks_like_candidates(payload):
-            return payload
-        for item in payload:
-            nested_page_results = find_page_results(item)
-            if nested_page_results is not None:
-                return nested_page_results
-        return None
-
-    return None
-
-
-PROFILE_WRAPPER_KEYS = (
-    "profile",
-    "candidate",
-    "person",
-    "contact",
-    "result",
-    "item",
-)
-
-
-def looks_like_candidate_dict(payload: Any) -> bool:
-    if not isinstance(payload, dict):
-        return False
-    return any(key in payload for key in CANDIDATE_HINT_KEYS) or "id" in payload
-
-
-def find_profile_payloads(payload: Any) -> list[dict[str, Any]]:
-    if looks_like_candidate_dict(payload):
-        return [payload]
-
-    if isinstance(payload, dict):
-        for key in PROFILE_WRAPPER_KEYS:
-            nested_payload = payload.get(key)
-            if looks_like_candidate_dict(nested_payload):
-                return [nested_payload]
-
-        page_results = find_page_results(payload)
-        if isinstance(page_results, list):
-            return [item for item in page_results if isinstance(item, dict)]
-
-        for nested_value in payload.values():
-            nested_payloads = find_profile_payloads(nested_value)
-            if nested_payloads:
-                return nested_payloads
-
-        return []
-
-    if isinstance(payload, list):
-        if list_looks_like_candidates(payload):
-            return [item for item in payload if isinstance(item, dict)]
-        for item in payload:
-            nested_payloads = find_profile_payloads(item)
-            if nested_payloads:
-                return nested_payloads
-
-    return []
+            self._emitter.end_streams()
 
 
 # Backward compatibility for any existing imports.
@@ -0,0 +1,115 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+CDP_CONNECT_MAX_ATTEMPTS = 5
+CDP_CONNECT_RETRY_SECONDS = 1
+
+ReconnectCallback = Callable[[], Awaitable[None]]
+
+
+class CdpConnectionError(RuntimeError):
+    # The browser cannot be reached or used over CDP.
+    pass
+
+
+class CdpConnection:
+    def __init__(self, cdp_url: str) -> None:
+        self.cdp_url = cdp_url
+        self.reconnect_count = 0
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._lock = asyncio.Lock()
+        self._reconnect_callbacks: list[ReconnectCallback] = []
+        self._closed = False
+
+    async def __aenter__(self) -> "CdpConnection":
+        await self.browser()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    def is_connected(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    def add_reconnect_callback(self, callback: ReconnectCallback) -> None:
+        self._reconnect_callbacks.append(callback)
+
+    def remove_reconnect_callback(self, callback: ReconnectCallback) -> None:
+        if callback in self._reconnect_callbacks:
+            self._reconnect_callbacks.remove(callback)
+
+    async def browser(self) -> Browser:
+        if self._closed:
+            raise CdpConnectionError("CDP connection is closed")
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+
+        async with self._lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+
+            is_reconnect = self._browser is not None
+            self._browser = await self._connect()
+            if not is_reconnect:
+                return self._browser
+
+            self.reconnect_count += 1
+            print(
+                f"[CDP] Reconnected to browser (reconnects={self.reconnect_count})",
+                flush=True,
+            )
+
+        for callback in list(self._reconnect_callbacks):
+            await callback()
+        return self._browser
+
+    async def first_context(self) -> BrowserContext:
+        browser = await self.browser()
+        if not browser.contexts:
+            raise CdpConnectionError("No browser contexts available over CDP")
+        return browser.contexts[0]
+
+    async def close(self) -> None:
+        self._closed = True
+        self._reconnect_callbacks.clear()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _connect(self) -> Browser:
+        connect_errors: list[str] = []
+        for attempt in range(1, CDP_CONNECT_MAX_ATTEMPTS + 1):
+            try:
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                return await self._playwright.chromium.connect_over_cdp(self.cdp_url)
+            except Exception as error:
+                connect_errors.append(f"attempt {attempt}: {error}")
+                # A failed connect can leave the driver wedged; restart it so
+                # the next attempt does not reuse a dead node subprocess.
+                await self._stop_playwright()
+                if attempt < CDP_CONNECT_MAX_ATTEMPTS:
+                    await asyncio.sleep(CDP_CONNECT_RETRY_SECONDS)
+
+        raise CdpConnectionError(
+            "Failed to connect over CDP after retries: " + " | ".join(connect_errors)
+        )
+
+    async def _stop_playwright(self) -> None:
+        if self._playwright is None:
+            return
+        try:
+            await self._playwright.stop()
+        except Exception:
+            pass
+        self._playwright = None
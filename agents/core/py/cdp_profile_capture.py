@@ -5,6 +5,9 @@ from pathlib import Path
 
 from cdp_capture import CoreProfileCdpCapture
 
+CAPTURE_STREAM_BATCH_SIZE = 50
+CAPTURE_STREAM_MAX_LATENCY_MS = 100
+
 
 async def capture_profiles(
     cdp_url: str,
@@ -25,21 +28,36 @@ async def capture_profiles(
         flush=True,
     )
 
-    loop = asyncio.get_running_loop()
-    deadline = loop.time() + duration_seconds if duration_seconds > 0 else None
+    # Waits for the first of: the deadline, --max-profiles saved responses
+    # (counted even when a response yields no new candidates), or the
+    # candidate stream ending because the capture failed.
+    timeout_seconds = duration_seconds if duration_seconds > 0 else None
     try:
-        while True:
-            capture.raise_if_failed()
-            if (
-                max_profiles is not None
-                and capture.state.saved_profile_count >= max_profiles
-            ):
-                break
+        async with capture.stream(
+            batch_size=CAPTURE_STREAM_BATCH_SIZE,
+            max_latency_ms=CAPTURE_STREAM_MAX_LATENCY_MS,
+        ) as candidate_batches:
 
-            if deadline is not None and loop.time() >= deadline:
-                break
+            async def drain_candidates() -> None:
+                async for _ in candidate_batches:
+                    pass
 
-            await asyncio.sleep(0.25)
+            waits = {asyncio.create_task(drain_candidates())}
+            if max_profiles is not None:
+                waits.add(
+                    asyncio.create_task(capture.wait_for_saved_profiles(max_profiles))
+                )
+            try:
+                await asyncio.wait(
+                    waits,
+                    timeout=timeout_seconds,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                for task in waits:
+                    task.cancel()
+                await asyncio.gather(*waits, return_exceptions=True)
+        capture.raise_if_failed()
     finally:
         await capture.stop()
         print(
@@ -77,7 +95,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--output-dir",
         required=True,
-        help="Directory for captured JSON files (one file per matched response).",
+        help="Directory for the NDJSON capture segments and their index.",
     )
     return parser.parse_args()
 
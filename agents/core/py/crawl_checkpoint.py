@@ -0,0 +1,66 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import json_codec
+from atomic_write import write_bytes_atomic
+
+CHECKPOINT_VERSION = 1
+
+
+@dataclass(slots=True)
+class CrawlCheckpoint:
+    target_url: str
+    completed_pages: int
+    # A results URL the browser showed and which page it was on, so a resume
+    # can rewrite its page parameter or walk Next from there.
+    results_url: str
+    results_url_page: int = 1
+    emitted_candidate_ids: list[str] = field(default_factory=list)
+    unique_candidate_count: int = 0
+    capture_stats: dict[str, Any] = field(default_factory=dict)
+    updated_at: str = ""
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "version": CHECKPOINT_VERSION,
+            "targetUrl": self.target_url,
+            "completedPages": self.completed_pages,
+            "resultsUrl": self.results_url,
+            "resultsUrlPage": self.results_url_page,
+            "emittedCandidateIds": self.emitted_candidate_ids,
+            "uniqueCandidates": self.unique_candidate_count,
+            "captureStats": self.capture_stats,
+            "updatedAt": self.updated_at,
+        }
+
+    @classmethod
+    def from_json(cls, value: dict[str, Any]) -> "CrawlCheckpoint":
+        version = value.get("version")
+        if version != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {version!r}")
+        return cls(
+            target_url=str(value["targetUrl"]),
+            completed_pages=int(value["completedPages"]),
+            results_url=str(value["resultsUrl"]),
+            results_url_page=int(value.get("resultsUrlPage", 1)),
+            emitted_candidate_ids=[
+                str(candidate_id)
+                for candidate_id in value.get("emittedCandidateIds", [])
+            ],
+            unique_candidate_count=int(value.get("uniqueCandidates", 0)),
+            capture_stats=dict(value.get("captureStats") or {}),
+            updated_at=str(value.get("updatedAt", "")),
+        )
+
+
+def load_checkpoint(path: Path) -> CrawlCheckpoint:
+    return CrawlCheckpoint.from_json(json_codec.loads(path.read_bytes()))
+
+
+def save_checkpoint(path: Path, checkpoint: CrawlCheckpoint) -> None:
+    # Write next to the final path and rename, so a crash mid-write leaves
+    # the previous page's checkpoint intact.
+    checkpoint.updated_at = datetime.now(timezone.utc).isoformat()
+    write_bytes_atomic(path, json_codec.dumps_bytes(checkpoint.to_json()))
@@ -0,0 +1,182 @@
+import json
+from dataclasses import dataclass, replace
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+PAGE_NUMBER_KEYS = (
+    "page",
+    "pageNumber",
+    "page_number",
+    "currentPage",
+    "current_page",
+    "pageIndex",
+    "page_index",
+)
+PAGE_OFFSET_KEYS = ("offset", "from", "start", "skip")
+PAGE_SIZE_KEYS = ("limit", "pageSize", "page_size", "size", "perPage", "per_page")
+PAGE_REQUEST_MAX_BODY_DEPTH = 4
+
+# Headers the page-context fetch() either forbids or sets on its own.
+NON_REPLAYABLE_HEADER_NAMES = {
+    "accept-encoding",
+    "connection",
+    "content-length",
+    "cookie",
+    "host",
+    "origin",
+    "referer",
+    "user-agent",
+}
+
+
+@dataclass(slots=True)
+class PageRequestTemplate:
+    url: str
+    method: str
+    headers: dict[str, str]
+    post_data: str | None = None
+    page_size: int | None = None
+
+
+def replayable_headers(headers: dict[str, Any]) -> dict[str, str]:
+    return {
+        name: str(value)
+        for name, value in headers.items()
+        if not name.startswith(":")
+        and not name.lower().startswith("sec-")
+        and name.lower() not in NON_REPLAYABLE_HEADER_NAMES
+    }
+
+
+def _as_int(value: Any) -> int | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value)
+    return None
+
+
+def _with_same_type(original: Any, value: int) -> Any:
+    return str(value) if isinstance(original, str) else value
+
+
+def _page_value(
+    values: dict[str, Any],
+    page_delta: int,
+    fallback_page_size: int | None,
+) -> tuple[str, Any] | None:
+    for key in PAGE_NUMBER_KEYS:
+        current = _as_int(values.get(key))
+        if current is not None:
+            return key, _with_same_type(values[key], current + page_delta)
+
+    page_size = fallback_page_size
+    for key in PAGE_SIZE_KEYS:
+        size_value = _as_int(values.get(key))
+        if size_value is not None and size_value > 0:
+            page_size = size_value
+            break
+
+    if page_size is None:
+        return None
+
+    for key in PAGE_OFFSET_KEYS:
+        current = _as_int(values.get(key))
+        if current is not None:
+            return key, _with_same_type(values[key], current + page_delta * page_size)
+
+    return None
+
+
+def _rewrite_body_page(
+    body: Any,
+    page_delta: int,
+    fallback_page_size: int | None,
+    depth: int = 0,
+) -> bool:
+    if not isinstance(body, dict) or depth > PAGE_REQUEST_MAX_BODY_DEPTH:
+        return False
+
+    page_value = _page_value(body, page_delta, fallback_page_size)
+    if page_value is not None:
+        key, value = page_value
+        body[key] = value
+        return True
+
+    for nested_value in body.values():
+        if _rewrite_body_page(nested_value, page_delta, fallback_page_size, depth + 1):
+            return True
+    return False
+
+
+def build_page_request(
+    template: PageRequestTemplate,
+    page_number: int,
+    template_page_number: int = 1,
+) -> PageRequestTemplate | None:
+    page_delta = page_number - template_page_number
+    if page_delta == 0:
+        return template
+
+    if template.post_data:
+        try:
+            body: Any = json.loads(template.post_data)
+        except json.JSONDecodeError:
+            body = None
+        if _rewrite_body_page(body, page_delta, template.page_size):
+            return replace(template, post_data=json.dumps(body, separators=(",", ":")))
+
+    url_parts = urlsplit(template.url)
+    query_items = parse_qsl(url_parts.query, keep_blank_values=True)
+    page_value = _page_value(dict(query_items), page_delta, template.page_size)
+    if page_value is None:
+        return None
+
+    key, value = page_value
+    rewritten_query = urlencode(
+        [(name, str(value) if name == key else item) for name, item in query_items]
+    )
+    return replace(template, url=urlunsplit(url_parts._replace(query=rewritten_query)))
+
+
+def build_page_fetch_expression(request: PageRequestTemplate) -> str:
+    init: dict[str, Any] = {
+        "method": request.method,
+        "headers": request.headers,
+        "credentials": "include",
+    }
+    if request.post_data is not None and request.method.upper() not in {"GET", "HEAD"}:
+        init["body"] = request.post_data
+
+    return (
+        "(async () => {"
+        f"const response = await fetch({json.dumps(request.url)}, {json.dumps(init)});"
+        "await response.text();"
+        "return response.status;"
+        "})()"
+    )
+
+
+def build_results_page_url(
+    url: str,
+    page_number: int,
+    url_page_number: int = 1,
+) -> str | None:
+    # Only works when the results page keeps its page number in the query;
+    # otherwise callers have to walk the Next control. Offset-style params
+    # are left alone because the page size is unknown here.
+    url_parts = urlsplit(url)
+    query_items = parse_qsl(url_parts.query, keep_blank_values=True)
+    query_values = dict(query_items)
+    for key in PAGE_NUMBER_KEYS:
+        current = _as_int(query_values.get(key))
+        if current is None:
+            continue
+        value = current + page_number - url_page_number
+        rewritten_query = urlencode(
+            [(name, str(value) if name == key else item) for name, item in query_items]
+        )
+        return urlunsplit(url_parts._replace(query=rewritten_query))
+    return None
@@ -0,0 +1,199 @@
+from dataclasses import dataclass
+from math import ceil
+from typing import Any
+
+from page_requests import PAGE_NUMBER_KEYS, PAGE_SIZE_KEYS
+from profile_extract import PREFERRED_CANDIDATE_KEYS, JsonPath
+
+TOTAL_RESULTS_KEYS = (
+    "total",
+    "totalResults",
+    "total_results",
+    "totalCount",
+    "total_count",
+    "totalItems",
+    "total_items",
+    "totalHits",
+    "total_hits",
+    "nbHits",
+)
+TOTAL_PAGES_KEYS = (
+    "totalPages",
+    "total_pages",
+    "pageCount",
+    "page_count",
+    "numPages",
+    "num_pages",
+    "nbPages",
+)
+HAS_MORE_KEYS = (
+    "hasMore",
+    "has_more",
+    "hasNextPage",
+    "has_next_page",
+    "hasNext",
+    "has_next",
+)
+# A null next cursor/page is the other common way APIs say "last page".
+NEXT_PAGE_KEYS = ("nextCursor", "next_cursor", "nextPage", "next_page")
+PAGINATION_WRAPPER_KEYS = (
+    "pagination",
+    "pageInfo",
+    "page_info",
+    "paging",
+    "meta",
+    "metadata",
+)
+
+
+@dataclass(slots=True)
+class PaginationInfo:
+    results_count: int
+    total_results: int | None = None
+    page_size: int | None = None
+    current_page: int | None = None
+    total_pages: int | None = None
+    has_more: bool | None = None
+
+    def page_count(self, fallback_page_size: int | None = None) -> int | None:
+        if self.total_pages is not None:
+            return self.total_pages
+        page_size = self.page_size or fallback_page_size
+        if self.total_results is None or not page_size:
+            return None
+        return ceil(self.total_results / page_size)
+
+    def is_last_page(
+        self, page_number: int, fallback_page_size: int | None = None
+    ) -> bool:
+        # page_number is the caller's 1-based count; current_page is left out
+        # because APIs disagree on whether it starts at 0 or 1.
+        if self.has_more is not None:
+            return not self.has_more
+        if self.results_count == 0:
+            return True
+        page_count = self.page_count(fallback_page_size)
+        if page_count is not None:
+            return page_number >= page_count
+        page_size = self.page_size or fallback_page_size
+        return page_size is not None and self.results_count < page_size
+
+    def to_json(self, fallback_page_size: int | None = None) -> dict[str, Any]:
+        return {
+            "resultsCount": self.results_count,
+            "totalResults": self.total_results,
+            "pageSize": self.page_size or fallback_page_size,
+            "currentPage": self.current_page,
+            "totalPages": self.page_count(fallback_page_size),
+            "hasMore": self.has_more,
+        }
+
+
+def _as_count(value: Any) -> int | None:
+    # Elasticsearch-style totals arrive as {"value": 123, "relation": "eq"}.
+    if isinstance(value, dict):
+        value = value.get("value")
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if value >= 0 else None
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+def _first_count(node: dict[str, Any], keys: tuple[str, ...]) -> int | None:
+    for key in keys:
+        count = _as_count(node.get(key))
+        if count is not None:
+            return count
+    return None
+
+
+def _has_more(node: dict[str, Any]) -> bool | None:
+    for key in HAS_MORE_KEYS:
+        value = node.get(key)
+        if isinstance(value, bool):
+            return value
+    for key in NEXT_PAGE_KEYS:
+        if key in node:
+            return node[key] not in (None, "")
+    return None
+
+
+def _metadata_nodes(payload: Any, results_path: JsonPath) -> list[dict[str, Any]]:
+    # Pagination fields sit next to the results list or in a wrapper such as
+    # "pagination" on one of its ancestors; the closest one wins.
+    ancestors: list[dict[str, Any]] = []
+    node = payload
+    for segment in results_path:
+        if isinstance(node, dict):
+            ancestors.append(node)
+            node = node.get(segment)
+        elif isinstance(node, list) and isinstance(segment, int) and segment < len(node):
+            node = node[segment]
+        else:
+            break
+
+    nodes: list[dict[str, Any]] = []
+    for ancestor in reversed(ancestors):
+        nodes.append(ancestor)
+        nodes.extend(
+            wrapper
+            for key in PAGINATION_WRAPPER_KEYS
+            if isinstance(wrapper := ancestor.get(key), dict)
+        )
+    return nodes
+
+
+def extract_pagination(
+    payload: Any, results_path: JsonPath, page_results: list[Any]
+) -> PaginationInfo:
+    pagination = PaginationInfo(results_count=len(page_results))
+    for node in _metadata_nodes(payload, results_path):
+        if pagination.total_results is None:
+            pagination.total_results = _first_count(node, TOTAL_RESULTS_KEYS)
+        if pagination.total_pages is None:
+            pagination.total_pages = _first_count(node, TOTAL_PAGES_KEYS)
+        if pagination.page_size is None:
+            page_size = _first_count(node, PAGE_SIZE_KEYS)
+            pagination.page_size = page_size or None
+        if pagination.current_page is None:
+            pagination.current_page = _first_count(node, PAGE_NUMBER_KEYS)
+        if pagination.has_more is None:
+            pagination.has_more = _has_more(node)
+    return pagination
+
+
+def _empty_results_path(payload: Any) -> JsonPath | None:
+    stack: list[tuple[Any, JsonPath]] = [(payload, ())]
+    while stack:
+        node, path = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        for key in PREFERRED_CANDIDATE_KEYS:
+            if node.get(key) == []:
+                return (*path, key)
+        stack.extend(
+            (value, (*path, key))
+            for key, value in node.items()
+            if isinstance(value, dict)
+        )
+    return None
+
+
+def extract_empty_page_pagination(payload: Any) -> PaginationInfo | None:
+    # A page past the last one usually comes back as an empty results list,
+    # which does not look like candidates. With pagination metadata next to
+    # it, it is still a results page: one with nothing left on it.
+    results_path = _empty_results_path(payload)
+    if results_path is None:
+        return None
+    pagination = extract_pagination(payload, results_path, [])
+    if (
+        pagination.total_results is None
+        and pagination.total_pages is None
+        and pagination.has_more is None
+    ):
+        return None
+    return pagination
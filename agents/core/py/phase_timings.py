@@ -0,0 +1,137 @@
+import random
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from atomic_write import write_bytes_atomic
+
+# Percentiles come from a fixed-size uniform sample, so a long crawl keeps
+# constant memory per phase; count, total and max stay exact.
+TIMING_SAMPLE_SIZE = 1024
+PROMETHEUS_METRIC_NAME = "scraper_phase_duration_seconds"
+PROMETHEUS_QUANTILES = (0.5, 0.95)
+
+
+class TimingHistogram:
+    __slots__ = ("count", "total_seconds", "max_seconds", "_samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._samples: list[float] = []
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        if len(self._samples) < TIMING_SAMPLE_SIZE:
+            self._samples.append(seconds)
+            return
+        # Reservoir sampling: every recorded duration has an equal chance of
+        # being in the sample.
+        slot = random.randrange(self.count)
+        if slot < TIMING_SAMPLE_SIZE:
+            self._samples[slot] = seconds
+
+    def merge(self, other: "TimingHistogram") -> None:
+        self.count += other.count
+        self.total_seconds += other.total_seconds
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+        self._samples = (self._samples + other._samples)[-TIMING_SAMPLE_SIZE:]
+
+    def quantile(self, fraction: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+        return ordered[index]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "p50Ms": round(self.quantile(0.5) * 1000, 3),
+            "p95Ms": round(self.quantile(0.95) * 1000, 3),
+            "maxMs": round(self.max_seconds * 1000, 3),
+            "totalMs": round(self.total_seconds * 1000, 3),
+        }
+
+
+class PhaseTimings:
+    def __init__(self) -> None:
+        self._histograms: dict[str, TimingHistogram] = {}
+
+    def record(self, phase: str, seconds: float) -> None:
+        histogram = self._histograms.get(phase)
+        if histogram is None:
+            histogram = self._histograms[phase] = TimingHistogram()
+        histogram.record(seconds)
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        # Failed attempts are recorded too; they cost wall time all the same.
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started_at)
+
+    def merge(self, other: "PhaseTimings") -> None:
+        for phase, histogram in other._histograms.items():
+            existing = self._histograms.get(phase)
+            if existing is None:
+                existing = self._histograms[phase] = TimingHistogram()
+            existing.merge(histogram)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            phase: histogram.to_json()
+            for phase, histogram in sorted(self._histograms.items())
+        }
+
+    def prometheus_text(self, labels: dict[str, str] | None = None) -> str:
+        base_labels = "".join(
+            f',{name}="{_escape_label(value)}"' for name, value in (labels or {}).items()
+        )
+        lines = [
+            f"# HELP {PROMETHEUS_METRIC_NAME} Wall time spent in each scraper phase.",
+            f"# TYPE {PROMETHEUS_METRIC_NAME} summary",
+        ]
+        max_lines = [
+            f"# HELP {PROMETHEUS_METRIC_NAME}_max Slowest run of each scraper phase.",
+            f"# TYPE {PROMETHEUS_METRIC_NAME}_max gauge",
+        ]
+        for phase, histogram in sorted(self._histograms.items()):
+            phase_labels = f'phase="{_escape_label(phase)}"{base_labels}'
+            for fraction in PROMETHEUS_QUANTILES:
+                lines.append(
+                    f'{PROMETHEUS_METRIC_NAME}{{{phase_labels},quantile="{fraction}"}} '
+                    f"{histogram.quantile(fraction):.6f}"
+                )
+            lines.append(
+                f"{PROMETHEUS_METRIC_NAME}_sum{{{phase_labels}}} "
+                f"{histogram.total_seconds:.6f}"
+            )
+            lines.append(
+                f"{PROMETHEUS_METRIC_NAME}_count{{{phase_labels}}} {histogram.count}"
+            )
+            max_lines.append(
+                f"{PROMETHEUS_METRIC_NAME}_max{{{phase_labels}}} "
+                f"{histogram.max_seconds:.6f}"
+            )
+        return "\n".join(lines + max_lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_prometheus_textfile(
+    path: Path, timings: PhaseTimings, labels: dict[str, str] | None = None
+) -> None:
+    # The node_exporter textfile collector may read at any moment, so write
+    # a sibling file and rename it into place.
+    write_bytes_atomic(path, timings.prometheus_text(labels).encode("utf-8"))
@@ -0,0 +1,228 @@
+import re
+from typing import Any
+from urllib.parse import urlsplit
+
+JsonPath = tuple[str | int, ...]
+
+PREFERRED_CANDIDATE_KEYS = (
+    "pageResults",
+    "profiles",
+    "candidates",
+    "results",
+    "contacts",
+    "items",
+)
+CANDIDATE_HINT_KEYS = {
+    "name",
+    "fullName",
+    "firstName",
+    "lastName",
+    "headline",
+    "title",
+    "company",
+    "linkedin",
+    "linkedinUrl",
+    "email",
+    "location",
+}
+PROFILE_WRAPPER_KEYS = (
+    "profile",
+    "candidate",
+    "person",
+    "contact",
+    "result",
+    "item",
+)
+# Path segments that vary per request (numeric ids, hex/uuid ids) are
+# collapsed so e.g. /api/profile/123 and /api/profile/456 share a pattern.
+VARIABLE_URL_SEGMENT_PATTERN = re.compile(r"^(?=.*\d)[0-9A-Za-z_-]{6,}$|^\d+$")
+
+
+def list_looks_like_candidates(items: list[Any]) -> bool:
+    candidate_dict_count = 0
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        if any(key in item for key in CANDIDATE_HINT_KEYS):
+            return True
+        candidate_dict_count += 1
+    return candidate_dict_count > 0
+
+
+def looks_like_candidate_dict(payload: Any) -> bool:
+    if not isinstance(payload, dict):
+        return False
+    return any(key in payload for key in CANDIDATE_HINT_KEYS) or "id" in payload
+
+
+# Paths are tracked as (parent_link, key) chains while walking and only
+# flattened into a JsonPath once a match is found.
+_PathLink = tuple[Any, str | int] | None
+_StackEntry = tuple[Any, _PathLink, bool]
+
+
+def _flatten_path(link: _PathLink, *suffix: str | int) -> JsonPath:
+    segments: list[str | int] = list(reversed(suffix))
+    while link is not None:
+        link, key = link
+        segments.append(key)
+    segments.reverse()
+    return tuple(segments)
+
+
+def _push_children(
+    stack: list[_StackEntry],
+    node: Any,
+    link: _PathLink,
+    search_page_results: bool,
+) -> None:
+    # Children are pushed in reverse so they pop in document order, which
+    # keeps the first match identical to the old depth-first recursion.
+    if isinstance(node, dict):
+        for key, value in reversed(node.items()):
+            if isinstance(value, (dict, list)):
+                stack.append((value, (link, key), search_page_results))
+    else:
+        for index in range(len(node) - 1, -1, -1):
+            value = node[index]
+            if isinstance(value, (dict, list)):
+                stack.append((value, (link, index), search_page_results))
+
+
+def find_page_results_path(payload: Any) -> tuple[JsonPath, list[Any]] | None:
+    if not isinstance(payload, (dict, list)):
+        return None
+
+    stack: list[_StackEntry] = [(payload, None, True)]
+    while stack:
+        node, link, _ = stack.pop()
+        if isinstance(node, dict):
+            for candidate_key in PREFERRED_CANDIDATE_KEYS:
+                maybe_items = node.get(candidate_key)
+                if isinstance(maybe_items, list) and list_looks_like_candidates(
+                    maybe_items
+                ):
+                    return _flatten_path(link, candidate_key), maybe_items
+        elif list_looks_like_candidates(node):
+            return _flatten_path(link), node
+        _push_children(stack, node, link, True)
+    return None
+
+
+def find_page_results(payload: Any) -> list[Any] | None:
+    found = find_page_results_path(payload)
+    return found[1] if found is not None else None
+
+
+def find_profile_payloads_path(
+    payload: Any,
+) -> tuple[JsonPath, list[dict[str, Any]]] | None:
+    if looks_like_candidate_dict(payload):
+        return (), [payload]
+    if not isinstance(payload, (dict, list)):
+        return None
+
+    stack: list[_StackEntry] = [(payload, None, True)]
+    while stack:
+        node, link, search_page_results = stack.pop()
+        if isinstance(node, dict):
+            if looks_like_candidate_dict(node):
+                return _flatten_path(link), [node]
+
+            for wrapper_key in PROFILE_WRAPPER_KEYS:
+                nested_payload = node.get(wrapper_key)
+                if looks_like_candidate_dict(nested_payload):
+                    return _flatten_path(link, wrapper_key), [nested_payload]
+
+            if search_page_results:
+                found = find_page_results_path(node)
+                if found is not None:
+                    relative_path, page_results = found
+                    return _flatten_path(link, *relative_path), [
+                        item for item in page_results if isinstance(item, dict)
+                    ]
+                # The whole subtree has no candidate list, so descendants only
+                # need the cheap candidate-dict checks.
+                search_page_results = False
+        elif list_looks_like_candidates(node):
+            return _flatten_path(link), [item for item in node if isinstance(item, dict)]
+
+        _push_children(stack, node, link, search_page_results)
+    return None
+
+
+def find_profile_payloads(payload: Any) -> list[dict[str, Any]]:
+    found = find_profile_payloads_path(payload)
+    return found[1] if found is not None else []
+
+
+def extract_page_results_path(payload: Any) -> tuple[JsonPath, list[Any]] | None:
+    # Single-profile responses (possibly wrapped) are not search result pages,
+    # even though their nested experience/education lists look list-like.
+    if looks_like_candidate_dict(payload):
+        return None
+    if isinstance(payload, dict) and any(
+        looks_like_candidate_dict(payload.get(key)) for key in PROFILE_WRAPPER_KEYS
+    ):
+        return None
+    return find_page_results_path(payload)
+
+
+def extract_page_results(payload: Any) -> list[Any] | None:
+    found = extract_page_results_path(payload)
+    return found[1] if found is not None else None
+
+
+def resolve_json_path(payload: Any, path: JsonPath) -> Any:
+    node = payload
+    for segment in path:
+        if isinstance(segment, int):
+            if not isinstance(node, list) or segment >= len(node):
+                return None
+        elif not isinstance(node, dict):
+            return None
+        node = node[segment] if isinstance(node, list) else node.get(segment)
+    return node
+
+
+def url_pattern(url: str) -> str:
+    url_parts = urlsplit(url)
+    segments = [
+        "*" if VARIABLE_URL_SEGMENT_PATTERN.match(segment) else segment
+        for segment in url_parts.path.split("/")
+    ]
+    return f"{url_parts.netloc}{'/'.join(segments)}"
+
+
+class ProfileExtractor:
+    def __init__(self) -> None:
+        self.learned_paths: dict[str, JsonPath] = {}
+        self.fast_path_hits = 0
+        self.fast_path_misses = 0
+
+    def extract(self, payload: Any, url: str | None = None) -> list[dict[str, Any]]:
+        pattern = url_pattern(url) if url else None
+        learned_path = self.learned_paths.get(pattern) if pattern else None
+        if learned_path is not None:
+            fast_payloads = self._extract_at(payload, learned_path)
+            if fast_payloads is not None:
+                self.fast_path_hits += 1
+                return fast_payloads
+            self.fast_path_misses += 1
+
+        found = find_profile_payloads_path(payload)
+        if found is None:
+            return []
+
+        path, profile_payloads = found
+        if pattern is not None:
+            self.learned_paths[pattern] = path
+        return profile_payloads
+
+    def _extract_at(self, payload: Any, path: JsonPath) -> list[dict[str, Any]] | None:
+        node = resolve_json_path(payload, path)
+        if isinstance(node, dict):
+            return [node] if looks_like_candidate_dict(node) else None
+        if isinstance(node, list) and list_looks_like_candidates(node):
+            return [item for item in node if isinstance(item, dict)]
+        return None
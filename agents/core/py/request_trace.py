@@ -0,0 +1,175 @@
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Generic, TypeVar
+
+import json_codec
+from atomic_write import write_bytes_atomic
+
+DEFAULT_MAX_PENDING_REQUESTS = 1024
+DEFAULT_PENDING_REQUEST_TTL_SECONDS = 120.0
+DEFAULT_MAX_TRACED_REQUESTS = 20_000
+
+# Lifecycle steps in order; each trace slice runs from one recorded step to
+# the next recorded one.
+TIMELINE_STEPS = (
+    ("requested_at", "waitForResponse"),
+    ("response_received_at", "download"),
+    ("loading_finished_at", "queued"),
+    ("fetch_started_at", "getResponseBody"),
+    ("body_fetched_at", "decodeAndParse"),
+    ("parsed_at", "extractAndEmit"),
+    ("emitted_at", None),
+)
+
+PendingValue = TypeVar("PendingValue")
+
+
+@dataclass(slots=True)
+class RequestTimeline:
+    # time.perf_counter() readings taken when each CDP event was handled.
+    url: str
+    target_id: str
+    requested_at: float | None = None
+    response_received_at: float | None = None
+    loading_finished_at: float | None = None
+    fetch_started_at: float | None = None
+    body_fetched_at: float | None = None
+    parsed_at: float | None = None
+    emitted_at: float | None = None
+    outcome: str = "pending"
+
+
+class PendingRequestTable(Generic[PendingValue]):
+    # Requests that never see loadingFinished or loadingFailed (cancelled
+    # navigations, closed sessions) would otherwise stay here forever, so
+    # entries expire after a TTL and the oldest go first once full.
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_PENDING_REQUESTS,
+        ttl_seconds: float = DEFAULT_PENDING_REQUEST_TTL_SECONDS,
+        on_evict: Callable[[PendingValue], None] | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evicted_count = 0
+        self._on_evict = on_evict
+        self._entries: OrderedDict[str, tuple[float, PendingValue]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __setitem__(self, key: str, value: PendingValue) -> None:
+        now = time.monotonic()
+        existing = self._entries.get(key)
+        self._entries[key] = (existing[0] if existing else now, value)
+        self._evict(now)
+
+    def __delitem__(self, key: str) -> None:
+        del self._entries[key]
+
+    def get(self, key: str) -> PendingValue | None:
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def pop(self, key: str, default: PendingValue | None = None) -> PendingValue | None:
+        entry = self._entries.pop(key, None)
+        return entry[1] if entry is not None else default
+
+    def items(self) -> Iterator[tuple[str, PendingValue]]:
+        for key, (_, value) in self._entries.items():
+            yield key, value
+
+    def values(self) -> Iterator[PendingValue]:
+        for _, value in self._entries.values():
+            yield value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _evict(self, now: float) -> None:
+        expires_before = now - self.ttl_seconds
+        while self._entries:
+            oldest_key, (added_at, value) = next(iter(self._entries.items()))
+            if added_at >= expires_before and len(self._entries) <= self.max_entries:
+                return
+            del self._entries[oldest_key]
+            self.evicted_count += 1
+            if self._on_evict is not None:
+                self._on_evict(value)
+
+
+class RequestTraceRecorder:
+    def __init__(self, max_requests: int = DEFAULT_MAX_TRACED_REQUESTS) -> None:
+        self.started_at = time.perf_counter()
+        self._timelines: deque[RequestTimeline] = deque(maxlen=max_requests)
+
+    def record(self, timeline: RequestTimeline) -> None:
+        self._timelines.append(timeline)
+
+    def trace_events(self) -> list[dict[str, Any]]:
+        # Async begin/end pairs keyed by request, so overlapping requests get
+        # their own rows in Perfetto and chrome://tracing.
+        events: list[dict[str, Any]] = []
+        for request_index, timeline in enumerate(self._timelines):
+            steps = [
+                (getattr(timeline, field_name), slice_name)
+                for field_name, slice_name in TIMELINE_STEPS
+                if getattr(timeline, field_name) is not None
+            ]
+            if not steps:
+                continue
+            common = {
+                "cat": "profileRequest",
+                "id": request_index,
+                "pid": 1,
+                "tid": timeline.target_id,
+            }
+            events.append(
+                {
+                    **common,
+                    "name": timeline.url,
+                    "ph": "b",
+                    "ts": self._microseconds(steps[0][0]),
+                    "args": {"outcome": timeline.outcome},
+                }
+            )
+            for (step_at, slice_name), (next_at, _) in zip(steps, steps[1:]):
+                events.append(
+                    {
+                        **common,
+                        "name": slice_name,
+                        "ph": "b",
+                        "ts": self._microseconds(step_at),
+                    }
+                )
+                events.append(
+                    {
+                        **common,
+                        "name": slice_name,
+                        "ph": "e",
+                        "ts": self._microseconds(next_at),
+                    }
+                )
+            events.append(
+                {
+                    **common,
+                    "name": timeline.url,
+                    "ph": "e",
+                    "ts": self._microseconds(steps[-1][0]),
+                }
+            )
+        return events
+
+    def write(self, path: Path) -> None:
+        write_bytes_atomic(
+            path,
+            json_codec.dumps_bytes(
+                {"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}
+            ),
+        )
+
+    def _microseconds(self, perf_counter_value: float) -> float:
+        return round((perf_counter_value - self.started_at) * 1_000_000, 1)
@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+import json
+import re
+import sys
+import tempfile
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any
+
+import json_codec
+from scraper import ScrapeJob, run_scrape_job
+from scraper_output import (
+    JOB_RESULT_PREFIX,
+    SCHEDULER_STATS_PREFIX,
+    ScraperOutput,
+    write_prefixed_line,
+)
+
+DEFAULT_MAX_CONCURRENT_JOBS = 2
+DEFAULT_MAX_JOB_ATTEMPTS = 2
+JOB_RETRY_DELAY_SECONDS = 5.0
+# Job ids end up inside the SCRAPER_*[<jobId>]= prefix, so keep them to
+# characters that cannot be confused with the prefix syntax.
+JOB_ID_PATTERN = re.compile(r"[A-Za-z0-9_.:-]+")
+CAPTURE_STATS_COUNTERS = frozenset(
+    (
+        "apiRequests",
+        "searchMatches",
+        "savedSearchResponses",
+        "emittedCandidates",
+        "replayedPages",
+        "droppedResponses",
+        "suppressedDuplicates",
+        "evictedPendingRequests",
+        "scriptedCards",
+        "agentCards",
+        "agentTraceReplays",
+        "agentTraceRecords",
+        "loginAgentRuns",
+        "loginSkips",
+        "newCandidates",
+        "changedCandidates",
+        "unchangedCandidates",
+        "removedCandidates",
+        "projectedCandidates",
+        "emittedCandidateBytes",
+        "projectedPayloadBytes",
+        "projectedRecordBytes",
+        "projectionBytesSaved",
+        "sqliteSinkUpserts",
+    )
+)
+CAPTURE_STATS_MAXIMUMS = frozenset(("maxQueuedResponses",))
+
+
+@dataclass(slots=True)
+class JobResult:
+    job_id: str
+    status: str = "pending"
+    attempts: int = 0
+    error: str | None = None
+    stats: dict[str, Any] = field(default_factory=dict)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "jobId": self.job_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "stats": self.stats,
+        }
+
+
+def merge_capture_stats(total: dict[str, Any], stats: dict[str, Any]) -> None:
+    # Counters from retried attempts add up to the job's totals. Config
+    # values (parallelTabs), gauges (uniqueCandidates, pendingRequests) and
+    # anything not listed keep the last attempt's value.
+    for key, value in stats.items():
+        if key in CAPTURE_STATS_COUNTERS and isinstance(value, int | float):
+            total[key] = total.get(key, 0) + value
+        elif key in CAPTURE_STATS_MAXIMUMS and isinstance(value, int | float):
+            total[key] = max(total.get(key, value), value)
+        else:
+            total[key] = value
+
+
+def parse_job_line(line: str | bytes, default_job_id: str) -> ScrapeJob:
+    try:
+        job = ScrapeJob.from_json(json_codec.loads(line))
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as error:
+        raise ValueError(f"Invalid job: {error}") from error
+    if job.job_id is None:
+        job.job_id = default_job_id
+    if not JOB_ID_PATTERN.fullmatch(job.job_id):
+        raise ValueError(f"Invalid jobId: {job.job_id!r}")
+    return job
+
+
+def parse_job_lines(lines: list[str]) -> list[ScrapeJob]:
+    jobs: list[ScrapeJob] = []
+    seen_job_ids: set[str] = set()
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            job = parse_job_line(line, str(line_number))
+        except ValueError as error:
+            raise ValueError(f"Line {line_number}: {error}") from error
+        if job.job_id in seen_job_ids:
+            raise ValueError(f"Duplicate jobId on line {line_number}: {job.job_id}")
+        seen_job_ids.add(job.job_id)
+        jobs.append(job)
+    return jobs
+
+
+async def run_job_with_retries(
+    job: ScrapeJob,
+    slots: asyncio.Semaphore,
+    max_attempts: int,
+    retry_delay_seconds: float,
+    checkpoint_dir: Path | None = None,
+) -> JobResult:
+    result = JobResult(job_id=str(job.job_id))
+    if job.checkpoint_path is None and job.resume_path is None and checkpoint_dir:
+        job = replace(job, checkpoint_path=str(checkpoint_dir / f"{job.job_id}.json"))
+    while result.attempts < max_attempts:
+        output = ScraperOutput(job.job_id)
+        async with slots:
+            result.attempts += 1
+            print(
+                f"[Scheduler] Starting job {job.job_id} attempt {result.attempts}/{max_attempts}",
+                flush=True,
+            )
+            try:
+                await run_scrape_job(job, output)
+            except Exception as error:
+                result.error = f"{type(error).__name__}: {error}"
+            else:
+                result.error = None
+            finally:
+                if output.capture_stats is not None:
+                    merge_capture_stats(result.stats, output.capture_stats)
+
+        if result.error is None:
+            result.status = "succeeded"
+            break
+
+        print(
+            f"[Scheduler] Job {job.job_id} attempt {result.attempts} failed: {result.error}",
+            flush=True,
+        )
+        # Sleep outside the semaphore so a failing job does not hold a slot.
+        if result.attempts < max_attempts:
+            await asyncio.sleep(retry_delay_seconds)
+        # The next attempt resumes after the last checkpointed page with the
+        # candidates already emitted seeded into dedup, instead of crawling
+        # from page 1 and emitting them all again.
+        job = replace(job, resume_path=job.checkpoint_path or job.resume_path)
+    else:
+        result.status = "failed"
+
+    ScraperOutput(job.job_id).emit_json(JOB_RESULT_PREFIX, result.to_json())
+    return result
+
+
+async def run_jobs(
+    jobs: list[ScrapeJob],
+    max_concurrent_jobs: int,
+    max_attempts: int,
+    retry_delay_seconds: float = JOB_RETRY_DELAY_SECONDS,
+) -> list[JobResult]:
+    slots = asyncio.Semaphore(max_concurrent_jobs)
+    print(
+        f"[Scheduler] Running {len(jobs)} jobs with concurrency {max_concurrent_jobs}",
+        flush=True,
+    )
+    # Jobs without a checkpoint of their own get one here, so a retry can
+    # resume; the files only have to outlive the job's attempts.
+    with tempfile.TemporaryDirectory(prefix="scrape-checkpoints-") as checkpoint_dir:
+        results = await asyncio.gather(
+            *(
+                run_job_with_retries(
+                    job,
+                    slots,
+                    max_attempts,
+                    retry_delay_seconds,
+                    Path(checkpoint_dir) if max_attempts > 1 else None,
+                )
+                for job in jobs
+            )
+        )
+    write_prefixed_line(
+        SCHEDULER_STATS_PREFIX,
+        {
+            "jobs": len(results),
+            "succeeded": sum(result.status == "succeeded" for result in results),
+            "failed": sum(result.status == "failed" for result in results),
+            "attempts": sum(result.attempts for result in results),
+        },
+    )
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--jobs",
+        default="-",
+        help=(
+            "JSON-lines file of jobs ({jobId, targetUrl, profileId, totalPages, ...}). "
+            "Reads stdin when omitted or '-'."
+        ),
+    )
+    parser.add_argument(
+        "--max-concurrent-jobs",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENT_JOBS,
+        help="Maximum number of browser sessions running at once.",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_JOB_ATTEMPTS,
+        help="Attempts per job before it is reported as failed.",
+    )
+    parser.add_argument(
+        "--retry-delay",
+        type=float,
+        default=JOB_RETRY_DELAY_SECONDS,
+        help="Seconds to wait before retrying a failed job.",
+    )
+    args = parser.parse_args()
+    if args.max_concurrent_jobs < 1:
+        parser.error("--max-concurrent-jobs must be at least 1")
+    if args.max_attempts < 1:
+        parser.error("--max-attempts must be at least 1")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    if args.jobs == "-":
+        lines = sys.stdin.readlines()
+    else:
+        lines = Path(args.jobs).read_text(encoding="utf-8").splitlines()
+
+    jobs = parse_job_lines(lines)
+    results = asyncio.run(
+        run_jobs(jobs, args.max_concurrent_jobs, args.max_attempts, args.retry_delay)
+    )
+    return 0 if all(result.status == "succeeded" for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
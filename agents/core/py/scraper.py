@@ -5,22 +5,182 @@ import os
 import time
 import urllib.error
 import urllib.request
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
+from urllib.parse import urlsplit
+from agent_trace_cache import AgentTraceCache, results_page_fingerprint
 from browser_use import Agent, Browser, ChatBrowserUse
-from playwright.async_api import async_playwright
-from cdp_capture import JuiceboxProfileCdpCapture
+from candidate_dedup import CandidateDedupIndex
+from candidate_diff import DEFAULT_DIFF_FIELDS, CandidateDiffStore
+from candidate_sink import SqliteCandidateSink
+from card_walker import PROFILE_CARD_SELECTORS, walk_profile_cards
+from cdp_capture import JuiceboxProfileCdpCapture, capture_stats, extract_page_results
+from cdp_connection import CdpConnection, CdpConnectionError
+from crawl_checkpoint import CrawlCheckpoint, load_checkpoint, save_checkpoint
+import json_codec
+from page_requests import build_results_page_url
+from phase_timings import PhaseTimings, write_prometheus_textfile
+from playwright.async_api import Error as PlaywrightError
+from scraper_output import (
+    BROWSER_ID_PREFIX,
+    BROWSER_USE_URL_PREFIX,
+    CANDIDATE_SINK_PREFIX,
+    PROFILE_CAPTURE_DIR_PREFIX,
+    DEFAULT_CHANNEL_BATCH_SIZE,
+    DEFAULT_CHANNEL_FLUSH_INTERVAL_MS,
+    TIMINGS_PREFIX,
+    CandidateChannel,
+    ScraperOutput,
+    open_candidate_channel,
+)
 
-CDP_CONNECT_MAX_ATTEMPTS = 5
-CDP_CONNECT_RETRY_SECONDS = 1
 NEXT_BUTTON_STABILIZATION_WAIT_MS = 2_000
+NEXT_PAGE_RESPONSE_TIMEOUT_SECONDS = 10
 CAPTURE_DIRNAME = "captures"
 SAVE_CDP_ENV_VAR = "SAVE_JUICEBOX_CDP_LOCALLY_DEV"
-BROWSER_USE_URL_PREFIX = "SCRAPER_BROWSER_USE_URL="
-BROWSER_CAPTURE_STATS_PREFIX = "SCRAPER_CAPTURE_STATS="
 BROWSER_USE_URL_MAX_ATTEMPTS = 4
 BROWSER_USE_URL_RETRY_SECONDS = 0.5
+DIRECT_API_RESPONSE_TIMEOUT_SECONDS = 15
+LOGIN_CHECK_TIMEOUT_SECONDS = 15
+LOGIN_CHECK_RESPONSE_SUBSTRING = "/api/profile"
+AGENT_TRACE_DIRNAME = "agent_traces"
+AGENT_TRACE_REPLAY_MAX_RETRIES = 1
+AUTO_TOTAL_PAGES = "auto"
+# Upper bound for --total-pages auto when the API never reports a last page.
+AUTO_TOTAL_PAGES_LIMIT = 100
+
+
+@dataclass(slots=True)
+class ScrapeJob:
+    target_url: str
+    profile_id: str
+    # None discovers the page count from the page results API.
+    total_pages: int | None
+    direct_api: bool = False
+    next_page_timeout_seconds: float = NEXT_PAGE_RESPONSE_TIMEOUT_SECONDS
+    parallel_tabs: int = 1
+    agent_trace_cache: bool = True
+    dedup_index_path: str | None = None
+    incremental_store_path: str | None = None
+    diff_fields: tuple[str, ...] = DEFAULT_DIFF_FIELDS
+    stop_after_unchanged_pages: int | None = None
+    max_candidates: int | None = None
+    checkpoint_path: str | None = None
+    resume_path: str | None = None
+    timings_textfile_path: str | None = None
+    trace_events_path: str | None = None
+    project_fields: bool = False
+    sqlite_sink_path: str | None = None
+    job_id: str | None = None
+
+    @classmethod
+    def from_json(cls, value: dict[str, Any]) -> "ScrapeJob":
+        return cls(
+            target_url=str(value["targetUrl"]),
+            profile_id=str(value["profileId"]),
+            total_pages=parse_total_pages(
+                str(value.get("totalPages", AUTO_TOTAL_PAGES))
+            ),
+            direct_api=bool(value.get("directApi", False)),
+            next_page_timeout_seconds=float(
+                value.get("nextPageTimeout", NEXT_PAGE_RESPONSE_TIMEOUT_SECONDS)
+            ),
+            parallel_tabs=int(value.get("parallelTabs", 1)),
+            agent_trace_cache=bool(value.get("agentTraceCache", True)),
+            dedup_index_path=(
+                str(value["dedupIndex"]) if value.get("dedupIndex") else None
+            ),
+            incremental_store_path=(
+                str(value["incrementalStore"])
+                if value.get("incrementalStore")
+                else None
+            ),
+            diff_fields=tuple(value.get("diffFields") or DEFAULT_DIFF_FIELDS),
+            stop_after_unchanged_pages=(
+                int(value["stopAfterUnchangedPages"])
+                if value.get("stopAfterUnchangedPages")
+                else None
+            ),
+            max_candidates=(
+                int(value["maxCandidates"]) if value.get("maxCandidates") else None
+            ),
+            checkpoint_path=(
+                str(value["checkpoint"]) if value.get("checkpoint") else None
+            ),
+            resume_path=str(value["resume"]) if value.get("resume") else None,
+            timings_textfile_path=(
+                str(value["timingsTextfile"]) if value.get("timingsTextfile") else None
+            ),
+            trace_events_path=(
+                str(value["traceEvents"]) if value.get("traceEvents") else None
+            ),
+            project_fields=bool(value.get("projectFields", False)),
+            sqlite_sink_path=(
+                str(value["sqliteSink"]) if value.get("sqliteSink") else None
+            ),
+            job_id=str(value["jobId"]) if value.get("jobId") is not None else None,
+        )
+
+
+@dataclass(slots=True)
+class ScrapeSession:
+    profile_id: str
+    browser: Browser
+    llm: ChatBrowserUse
+    sensitive_data: dict[str, str]
+    browser_id: str
+    live_url: str | None = None
+    connection: CdpConnection | None = None
+    job_count: int = 0
+    login_agent_run_count: int = 0
+    login_skip_count: int = 0
+    # Browser start and live-URL lookup; reported with the session's first job.
+    start_timings: PhaseTimings = field(default_factory=PhaseTimings)
+
+
+@dataclass(slots=True)
+class PageScrapeReport:
+    scripted_cards: int = 0
+    agent_cards: int = 0
+    hidden_cards: int = 0
+    used_agent: bool = False
+    replayed_trace: bool = False
+    recorded_trace: bool = False
+
+
+class NextControlNotFoundError(RuntimeError):
+    pass
+
+
+class BrowserSessionError(RuntimeError):
+    # The browser or its login is unusable, unlike a job's own inputs.
+    pass
+
+
+def is_browser_failure(error: BaseException) -> bool:
+    # Capture errors wrap the one that stopped a worker, so follow the
+    # explicit causes too.
+    cause: BaseException | None = error
+    while cause is not None:
+        if isinstance(
+            cause,
+            (BrowserSessionError, CdpConnectionError, PlaywrightError, ConnectionError),
+        ):
+            return True
+        cause = cause.__cause__
+    return False
+
+
+def parse_total_pages(value: str) -> int | None:
+    if value.strip().lower() == AUTO_TOTAL_PAGES:
+        return None
+    total_pages = int(value)
+    if total_pages < 1:
+        raise ValueError("total pages must be at least 1")
+    return total_pages
 
 
 def require_env(name: str) -> str:
@@ -54,8 +214,7 @@ def resolve_browser_use_live_url(session_id: str) -> str | None:
             with urllib.request.urlopen(request, timeout=10) as response:
                 if response.status < 200 or response.status >= 300:
                     return None
-                payload_text = response.read().decode("utf-8")
-                payload = json.loads(payload_text)
+                payload = json_codec.loads(response.read())
                 live_url = payload.get("liveUrl")
                 if isinstance(live_url, str) and live_url:
                     return live_url
@@ -111,7 +270,7 @@ Once you have clicked through all profile cards on the current page, you are don
 async def get_active_context_page(context) -> object:
     open_pages = [page for page in context.pages if not page.is_closed()]
     if not open_pages:
-        raise RuntimeError("No open pages available in the browser context")
+        raise BrowserSessionError("No open pages available in the browser context")
 
     for page in reversed(open_pages):
         if page.url and page.url != "about:blank":
@@ -155,71 +314,523 @@ async def click_first_usable_next_control(page) -> bool:
     return False
 
 
-async def click_next_page(cdp_url: str, current_page: int) -> None:
-    async with async_playwright() as playwright:
-        pw_browser = None
-        connect_errors: list[str] = []
+async def wait_for_next_page_settled(page) -> None:
+    try:
+        await page.wait_for_load_state("networkidle", timeout=10_000)
+    except Exception:
+        pass
+    await page.wait_for_load_state("domcontentloaded")
+    await page.wait_for_timeout(NEXT_BUTTON_STABILIZATION_WAIT_MS)
+
 
-        for attempt in range(1, CDP_CONNECT_MAX_ATTEMPTS + 1):
-            try:
-                pw_browser = await playwright.chromium.connect_over_cdp(cdp_url)
-                break
-            except Exception as error:
-                connect_errors.append(f"attempt {attempt}: {error}")
-                if attempt < CDP_CONNECT_MAX_ATTEMPTS:
-                    await asyncio.sleep(CDP_CONNECT_RETRY_SECONDS)
-
-        if pw_browser is None:
-            raise RuntimeError(
-                "Failed to connect over CDP after retries: "
-                + " | ".join(connect_errors)
-            )
+async def click_next_page(
+    connection: CdpConnection,
+    current_page: int,
+    capture: JuiceboxProfileCdpCapture | None = None,
+    response_timeout_seconds: float = NEXT_PAGE_RESPONSE_TIMEOUT_SECONDS,
+) -> None:
+    context = await connection.first_context()
+    page = await get_active_context_page(context)
+    await click_next_on_page(
+        page,
+        current_page,
+        capture=capture,
+        response_timeout_seconds=response_timeout_seconds,
+    )
 
-        try:
-            if not pw_browser.contexts:
-                raise RuntimeError("No browser contexts available over CDP")
 
-            context = pw_browser.contexts[0]
-            page = await get_active_context_page(context)
-            await page.wait_for_load_state("domcontentloaded")
+async def click_next_on_page(
+    page,
+    current_page: int,
+    capture: JuiceboxProfileCdpCapture | None = None,
+    response_timeout_seconds: float = NEXT_PAGE_RESPONSE_TIMEOUT_SECONDS,
+) -> None:
+    # Without a capture the timing is simply discarded.
+    timings = capture.timings if capture is not None else PhaseTimings()
+    with timings.measure("nextNavigation"):
+        await page.wait_for_load_state("domcontentloaded")
+        print(
+            f"[Scraper] Attempting Next navigation from URL: {page.url}",
+            flush=True,
+        )
+
+        if capture is not None:
+            capture.set_page_number(page, current_page + 1)
+        clicked_at = asyncio.get_running_loop().time()
+        clicked_next = await click_first_usable_next_control(page)
+        if not clicked_next:
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            await page.wait_for_timeout(500)
+            clicked_next = await click_first_usable_next_control(page)
+
+        if not clicked_next:
+            if capture is not None:
+                capture.set_page_number(page, current_page)
+            raise NextControlNotFoundError(
+                "Next control not found or not clickable "
+                f"after scraping page {current_page}"
+            )
+
+        print(
+            f"[Scraper] Clicked Next to move from page {current_page} to page {current_page + 1}",
+            flush=True,
+        )
+        if capture is None:
+            await wait_for_next_page_settled(page)
+        elif not await capture.wait_for_profile_response(
+            after=clicked_at,
+            timeout_seconds=response_timeout_seconds,
+            page_results=True,
+            page=page,
+        ):
             print(
-                f"[Scraper] Attempting Next navigation from URL: {page.url}",
+                (
+                    "[Scraper] No page results response within "
+                    f"{response_timeout_seconds}s of Next; waiting for the page to settle"
+                ),
                 flush=True,
             )
+            await wait_for_next_page_settled(page)
+        print(f"[Scraper] After Next click URL: {page.url}", flush=True)
 
-            clicked_next = await click_first_usable_next_control(page)
-            if not clicked_next:
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(500)
-                clicked_next = await click_first_usable_next_control(page)
-
-            if not clicked_next:
-                raise RuntimeError(
-                    "Next control not found or not clickable "
-                    f"after scraping page {current_page}"
+
+async def scrape_current_page(
+    *,
+    browser: Browser,
+    llm: ChatBrowserUse,
+    connection: CdpConnection,
+    capture: JuiceboxProfileCdpCapture,
+    scrape_prompt: str,
+    sensitive_data: dict[str, str],
+    trace_cache: AgentTraceCache | None = None,
+) -> PageScrapeReport:
+    report = PageScrapeReport()
+    context = await connection.first_context()
+    page = await get_active_context_page(context)
+    with capture.timings.measure("cardWalk"):
+        walk = await walk_profile_cards(page, capture)
+    report.scripted_cards = walk.captured_count
+    report.hidden_cards = walk.skipped_hidden_count
+    if walk.card_count > 0 and not walk.stalled:
+        return report
+
+    print(
+        (
+            "[Scraper] Card walker "
+            + ("stalled" if walk.stalled else "found no cards")
+            + "; falling back to the scrape agent"
+        ),
+        flush=True,
+    )
+    saved_before_agent = capture.state.saved_profile_count
+    report.used_agent = True
+    fingerprint: str | None = None
+    if trace_cache is not None:
+        try:
+            fingerprint = await results_page_fingerprint(page)
+        except Exception as error:
+            print(f"[Scraper] Could not fingerprint results page: {error}", flush=True)
+        trace_path = trace_cache.lookup(fingerprint) if fingerprint else None
+        if trace_path is not None:
+            with capture.timings.measure("agentTraceReplay"):
+                report.replayed_trace = await replay_agent_trace(
+                    trace_path,
+                    browser=browser,
+                    llm=llm,
+                    capture=capture,
+                    scrape_prompt=scrape_prompt,
+                    sensitive_data=sensitive_data,
+                )
+            if report.replayed_trace:
+                report.agent_cards = (
+                    capture.state.saved_profile_count - saved_before_agent
                 )
+                return report
+            trace_cache.discard(fingerprint)
 
+    scrape_agent = Agent(
+        task=scrape_prompt,
+        browser=browser,
+        llm=llm,
+        flash_mode=True,
+        sensitive_data=sensitive_data,
+    )
+    with capture.timings.measure("pageAgent"):
+        history = await scrape_agent.run()
+    capture.raise_if_failed()
+    report.agent_cards = capture.state.saved_profile_count - saved_before_agent
+    if (
+        trace_cache is not None
+        and fingerprint is not None
+        and history.is_successful()
+        and report.agent_cards > 0
+    ):
+        trace_cache.store(fingerprint, history, sensitive_data)
+        report.recorded_trace = True
+    return report
+
+
+async def replay_agent_trace(
+    trace_path: Path,
+    *,
+    browser: Browser,
+    llm: ChatBrowserUse,
+    capture: JuiceboxProfileCdpCapture,
+    scrape_prompt: str,
+    sensitive_data: dict[str, str],
+) -> bool:
+    # browser_use re-locates each recorded element before acting and raises
+    # when one is gone; a replay that captured nothing counts as a miss too.
+    saved_before_replay = capture.state.saved_profile_count
+    replay_agent = Agent(
+        task=scrape_prompt,
+        browser=browser,
+        llm=llm,
+        flash_mode=True,
+        sensitive_data=sensitive_data,
+    )
+    try:
+        await replay_agent.load_and_rerun(
+            trace_path,
+            max_retries=AGENT_TRACE_REPLAY_MAX_RETRIES,
+            skip_failures=False,
+        )
+    except Exception as error:
+        print(f"[Scraper] Agent trace replay failed: {error}", flush=True)
+        capture.raise_if_failed()
+        return False
+
+    capture.raise_if_failed()
+    if capture.state.saved_profile_count == saved_before_replay:
+        print("[Scraper] Agent trace replay captured no profiles", flush=True)
+        return False
+    print(f"[Scraper] Replayed cached agent trace {trace_path.name}", flush=True)
+    return True
+
+
+async def scrape_pages_via_direct_api(
+    cdp_capture: JuiceboxProfileCdpCapture,
+    total_pages: int,
+    should_stop: Callable[[int], Awaitable[bool]] | None = None,
+    first_page: int = 1,
+) -> int:
+    loop = asyncio.get_running_loop()
+    reload_started_at = loop.time()
+    await cdp_capture.reload_page()
+    did_capture_first_page = await cdp_capture.wait_for_profile_response(
+        after=reload_started_at,
+        timeout_seconds=DIRECT_API_RESPONSE_TIMEOUT_SECONDS,
+        page_results=True,
+    )
+    cdp_capture.raise_if_failed()
+    if not did_capture_first_page or cdp_capture.state.page_request_template is None:
+        print(
+            "[Scraper] Direct API mode could not learn the page results request",
+            flush=True,
+        )
+        return 0
+
+    print("[Scraper] Direct API captured page 1 from reload", flush=True)
+    if first_page <= 1 and should_stop is not None and await should_stop(1):
+        return 1
+    for current_page in range(max(first_page, 2), total_pages + 1):
+        with cdp_capture.timings.measure("pageReplay"):
+            did_replay = await cdp_capture.replay_page_request(
+                current_page,
+                timeout_seconds=DIRECT_API_RESPONSE_TIMEOUT_SECONDS,
+            )
+        cdp_capture.raise_if_failed()
+        if not did_replay:
             print(
-                f"[Scraper] Clicked Next to move from page {current_page} to page {current_page + 1}",
+                f"[Scraper] Direct API replay failed for page {current_page}",
                 flush=True,
             )
-            try:
-                await page.wait_for_load_state("networkidle", timeout=10_000)
-            except Exception:
-                pass
-            await page.wait_for_load_state("domcontentloaded")
-            await page.wait_for_timeout(NEXT_BUTTON_STABILIZATION_WAIT_MS)
-            print(f"[Scraper] After Next click URL: {page.url}", flush=True)
-        finally:
-            await pw_browser.close()
+            return current_page - 1
+        print(
+            f"[Scraper] Direct API captured page {current_page}/{total_pages}",
+            flush=True,
+        )
+        if should_stop is not None and await should_stop(current_page):
+            return current_page
 
+    return total_pages
 
-async def main(juicebox_url: str, profile_id: str, total_pages: int):
-    print(f"[Scraper] Starting for {juicebox_url}", flush=True)
+
+def load_resume_checkpoint(job: ScrapeJob) -> CrawlCheckpoint | None:
+    if not job.resume_path:
+        return None
+    resume_path = Path(job.resume_path)
+    if not resume_path.exists():
+        # Lets a retry pass --resume unconditionally; the first attempt has
+        # nothing to resume yet.
+        print(
+            f"[Scraper] No checkpoint at {resume_path}; starting from page 1",
+            flush=True,
+        )
+        return None
+    checkpoint = load_checkpoint(resume_path)
+    if checkpoint.target_url != job.target_url:
+        raise ValueError(
+            f"Checkpoint {resume_path} is for {checkpoint.target_url}, "
+            f"not {job.target_url}"
+        )
+    return checkpoint
+
+
+def reached_candidate_target(
+    cdp_capture: JuiceboxProfileCdpCapture, job: ScrapeJob
+) -> bool:
+    return (
+        job.max_candidates is not None
+        and cdp_capture.state.unique_candidate_count >= job.max_candidates
+    )
+
+
+async def discover_results_page_count(
+    cdp_capture: JuiceboxProfileCdpCapture,
+) -> int | None:
+    # Page 1's results usually load before the capture attaches, so reload
+    # it once to read the pagination metadata.
+    if cdp_capture.state.pagination is None:
+        reload_started_at = asyncio.get_running_loop().time()
+        await cdp_capture.reload_page()
+        await cdp_capture.wait_for_profile_response(
+            after=reload_started_at,
+            timeout_seconds=DIRECT_API_RESPONSE_TIMEOUT_SECONDS,
+            page_results=True,
+        )
+        cdp_capture.raise_if_failed()
+    return cdp_capture.results_page_count()
+
+
+@dataclass(slots=True)
+class ResultsTab:
+    page: object
+    current_page: int | None
+    owned: bool
+
+
+@dataclass(slots=True)
+class ParallelScrapeReport:
+    results_url: str = ""
+    scripted_cards: int = 0
+    hidden_cards: int = 0
+    failed_pages: list[int] = field(default_factory=list)
+
+
+async def position_results_tab(
+    tab: ResultsTab,
+    target_page: int,
+    *,
+    results_url: str,
+    capture: JuiceboxProfileCdpCapture,
+    response_timeout_seconds: float,
+    results_url_page: int = 1,
+) -> None:
+    if tab.current_page == target_page:
+        return
+
+    page_url = build_results_page_url(results_url, target_page, results_url_page)
+    if page_url is not None or tab.current_page is None or tab.current_page > target_page:
+        # Next only moves forward, so a tab that is past the target (or not
+        # on the results yet) starts over from the results URL.
+        capture.set_page_number(tab.page, target_page if page_url is not None else 1)
+        navigated_at = asyncio.get_running_loop().time()
+        with capture.timings.measure("resultsPageJump"):
+            await tab.page.goto(page_url or results_url, wait_until="domcontentloaded")
+            if not await capture.wait_for_profile_response(
+                after=navigated_at,
+                timeout_seconds=response_timeout_seconds,
+                page_results=True,
+                page=tab.page,
+            ):
+                await wait_for_next_page_settled(tab.page)
+        tab.current_page = target_page if page_url is not None else 1
+
+    while tab.current_page < target_page:
+        await click_next_on_page(
+            tab.page,
+            tab.current_page,
+            capture=capture,
+            response_timeout_seconds=response_timeout_seconds,
+        )
+        capture.raise_if_failed()
+        tab.current_page += 1
+
+
+async def scrape_pages_in_parallel_tabs(
+    connection: CdpConnection,
+    capture: JuiceboxProfileCdpCapture,
+    *,
+    first_page: int,
+    total_pages: int,
+    tab_count: int,
+    next_page_timeout_seconds: float = NEXT_PAGE_RESPONSE_TIMEOUT_SECONDS,
+    should_stop: Callable[[], bool] | None = None,
+) -> ParallelScrapeReport:
+    context = await connection.first_context()
+    origin_page = await get_active_context_page(context)
+    results_url = origin_page.url
+    report = ParallelScrapeReport(results_url=results_url)
+    page_numbers = list(range(first_page, total_pages + 1))
+    tab_count = max(1, min(tab_count, len(page_numbers)))
+
+    # The login tab is still on page 1; extra tabs share its cookies because
+    # they are opened in the same context.
+    tabs = [ResultsTab(page=origin_page, current_page=1, owned=False)]
+    try:
+        for _ in range(tab_count - 1):
+            new_page = await context.new_page()
+            tabs.append(ResultsTab(page=new_page, current_page=None, owned=True))
+            await capture.ensure_page_attached(new_page)
+
+        async def run_tab(tab_index: int, tab: ResultsTab) -> None:
+            assigned_pages = page_numbers[tab_index::tab_count]
+            for position, page_number in enumerate(assigned_pages):
+                if should_stop is not None and should_stop():
+                    return
+                try:
+                    await position_results_tab(
+                        tab,
+                        page_number,
+                        results_url=results_url,
+                        capture=capture,
+                        response_timeout_seconds=next_page_timeout_seconds,
+                    )
+                    walk = await walk_profile_cards(tab.page, capture)
+                except Exception as error:
+                    capture.raise_if_failed()
+                    print(
+                        f"[Scraper] Tab {tab_index + 1} failed on page {page_number}: {error}",
+                        flush=True,
+                    )
+                    # The tab's position is unknown now; the next page
+                    # reloads the results URL instead of clicking Next.
+                    tab.current_page = None
+                    capture.set_page_number(tab.page, None)
+                    report.failed_pages.append(page_number)
+                    continue
+
+                report.scripted_cards += walk.captured_count
+                report.hidden_cards += walk.skipped_hidden_count
+                if walk.card_count == 0 or walk.stalled:
+                    report.failed_pages.append(page_number)
+                print(
+                    (
+                        f"[Scraper] Tab {tab_index + 1} finished page "
+                        f"{page_number}/{total_pages} "
+                        f"scriptedCards={walk.captured_count} "
+                        f"hiddenCards={walk.skipped_hidden_count}"
+                        + (" stalled" if walk.stalled else "")
+                        + (" noCards" if walk.card_count == 0 else "")
+                    ),
+                    flush=True,
+                )
+
+        tab_tasks = [
+            asyncio.create_task(run_tab(tab_index, tab))
+            for tab_index, tab in enumerate(tabs)
+        ]
+        try:
+            await asyncio.gather(*tab_tasks)
+        except BaseException:
+            for task in tab_tasks:
+                task.cancel()
+            await asyncio.gather(*tab_tasks, return_exceptions=True)
+            raise
+    finally:
+        for tab in tabs:
+            if tab.owned and not tab.page.is_closed():
+                try:
+                    await tab.page.close()
+                except Exception:
+                    pass
+
+    report.failed_pages.sort()
+    return report
+
+
+async def main(
+    juicebox_url: str,
+    profile_id: str,
+    total_pages: int | None,
+    direct_api: bool = False,
+    next_page_timeout_seconds: float = NEXT_PAGE_RESPONSE_TIMEOUT_SECONDS,
+    parallel_tabs: int = 1,
+    agent_trace_cache: bool = True,
+    dedup_index_path: str | None = None,
+    incremental_store_path: str | None = None,
+    diff_fields: tuple[str, ...] = DEFAULT_DIFF_FIELDS,
+    stop_after_unchanged_pages: int | None = None,
+    max_candidates: int | None = None,
+    checkpoint_path: str | None = None,
+    resume_path: str | None = None,
+    timings_textfile_path: str | None = None,
+    trace_events_path: str | None = None,
+    project_fields: bool = False,
+    sqlite_sink_path: str | None = None,
+    candidate_channel: CandidateChannel | None = None,
+):
+    await run_scrape_job(
+        ScrapeJob(
+            target_url=juicebox_url,
+            profile_id=profile_id,
+            total_pages=total_pages,
+            direct_api=direct_api,
+            next_page_timeout_seconds=next_page_timeout_seconds,
+            parallel_tabs=parallel_tabs,
+            agent_trace_cache=agent_trace_cache,
+            dedup_index_path=dedup_index_path,
+            incremental_store_path=incremental_store_path,
+            diff_fields=diff_fields,
+            stop_after_unchanged_pages=stop_after_unchanged_pages,
+            max_candidates=max_candidates,
+            checkpoint_path=checkpoint_path,
+            resume_path=resume_path,
+            timings_textfile_path=timings_textfile_path,
+            trace_events_path=trace_events_path,
+            project_fields=project_fields,
+            sqlite_sink_path=sqlite_sink_path,
+        ),
+        ScraperOutput(candidate_channel=candidate_channel),
+    )
+
+
+async def main_with_candidate_channel(
+    candidate_output: str,
+    candidate_fd: int | None,
+    candidate_socket: str | None,
+    batch_size: int,
+    flush_interval_ms: float,
+    **main_kwargs: Any,
+) -> None:
+    if candidate_output == "lines":
+        await main(**main_kwargs)
+        return
+    candidate_channel = open_candidate_channel(
+        fd=candidate_fd,
+        socket_path=candidate_socket,
+        batch_size=batch_size,
+        flush_interval_ms=flush_interval_ms,
+    )
+    try:
+        await main(**main_kwargs, candidate_channel=candidate_channel)
+    finally:
+        candidate_channel.close()
+
+
+async def run_scrape_job(job: ScrapeJob, output: ScraperOutput) -> None:
+    session = await start_scrape_session(job.profile_id)
+    try:
+        await run_job_in_session(session, job, output)
+    finally:
+        await close_scrape_session(session)
+
+
+async def start_scrape_session(profile_id: str) -> ScrapeSession:
     email = require_env("CORE_EMAIL")
     password = require_env("CORE_PASSWORD")
     browser_use_api_key = require_env("BROWSER_USE_API_KEY")
-    scrape_prompt = get_scrape_prompt()
 
     llm = ChatBrowserUse(model="bu-2-0", api_key=browser_use_api_key)
 
@@ -229,7 +840,9 @@ async def main(juicebox_url: str, profile_id: str, total_pages: int):
         keep_alive=True,
     )
 
-    await browser.start()
+    start_timings = PhaseTimings()
+    with start_timings.measure("browserStart"):
+        await browser.start()
 
     print(f"[Scraper] Browser started: {browser.id}", flush=True)
     cloud_session_id = (
@@ -237,31 +850,189 @@ async def main(juicebox_url: str, profile_id: str, total_pages: int):
         if browser.browser_profile.use_cloud
         else browser.id
     )
-    if cloud_session_id:
-        print(f"SCRAPER_BROWSER_ID={cloud_session_id}", flush=True)
-        live_url = resolve_browser_use_live_url(cloud_session_id)
-        if live_url:
-            print(f"{BROWSER_USE_URL_PREFIX}{live_url}", flush=True)
-    else:
+    if not cloud_session_id:
         print(
             "[Scraper] Missing cloud session ID; falling back to browser ID for SCRAPER_BROWSER_ID",
             flush=True,
         )
-        print(f"SCRAPER_BROWSER_ID={browser.id}", flush=True)
-        live_url = resolve_browser_use_live_url(browser.id)
-        if live_url:
-            print(f"{BROWSER_USE_URL_PREFIX}{live_url}", flush=True)
-
-    agent = Agent(
-        task=get_login_prompt(juicebox_url),
+    browser_id = cloud_session_id or browser.id
+    with start_timings.measure("liveUrl"):
+        live_url = resolve_browser_use_live_url(browser_id)
+    return ScrapeSession(
+        profile_id=profile_id,
         browser=browser,
         llm=llm,
-        flash_mode=True,
         sensitive_data={
             "x_user": email,
             "x_pass": password,
         },
+        browser_id=browser_id,
+        live_url=live_url,
+        start_timings=start_timings,
+    )
+
+
+async def close_scrape_session(session: ScrapeSession) -> None:
+    if session.connection is not None:
+        try:
+            await session.connection.close()
+        except Exception as error:
+            print(f"[Scraper] CDP connection close failed: {error}", flush=True)
+        session.connection = None
+    browser = session.browser
+    if browser.browser_profile.use_cloud:
+        try:
+            await browser._cloud_browser_client.stop_browser()
+        except Exception as error:
+            print(f"[Scraper] Cloud browser stop failed: {error}", flush=True)
+    else:
+        await browser.stop()
+
+
+def is_same_page_url(current_url: str, target_url: str) -> bool:
+    current = urlsplit(current_url)
+    target = urlsplit(target_url)
+    return (
+        current.netloc.lower() == target.netloc.lower()
+        and current.path.rstrip("/") == target.path.rstrip("/")
+    )
+
+
+async def is_results_page_ready(page, target_url: str, timeout_seconds: float) -> bool:
+    # Either signal means the cloud profile's cookies are still valid:
+    # profile cards rendered, or the page results API answered with results.
+    loop = asyncio.get_running_loop()
+    results_response: asyncio.Future[None] = loop.create_future()
+    body_checks: set[asyncio.Task[None]] = set()
+
+    async def check_response(response) -> None:
+        try:
+            if extract_page_results(await response.json()) is not None:
+                if not results_response.done():
+                    results_response.set_result(None)
+        except Exception:
+            return
+
+    def on_response(response) -> None:
+        if results_response.done() or not response.ok:
+            return
+        if LOGIN_CHECK_RESPONSE_SUBSTRING not in response.url:
+            return
+        task = asyncio.create_task(check_response(response))
+        body_checks.add(task)
+        task.add_done_callback(body_checks.discard)
+
+    page.on("response", on_response)
+    cards_visible: asyncio.Task[Any] | None = None
+    try:
+        await page.goto(target_url, wait_until="domcontentloaded")
+        # A logged-out session redirects away from the results page. Only
+        # wait for cards once the navigation committed, or a warm tab still
+        # showing the previous results would pass before it even started.
+        if not is_same_page_url(page.url, target_url):
+            print(
+                f"[Scraper] Login check landed on {page.url} instead of the target",
+                flush=True,
+            )
+            return False
+        cards_visible = asyncio.create_task(
+            page.wait_for_selector(
+                ", ".join(PROFILE_CARD_SELECTORS),
+                state="visible",
+                timeout=timeout_seconds * 1_000,
+            )
+        )
+        done, _ = await asyncio.wait(
+            {cards_visible, results_response},
+            timeout=timeout_seconds,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        return any(not task.cancelled() and task.exception() is None for task in done)
+    except Exception as error:
+        print(f"[Scraper] Login check failed: {error}", flush=True)
+        return False
+    finally:
+        page.remove_listener("response", on_response)
+        if cards_visible is not None:
+            cards_visible.cancel()
+        results_response.cancel()
+        for task in list(body_checks):
+            task.cancel()
+
+
+async def open_session_target(
+    session: ScrapeSession, target_url: str, timings: PhaseTimings
+) -> bool:
+    # Returns whether the login agent had to run.
+    if session.connection is None:
+        cdp_url = session.browser.cdp_url
+        if not cdp_url:
+            raise BrowserSessionError("Browser CDP URL is missing after browser start")
+        session.connection = CdpConnection(cdp_url)
+
+    context = await session.connection.first_context()
+    try:
+        page = await get_active_context_page(context)
+    except BrowserSessionError:
+        page = await context.new_page()
+    with timings.measure("loginCheck"):
+        is_ready = await is_results_page_ready(
+            page, target_url, LOGIN_CHECK_TIMEOUT_SECONDS
+        )
+    if is_ready:
+        session.login_skip_count += 1
+        print(
+            (
+                "[Scraper] Results page loaded without login; skipping login agent "
+                f"(loginSkips={session.login_skip_count})"
+            ),
+            flush=True,
+        )
+        return False
+
+    print("[Scraper] Results page not ready; running login agent", flush=True)
+    agent = Agent(
+        task=get_login_prompt(target_url),
+        browser=session.browser,
+        llm=session.llm,
+        flash_mode=True,
+        sensitive_data=session.sensitive_data,
+    )
+    with timings.measure("loginAgent"):
+        try:
+            await agent.run()
+        except Exception as error:
+            raise BrowserSessionError("Login agent failed") from error
+    session.login_agent_run_count += 1
+    print(
+        f"[Scraper] Login complete (loginAgentRuns={session.login_agent_run_count})",
+        flush=True,
     )
+    return True
+
+
+async def run_job_in_session(
+    session: ScrapeSession, job: ScrapeJob, output: ScraperOutput
+) -> None:
+    juicebox_url = job.target_url
+    direct_api = job.direct_api
+    next_page_timeout_seconds = job.next_page_timeout_seconds
+    parallel_tabs = job.parallel_tabs
+    browser = session.browser
+    llm = session.llm
+    sensitive_data = session.sensitive_data
+    print(f"[Scraper] Starting for {juicebox_url}", flush=True)
+    scrape_prompt = get_scrape_prompt()
+    session.job_count += 1
+    job_started_at = time.perf_counter()
+    timings = PhaseTimings()
+    if session.job_count == 1:
+        timings.merge(session.start_timings)
+
+    output.emit_text(BROWSER_ID_PREFIX, session.browser_id)
+    if session.live_url:
+        output.emit_text(BROWSER_USE_URL_PREFIX, session.live_url)
+
     should_save_local_cdp = is_local_cdp_save_enabled()
     capture_run_dir: Path | None = None
     if should_save_local_cdp:
@@ -269,29 +1040,72 @@ async def main(juicebox_url: str, profile_id: str, total_pages: int):
         capture_run_dir = capture_dir / (
             f"profiles_{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S_%fZ')}"
         )
-        print(f"SCRAPER_PROFILE_CAPTURE_DIR={capture_run_dir}", flush=True)
-
-    def emit_user_payload(payload: Any) -> None:
-        print(
-            f"SCRAPER_USER_PAYLOAD={json.dumps(payload, ensure_ascii=True)}", flush=True
-        )
+        output.emit_text(PROFILE_CAPTURE_DIR_PREFIX, str(capture_run_dir))
 
     cdp_capture: JuiceboxProfileCdpCapture | None = None
+    scripted_card_count = 0
+    agent_card_count = 0
+    agent_trace_replay_count = 0
+    agent_trace_record_count = 0
+    ran_login_agent = False
+    trace_cache = (
+        AgentTraceCache(Path(__file__).resolve().parent / AGENT_TRACE_DIRNAME)
+        if job.agent_trace_cache
+        else None
+    )
+    dedup_index = CandidateDedupIndex(
+        Path(job.dedup_index_path) if job.dedup_index_path else None
+    )
+    diff_store = (
+        CandidateDiffStore(
+            Path(job.incremental_store_path), juicebox_url, job.diff_fields
+        )
+        if job.incremental_store_path
+        else None
+    )
+    sqlite_sink = (
+        SqliteCandidateSink(Path(job.sqlite_sink_path), juicebox_url, job.job_id)
+        if job.sqlite_sink_path
+        else None
+    )
+    resume_checkpoint = load_resume_checkpoint(job)
+    checkpoint_path = job.checkpoint_path or job.resume_path
+    crawl_completed = False
+    stop_reason: str | None = None
     try:
-        await agent.run()
-        print("[Scraper] Login complete", flush=True)
-
-        cdp_url = browser.cdp_url
-        if not cdp_url:
-            raise RuntimeError("Browser CDP URL is missing after login")
-
+        dedup_index.open()
+        if resume_checkpoint is not None:
+            dedup_index.seed(resume_checkpoint.emitted_candidate_ids)
+        if diff_store is not None:
+            diff_store.open()
+        if sqlite_sink is not None:
+            sqlite_sink.open()
+            # Tells the parent where to read this run back from if the
+            # scraper dies before its stdout is consumed.
+            output.emit_json(CANDIDATE_SINK_PREFIX, sqlite_sink.to_json())
+        ran_login_agent = await open_session_target(session, juicebox_url, timings)
+        cdp_connection = session.connection
         cdp_capture = JuiceboxProfileCdpCapture(
-            cdp_url=cdp_url,
+            cdp_url=cdp_connection.cdp_url,
             output_dir=capture_run_dir,
             profile_match_substring="/api/profile",
-            on_profile_payload=emit_user_payload,
+            on_profile_payload=output.emit_user_payload,
+            connection=cdp_connection,
+            dedup_index=dedup_index,
+            diff_store=diff_store,
+            timings=timings,
+            trace_path=Path(job.trace_events_path) if job.trace_events_path else None,
+            project_fields=job.project_fields,
+            sinks=(sqlite_sink,) if sqlite_sink is not None else (),
         )
         await cdp_capture.start()
+        if resume_checkpoint is not None:
+            cdp_capture.state.emitted_candidate_ids.update(
+                resume_checkpoint.emitted_candidate_ids
+            )
+            cdp_capture.state.unique_candidate_count = (
+                resume_checkpoint.unique_candidate_count
+            )
         if capture_run_dir is not None:
             print(
                 f"[Scraper] CDP profile capture enabled: {capture_run_dir}",
@@ -306,71 +1120,361 @@ async def main(juicebox_url: str, profile_id: str, total_pages: int):
                 flush=True,
             )
 
-        sensitive_data: dict[str, str] = {
-            "x_user": email,
-            "x_pass": password,
-        }
-        for current_page in range(1, total_pages + 1):
-            print(f"[Scraper] Scraping page {current_page}/{total_pages}", flush=True)
-            scrape_agent = Agent(
-                task=scrape_prompt,
-                browser=browser,
-                llm=llm,
-                flash_mode=True,
-                sensitive_data=sensitive_data,
+        page_limit = job.total_pages or AUTO_TOTAL_PAGES_LIMIT
+        pages_label = str(job.total_pages or AUTO_TOTAL_PAGES)
+        stopped_early = False
+        reached_last_page = False
+
+        def should_stop_after(page_number: int) -> bool:
+            nonlocal stop_reason, stopped_early, reached_last_page
+            if reached_candidate_target(cdp_capture, job):
+                stop_reason = f"reached {job.max_candidates} unique candidates"
+                stopped_early = True
+            elif cdp_capture.is_last_results_page(page_number):
+                stop_reason = "the page results API reported the last page"
+                reached_last_page = True
+            else:
+                return False
+            print(
+                f"[Scraper] Stopping after page {page_number}: {stop_reason}",
+                flush=True,
             )
-            await scrape_agent.run()
-            if cdp_capture is not None:
-                cdp_capture.raise_if_failed()
+            return True
+
+        async def finish_page(
+            page_number: int, results_url: str, results_url_page: int
+        ) -> bool:
+            # Drain the capture first so the checkpoint and the stop checks
+            # include every candidate from this page.
+            await cdp_capture.flush(next_page_timeout_seconds)
+            if checkpoint_path:
+                save_checkpoint(
+                    Path(checkpoint_path),
+                    CrawlCheckpoint(
+                        target_url=juicebox_url,
+                        completed_pages=page_number,
+                        results_url=results_url,
+                        results_url_page=results_url_page,
+                        emitted_candidate_ids=sorted(
+                            cdp_capture.state.emitted_candidate_ids
+                        ),
+                        unique_candidate_count=cdp_capture.state.unique_candidate_count,
+                        capture_stats=capture_stats(cdp_capture.state),
+                    ),
+                )
+            return should_stop_after(page_number)
+
+        results_page = await get_active_context_page(
+            await cdp_connection.first_context()
+        )
+        start_url = results_page.url
+        # Every path below starts from the results tab on page 1.
+        cdp_capture.set_page_number(results_page, 1)
+        completed_pages = 0
+        if resume_checkpoint is not None:
+            completed_pages = resume_checkpoint.completed_pages
             print(
-                f"[Scraper] Finished scraping page {current_page}/{total_pages}",
+                (
+                    f"[Scraper] Resuming after page {completed_pages} with "
+                    f"{len(resume_checkpoint.emitted_candidate_ids)} candidate ids "
+                    "already emitted"
+                ),
                 flush=True,
             )
+        if direct_api and completed_pages < page_limit:
+
+            async def finish_replayed_page(page_number: int) -> bool:
+                # Replays never move the UI, which stays on page 1.
+                return await finish_page(page_number, start_url, 1)
 
-            if current_page < total_pages:
-                await click_next_page(
-                    cdp_url=cdp_url,
-                    current_page=current_page,
+            completed_pages = max(
+                completed_pages,
+                await scrape_pages_via_direct_api(
+                    cdp_capture,
+                    page_limit,
+                    finish_replayed_page,
+                    first_page=completed_pages + 1,
+                ),
+            )
+
+        parallel_last_page: int | None = None
+        if parallel_tabs > 1 and completed_pages < page_limit and stop_reason is None:
+            # Tabs split a known page range up front, so auto mode needs the
+            # page count before they start.
+            page_count = (
+                await discover_results_page_count(cdp_capture)
+                if job.total_pages is None
+                else cdp_capture.results_page_count()
+            )
+            if page_count is not None:
+                parallel_last_page = max(1, min(page_limit, page_count))
+            elif job.total_pages is not None:
+                parallel_last_page = page_limit
+            else:
+                print(
+                    (
+                        "[Scraper] Page results API did not report a page count; "
+                        "walking pages one at a time"
+                    ),
+                    flush=True,
                 )
-                if cdp_capture is not None:
-                    cdp_capture.raise_if_failed()
 
-        if cdp_capture is not None:
+        if parallel_last_page is not None and completed_pages < parallel_last_page:
+            parallel_report = await scrape_pages_in_parallel_tabs(
+                cdp_connection,
+                cdp_capture,
+                first_page=completed_pages + 1,
+                total_pages=parallel_last_page,
+                tab_count=parallel_tabs,
+                next_page_timeout_seconds=next_page_timeout_seconds,
+                should_stop=lambda: reached_candidate_target(cdp_capture, job),
+            )
             cdp_capture.raise_if_failed()
-    finally:
-        capture_stop_error: Exception | None = None
-        if cdp_capture is not None:
-            try:
-                await cdp_capture.stop()
-                capture_stats = {
-                    "apiRequests": cdp_capture.state.api_request_count,
-                    "searchMatches": cdp_capture.state.profile_match_count,
-                    "savedSearchResponses": cdp_capture.state.saved_profile_count,
-                    "emittedCandidates": cdp_capture.state.emitted_candidate_count,
-                }
+            scripted_card_count += parallel_report.scripted_cards
+            if parallel_report.failed_pages:
                 print(
-                    f"{BROWSER_CAPTURE_STATS_PREFIX}{json.dumps(capture_stats, ensure_ascii=True)}",
+                    (
+                        "[Scraper] Card walker could not finish pages "
+                        f"{parallel_report.failed_pages}; retrying them one at a "
+                        "time with the scrape agent"
+                    ),
                     flush=True,
                 )
+            # The agent drives the browser's focused tab, so it cannot run
+            # alongside the parallel tabs; failed pages are retried afterwards.
+            fallback_tab: ResultsTab | None = None
+            for failed_page in parallel_report.failed_pages:
+                if reached_candidate_target(cdp_capture, job):
+                    break
+                if fallback_tab is None:
+                    context = await cdp_connection.first_context()
+                    fallback_tab = ResultsTab(
+                        page=await get_active_context_page(context),
+                        current_page=None,
+                        owned=False,
+                    )
+                await position_results_tab(
+                    fallback_tab,
+                    failed_page,
+                    results_url=parallel_report.results_url,
+                    capture=cdp_capture,
+                    response_timeout_seconds=next_page_timeout_seconds,
+                )
+                page_report = await scrape_current_page(
+                    browser=browser,
+                    llm=llm,
+                    connection=cdp_connection,
+                    capture=cdp_capture,
+                    scrape_prompt=scrape_prompt,
+                    sensitive_data=sensitive_data,
+                    trace_cache=trace_cache,
+                )
+                scripted_card_count += page_report.scripted_cards
+                agent_card_count += page_report.agent_cards
+                agent_trace_replay_count += int(page_report.replayed_trace)
+                agent_trace_record_count += int(page_report.recorded_trace)
                 print(
                     (
-                        "[Scraper] CDP capture stopped. "
-                        f"apiRequests={cdp_capture.state.api_request_count} "
-                        f"profileMatches={cdp_capture.state.profile_match_count} "
-                        f"savedProfiles={cdp_capture.state.saved_profile_count} "
-                        f"emittedCandidates={cdp_capture.state.emitted_candidate_count}"
+                        f"[Scraper] Retried page {failed_page}/{parallel_last_page} "
+                        f"scriptedCards={page_report.scripted_cards} "
+                        f"agentCards={page_report.agent_cards}"
                     ),
                     flush=True,
                 )
+            completed_pages = parallel_last_page
+            # Tabs finish pages out of order, so the checkpoint is only
+            # written once the whole range is done.
+            if not await finish_page(
+                parallel_last_page, parallel_report.results_url, 1
+            ):
+                reached_last_page = True
+        elif 0 < completed_pages < page_limit and stop_reason is None:
+            print(
+                (
+                    "[Scraper] Continuing with the scrape agent from page "
+                    f"{completed_pages + 1}/{pages_label}"
+                ),
+                flush=True,
+            )
+            # Replayed and checkpointed pages never moved the UI, so bring it
+            # to the first page that still needs the agent: through the page
+            # parameter of the results URL when it has one, else by Next.
+            await position_results_tab(
+                ResultsTab(page=results_page, current_page=1, owned=False),
+                completed_pages + 1,
+                results_url=(
+                    resume_checkpoint.results_url if resume_checkpoint else start_url
+                ),
+                results_url_page=(
+                    resume_checkpoint.results_url_page if resume_checkpoint else 1
+                ),
+                capture=cdp_capture,
+                response_timeout_seconds=next_page_timeout_seconds,
+            )
+            cdp_capture.raise_if_failed()
+
+        unchanged_page_streak = 0
+        page_diff_start = diff_store.counts.emitted if diff_store else 0
+        page_unchanged_start = diff_store.counts.unchanged if diff_store else 0
+        stop_on_unchanged = diff_store is not None and bool(
+            job.stop_after_unchanged_pages
+        )
+        current_page = completed_pages
+        while (
+            stop_reason is None
+            and not reached_last_page
+            and current_page < page_limit
+        ):
+            current_page += 1
+            print(f"[Scraper] Scraping page {current_page}/{pages_label}", flush=True)
+            page_report = await scrape_current_page(
+                browser=browser,
+                llm=llm,
+                connection=cdp_connection,
+                capture=cdp_capture,
+                scrape_prompt=scrape_prompt,
+                sensitive_data=sensitive_data,
+                trace_cache=trace_cache,
+            )
+            scripted_card_count += page_report.scripted_cards
+            agent_card_count += page_report.agent_cards
+            agent_trace_replay_count += int(page_report.replayed_trace)
+            agent_trace_record_count += int(page_report.recorded_trace)
+            print(
+                (
+                    f"[Scraper] Finished scraping page {current_page}/{pages_label} "
+                    f"scriptedCards={page_report.scripted_cards} "
+                    f"agentCards={page_report.agent_cards} "
+                    f"hiddenCards={page_report.hidden_cards}"
+                ),
+                flush=True,
+            )
+
+            active_page = await get_active_context_page(
+                await cdp_connection.first_context()
+            )
+            if await finish_page(current_page, active_page.url, current_page):
+                break
+            if stop_on_unchanged:
+                page_emitted = diff_store.counts.emitted - page_diff_start
+                page_unchanged = diff_store.counts.unchanged - page_unchanged_start
+                if page_emitted == 0 and page_unchanged > 0:
+                    unchanged_page_streak += 1
+                else:
+                    unchanged_page_streak = 0
+                if unchanged_page_streak >= job.stop_after_unchanged_pages:
+                    stop_reason = (
+                        f"{unchanged_page_streak} pages in a row had no new or "
+                        "changed candidates"
+                    )
+                    print(
+                        f"[Scraper] Stopping after page {current_page}: {stop_reason}",
+                        flush=True,
+                    )
+                    stopped_early = True
+                    break
+
+            if current_page < page_limit:
+                # The next page's results response lands during the click,
+                # so it belongs to the next page's counts.
+                if diff_store is not None:
+                    page_diff_start = diff_store.counts.emitted
+                    page_unchanged_start = diff_store.counts.unchanged
+                try:
+                    await click_next_page(
+                        connection=cdp_connection,
+                        current_page=current_page,
+                        capture=cdp_capture,
+                        response_timeout_seconds=next_page_timeout_seconds,
+                    )
+                except NextControlNotFoundError:
+                    if job.total_pages is not None:
+                        raise
+                    # Without API metadata a missing Next control is the
+                    # only sign of the last page in auto mode.
+                    print(
+                        f"[Scraper] No Next control after page {current_page}; "
+                        "treating it as the last page",
+                        flush=True,
+                    )
+                    reached_last_page = True
+                    break
+                cdp_capture.raise_if_failed()
+
+        if job.total_pages is None and not reached_last_page and stop_reason is None:
+            print(
+                (
+                    f"[Scraper] Stopped at the {AUTO_TOTAL_PAGES_LIMIT} page limit "
+                    "for --total-pages auto before the last page"
+                ),
+                flush=True,
+            )
+            stopped_early = True
+        # A resumed crawl skipped its first pages, so it did not see every
+        # candidate either.
+        crawl_completed = not stopped_early and resume_checkpoint is None
+        if cdp_capture is not None:
+            cdp_capture.raise_if_failed()
+    finally:
+        capture_stop_error: Exception | None = None
+        if cdp_capture is not None:
+            try:
+                await cdp_capture.stop()
             except Exception as error:
                 capture_stop_error = error
-        if browser.browser_profile.use_cloud:
+        dedup_index.close()
+        if sqlite_sink is not None:
+            sqlite_sink.close()
+        if diff_store is not None:
+            # Tombstones need every queued candidate classified, so a capture
+            # that failed to drain does not count as a completed crawl.
+            diff_store.close(
+                crawl_completed=crawl_completed and capture_stop_error is None
+            )
+        if cdp_capture is not None and capture_stop_error is None:
+            # Buffered channel records are only counted once written.
+            output.flush()
+            output.emit_capture_stats(
+                {
+                    **capture_stats(cdp_capture.state),
+                    **output.candidate_stats(),
+                    "scriptedCards": scripted_card_count,
+                    "agentCards": agent_card_count,
+                    "parallelTabs": parallel_tabs,
+                    "agentTraceReplays": agent_trace_replay_count,
+                    "agentTraceRecords": agent_trace_record_count,
+                    "loginAgentRuns": int(ran_login_agent),
+                    "loginSkips": int(not ran_login_agent),
+                    "stopReason": stop_reason,
+                    **(
+                        {"sqliteSinkUpserts": sqlite_sink.written_count}
+                        if sqlite_sink is not None
+                        else {}
+                    ),
+                    **(diff_store.counts.to_json() if diff_store is not None else {}),
+                }
+            )
+            print(
+                (
+                    "[Scraper] CDP capture stopped. "
+                    f"apiRequests={cdp_capture.state.api_request_count} "
+                    f"profileMatches={cdp_capture.state.profile_match_count} "
+                    f"savedProfiles={cdp_capture.state.saved_profile_count} "
+                    f"emittedCandidates={cdp_capture.state.emitted_candidate_count}"
+                ),
+                flush=True,
+            )
+        timings.record("job", time.perf_counter() - job_started_at)
+        output.emit_json(TIMINGS_PREFIX, timings.to_json())
+        if job.timings_textfile_path:
             try:
-                await browser._cloud_browser_client.stop_browser()
-            except Exception as error:
-                print(f"[Scraper] Cloud browser stop failed: {error}", flush=True)
-        else:
-            await browser.stop()
+                write_prometheus_textfile(
+                    Path(job.timings_textfile_path),
+                    timings,
+                    {"job": job.job_id} if job.job_id else None,
+                )
+            except OSError as error:
+                print(f"[Scraper] Could not write timings textfile: {error}", flush=True)
         if capture_stop_error is not None:
             raise capture_stop_error
 
@@ -379,6 +1483,194 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--target-url", required=True)
     parser.add_argument("--profile-id", required=True)
-    parser.add_argument("--total-pages", type=int, required=True)
+    parser.add_argument(
+        "--total-pages",
+        type=parse_total_pages,
+        required=True,
+        help=(
+            "Results pages to scrape, or 'auto' to stop at the last page the "
+            "page results API reports."
+        ),
+    )
+    parser.add_argument(
+        "--direct-api",
+        action="store_true",
+        help="Replay the page results API request instead of clicking through pages.",
+    )
+    parser.add_argument(
+        "--next-page-timeout",
+        type=float,
+        default=NEXT_PAGE_RESPONSE_TIMEOUT_SECONDS,
+        help="Seconds to wait for the next page results response after clicking Next.",
+    )
+    parser.add_argument(
+        "--parallel-tabs",
+        type=int,
+        default=1,
+        help="Scrape this many results pages at once in separate tabs of the same browser.",
+    )
+    parser.add_argument(
+        "--no-agent-trace-cache",
+        action="store_true",
+        help="Always plan the scrape agent with the LLM instead of replaying cached traces.",
+    )
+    parser.add_argument(
+        "--dedup-index",
+        default=None,
+        help=(
+            "SQLite file of candidate identities already emitted; shared across "
+            "runs so repeat crawls skip known candidates."
+        ),
+    )
+    parser.add_argument(
+        "--incremental-store",
+        default=None,
+        help=(
+            "SQLite file of candidate content hashes per search URL; only new or "
+            "changed candidates are emitted."
+        ),
+    )
+    parser.add_argument(
+        "--diff-fields",
+        default=",".join(DEFAULT_DIFF_FIELDS),
+        help="Comma-separated candidate fields that make up the content hash.",
+    )
+    parser.add_argument(
+        "--stop-after-unchanged-pages",
+        type=int,
+        default=None,
+        help=(
+            "With --incremental-store, stop once this many pages in a row had no "
+            "new or changed candidates."
+        ),
+    )
+    parser.add_argument(
+        "--max-candidates",
+        type=int,
+        default=None,
+        help="Stop once this many unique candidates have been emitted.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="JSON file to save crawl progress to after every page.",
+    )
+    parser.add_argument(
+        "--resume",
+        default=None,
+        help=(
+            "Checkpoint file to continue a crawl from; it keeps being updated "
+            "unless --checkpoint names another file."
+        ),
+    )
+    parser.add_argument(
+        "--timings-textfile",
+        default=None,
+        help=(
+            "Also write phase timings to this file in Prometheus text format, "
+            "e.g. for the node_exporter textfile collector."
+        ),
+    )
+    parser.add_argument(
+        "--trace-events",
+        default=None,
+        help=(
+            "Write a Chrome trace-event JSON of every captured profile request's "
+            "lifecycle here when the capture stops; opens in Perfetto."
+        ),
+    )
+    parser.add_argument(
+        "--project-fields",
+        action="store_true",
+        help=(
+            "Emit only the candidate fields agents/core/jb-schema.ts declares, "
+            "under their canonical names, instead of whole Juicebox payloads."
+        ),
+    )
+    parser.add_argument(
+        "--sqlite-sink",
+        default=None,
+        help=(
+            "Also upsert every emitted candidate into this SQLite file, with its "
+            "search URL, page number and capture time."
+        ),
+    )
+    parser.add_argument(
+        "--candidate-output",
+        choices=("lines", "batched"),
+        default="lines",
+        help=(
+            "How candidates are written: one flushed SCRAPER_USER_PAYLOAD line "
+            "each, or in batches on stdout, --candidate-fd or --candidate-socket."
+        ),
+    )
+    candidate_destination = parser.add_mutually_exclusive_group()
+    candidate_destination.add_argument(
+        "--candidate-fd",
+        type=int,
+        default=None,
+        help="Write batched candidates as NDJSON to this inherited file descriptor.",
+    )
+    candidate_destination.add_argument(
+        "--candidate-socket",
+        default=None,
+        help="Write batched candidates as NDJSON to this listening Unix socket.",
+    )
+    parser.add_argument(
+        "--candidate-batch-size",
+        type=int,
+        default=DEFAULT_CHANNEL_BATCH_SIZE,
+        help="With batched output, write once this many candidates are waiting.",
+    )
+    parser.add_argument(
+        "--candidate-flush-ms",
+        type=float,
+        default=DEFAULT_CHANNEL_FLUSH_INTERVAL_MS,
+        help="With batched output, write waiting candidates after this many ms.",
+    )
     args = parser.parse_args()
-    asyncio.run(main(args.target_url, args.profile_id, args.total_pages))
+    if (
+        args.candidate_fd is not None or args.candidate_socket is not None
+    ) and args.candidate_output != "batched":
+        parser.error(
+            "--candidate-fd and --candidate-socket require --candidate-output batched"
+        )
+    if args.candidate_batch_size < 1:
+        parser.error("--candidate-batch-size must be at least 1")
+    if args.parallel_tabs < 1:
+        parser.error("--parallel-tabs must be at least 1")
+    if args.stop_after_unchanged_pages is not None and not args.incremental_store:
+        parser.error("--stop-after-unchanged-pages requires --incremental-store")
+    if args.max_candidates is not None and args.max_candidates < 1:
+        parser.error("--max-candidates must be at least 1")
+    asyncio.run(
+        main_with_candidate_channel(
+            args.candidate_output,
+            args.candidate_fd,
+            args.candidate_socket,
+            args.candidate_batch_size,
+            args.candidate_flush_ms,
+            juicebox_url=args.target_url,
+            profile_id=args.profile_id,
+            total_pages=args.total_pages,
+            direct_api=args.direct_api,
+            next_page_timeout_seconds=args.next_page_timeout,
+            parallel_tabs=args.parallel_tabs,
+            agent_trace_cache=not args.no_agent_trace_cache,
+            dedup_index_path=args.dedup_index,
+            incremental_store_path=args.incremental_store,
+            diff_fields=tuple(
+                field_name.strip()
+                for field_name in args.diff_fields.split(",")
+                if field_name.strip()
+            ),
+            stop_after_unchanged_pages=args.stop_after_unchanged_pages,
+            max_candidates=args.max_candidates,
+            checkpoint_path=args.checkpoint,
+            resume_path=args.resume,
+            timings_textfile_path=args.timings_textfile,
+            trace_events_path=args.trace_events,
+            project_fields=args.project_fields,
+            sqlite_sink_path=args.sqlite_sink,
+        )
+    )
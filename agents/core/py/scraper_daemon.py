@@ -0,0 +1,300 @@
+import argparse
+import asyncio
+import signal
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from scrape_scheduler import JobResult, parse_job_line
+from scraper import (
+    ScrapeJob,
+    ScrapeSession,
+    close_scrape_session,
+    is_browser_failure,
+    run_job_in_session,
+    start_scrape_session,
+)
+from scraper_output import (
+    JOB_RESULT_PREFIX,
+    LineDrain,
+    LineWriter,
+    ScraperOutput,
+    write_stdout_line,
+)
+
+DEFAULT_BROWSER_IDLE_TTL_SECONDS = 10 * 60
+IDLE_SWEEP_INTERVAL_SECONDS = 30
+# How long cancelled jobs get to close their capture and stores on shutdown.
+JOB_CANCEL_GRACE_SECONDS = 10
+JOB_ERROR_PREFIX = "SCRAPER_JOB_ERROR="
+
+
+@dataclass(slots=True)
+class WarmSession:
+    session: ScrapeSession
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_used_at: float = 0.0
+    # Jobs that hold or are waiting for the lock; the sweeper never evicts
+    # a session that still has any.
+    active_jobs: int = 0
+    broken: bool = False
+
+
+class WarmSessionPool:
+    def __init__(self, idle_ttl_seconds: float = DEFAULT_BROWSER_IDLE_TTL_SECONDS) -> None:
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.started_session_count = 0
+        self.evicted_session_count = 0
+        self._sessions: dict[str, WarmSession] = {}
+        self._starting: dict[str, asyncio.Task[ScrapeSession]] = {}
+
+    async def run_job(self, job: ScrapeJob, output: ScraperOutput) -> bool:
+        # Jobs for one profile share its browser one at a time; different
+        # profiles run concurrently. Returns whether the browser was warm.
+        while True:
+            warm, was_warm = await self._acquire(job.profile_id)
+            try:
+                async with warm.lock:
+                    if warm.broken:
+                        continue
+                    try:
+                        await run_job_in_session(warm.session, job, output)
+                    except Exception as error:
+                        # A logged-out or disconnected browser is replaced
+                        # for the next job; a bad checkpoint or job option
+                        # says nothing about the browser, so it stays warm.
+                        if is_browser_failure(error):
+                            self._discard(warm)
+                        raise
+                    return was_warm
+            finally:
+                warm.active_jobs -= 1
+                warm.last_used_at = asyncio.get_running_loop().time()
+                if warm.broken and warm.active_jobs == 0:
+                    await close_scrape_session(warm.session)
+
+    async def evict_idle(self) -> None:
+        now = asyncio.get_running_loop().time()
+        for profile_id, warm in list(self._sessions.items()):
+            if warm.active_jobs > 0 or now - warm.last_used_at < self.idle_ttl_seconds:
+                continue
+            del self._sessions[profile_id]
+            self.evicted_session_count += 1
+            print(f"[Daemon] Evicting idle browser for profile {profile_id}", flush=True)
+            await close_scrape_session(warm.session)
+
+    async def run_idle_sweeper(self) -> None:
+        while True:
+            await asyncio.sleep(IDLE_SWEEP_INTERVAL_SECONDS)
+            await self.evict_idle()
+
+    async def close(self) -> None:
+        for task in self._starting.values():
+            task.cancel()
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for warm in sessions:
+            await close_scrape_session(warm.session)
+
+    async def _acquire(self, profile_id: str) -> tuple[WarmSession, bool]:
+        warm = self._sessions.get(profile_id)
+        if warm is not None:
+            warm.active_jobs += 1
+            return warm, True
+
+        # Concurrent jobs for a cold profile share one browser start.
+        task = self._starting.get(profile_id)
+        if task is None:
+            task = asyncio.create_task(start_scrape_session(profile_id))
+            self._starting[profile_id] = task
+        try:
+            session = await asyncio.shield(task)
+        finally:
+            if self._starting.get(profile_id) is task and task.done():
+                del self._starting[profile_id]
+
+        warm = self._sessions.get(profile_id)
+        if warm is None or warm.session is not session:
+            warm = WarmSession(session=session)
+            self._sessions[profile_id] = warm
+            self.started_session_count += 1
+        warm.active_jobs += 1
+        return warm, False
+
+    def _discard(self, warm: WarmSession) -> None:
+        warm.broken = True
+        if self._sessions.get(warm.session.profile_id) is warm:
+            del self._sessions[warm.session.profile_id]
+
+
+class ScraperDaemon:
+    def __init__(self, pool: WarmSessionPool) -> None:
+        self.pool = pool
+        self._job_count = 0
+
+    async def handle_line(
+        self, line: bytes, write_line: LineWriter, drain: LineDrain | None = None
+    ) -> None:
+        if not line.strip():
+            return
+        self._job_count += 1
+        try:
+            job = parse_job_line(line, f"job-{self._job_count}")
+        except ValueError as error:
+            ScraperOutput(write_line=write_line).emit_json(
+                JOB_ERROR_PREFIX, {"error": str(error)}
+            )
+            return
+
+        output = ScraperOutput(job.job_id, write_line, drain=drain)
+        result = JobResult(job_id=str(job.job_id), attempts=1)
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        was_warm = False
+        try:
+            was_warm = await self.pool.run_job(job, output)
+            result.status = "succeeded"
+        except asyncio.CancelledError:
+            # Shutdown: still tell the consumer the job will not finish.
+            result.status = "cancelled"
+            self._emit_result(output, result, was_warm, loop.time() - started_at)
+            raise
+        except Exception as error:
+            result.status = "failed"
+            result.error = f"{type(error).__name__}: {error}"
+        self._emit_result(output, result, was_warm, loop.time() - started_at)
+        if drain is not None:
+            await drain()
+
+    def _emit_result(
+        self,
+        output: ScraperOutput,
+        result: JobResult,
+        was_warm: bool,
+        elapsed_seconds: float,
+    ) -> None:
+        if output.capture_stats is not None:
+            result.stats = output.capture_stats
+        output.emit_json(
+            JOB_RESULT_PREFIX,
+            {
+                **result.to_json(),
+                "warmBrowser": was_warm,
+                "elapsedSeconds": round(elapsed_seconds, 3),
+            },
+        )
+
+    async def serve_lines(
+        self, read_line, write_line: LineWriter, drain: LineDrain | None = None
+    ) -> None:
+        job_tasks: set[asyncio.Task[None]] = set()
+        try:
+            while line := await read_line():
+                task = asyncio.create_task(self.handle_line(line, write_line, drain))
+                job_tasks.add(task)
+                task.add_done_callback(job_tasks.discard)
+        except asyncio.CancelledError:
+            # Shutdown does not wait for multi-page crawls: running jobs are
+            # cancelled and get a bounded grace period to clean up.
+            for task in job_tasks:
+                task.cancel()
+            if job_tasks:
+                await asyncio.wait(job_tasks, timeout=JOB_CANCEL_GRACE_SECONDS)
+            raise
+        # End of input: the jobs already read still run to completion.
+        if job_tasks:
+            await asyncio.gather(*job_tasks, return_exceptions=True)
+
+    async def serve_stdin(self) -> None:
+        # A StreamReader on the stdin pipe, unlike readline() in a thread,
+        # is cancelled with serve_task, so a signal stops the daemon without
+        # waiting for another input line.
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        try:
+            await loop.connect_read_pipe(
+                lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+            )
+        except ValueError:
+            # Regular files cannot be watched; reading them never blocks.
+            async def read_file_line() -> bytes:
+                return await asyncio.to_thread(sys.stdin.buffer.readline)
+
+            await self.serve_lines(read_file_line, write_stdout_line)
+            return
+        await self.serve_lines(reader.readline, write_stdout_line)
+
+    async def serve_unix_socket(self, socket_path: Path) -> None:
+        async def handle_client(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            # writer.write only buffers; draining after every candidate and
+            # result bounds that buffer for a client that reads slowly.
+            try:
+                await self.serve_lines(reader.readline, writer.write, writer.drain)
+                await writer.drain()
+            finally:
+                writer.close()
+
+        socket_path.unlink(missing_ok=True)
+        server = await asyncio.start_unix_server(handle_client, path=str(socket_path))
+        print(f"[Daemon] Listening on {socket_path}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+async def run_daemon(socket_path: Path | None, idle_ttl_seconds: float) -> None:
+    pool = WarmSessionPool(idle_ttl_seconds)
+    daemon = ScraperDaemon(pool)
+    sweeper = asyncio.create_task(pool.run_idle_sweeper())
+    serve_task = asyncio.create_task(
+        daemon.serve_stdin()
+        if socket_path is None
+        else daemon.serve_unix_socket(socket_path)
+    )
+    loop = asyncio.get_running_loop()
+    for shutdown_signal in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(shutdown_signal, serve_task.cancel)
+    try:
+        await serve_task
+    except asyncio.CancelledError:
+        pass
+    finally:
+        sweeper.cancel()
+        await pool.close()
+        if socket_path is not None:
+            socket_path.unlink(missing_ok=True)
+        print(
+            (
+                "[Daemon] Stopped. "
+                f"startedBrowsers={pool.started_session_count} "
+                f"evictedBrowsers={pool.evicted_session_count}"
+            ),
+            flush=True,
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="Unix socket path to accept JSON-lines jobs on. Reads stdin when omitted.",
+    )
+    parser.add_argument(
+        "--idle-ttl",
+        type=float,
+        default=DEFAULT_BROWSER_IDLE_TTL_SECONDS,
+        help="Seconds a warm browser may sit idle before it is stopped.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(
+        run_daemon(
+            Path(args.socket) if args.socket else None,
+            args.idle_ttl,
+        )
+    )
@@ -0,0 +1,364 @@
+import asyncio
+import queue
+import socket
+import sys
+import threading
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import json_codec
+from batch_flusher import BatchFlusher
+
+USER_PAYLOAD_PREFIX = "SCRAPER_USER_PAYLOAD="
+CAPTURE_STATS_PREFIX = "SCRAPER_CAPTURE_STATS="
+BROWSER_ID_PREFIX = "SCRAPER_BROWSER_ID="
+BROWSER_USE_URL_PREFIX = "SCRAPER_BROWSER_USE_URL="
+PROFILE_CAPTURE_DIR_PREFIX = "SCRAPER_PROFILE_CAPTURE_DIR="
+JOB_RESULT_PREFIX = "SCRAPER_JOB_RESULT="
+SCHEDULER_STATS_PREFIX = "SCRAPER_SCHEDULER_STATS="
+TIMINGS_PREFIX = "SCRAPER_TIMINGS="
+CANDIDATE_CHANNEL_PREFIX = "SCRAPER_CANDIDATE_CHANNEL="
+CANDIDATE_SINK_PREFIX = "SCRAPER_CANDIDATE_SINK="
+
+CANDIDATE_CHANNEL_FORMAT = "scraper-candidates+ndjson"
+CANDIDATE_CHANNEL_VERSION = 1
+DEFAULT_CHANNEL_BATCH_SIZE = 200
+DEFAULT_CHANNEL_FLUSH_INTERVAL_MS = 250
+# Bytes a channel's writer thread may have queued before emitters wait.
+CHANNEL_MAX_PENDING_BYTES = 8 * 1024 * 1024
+CHANNEL_DRAIN_POLL_SECONDS = 0.1
+
+
+LineWriter = Callable[[bytes], None]
+LineDrain = Callable[[], Awaitable[None]]
+
+
+def write_stdout_line(line: bytes) -> None:
+    # Log lines go through print(); flush that text layer before writing
+    # encoded bytes straight to the underlying buffer so ordering holds.
+    sys.stdout.flush()
+    sys.stdout.buffer.write(line)
+    sys.stdout.buffer.flush()
+
+
+def write_prefixed_line(
+    prefix: str, value: Any, write_line: LineWriter = write_stdout_line
+) -> None:
+    write_line(prefix.encode("ascii") + json_codec.dumps_bytes(value) + b"\n")
+
+
+def write_prefixed_text(
+    prefix: str, text: str, write_line: LineWriter = write_stdout_line
+) -> None:
+    write_line(prefix.encode("ascii") + text.encode("utf-8") + b"\n")
+
+
+def tag_prefix(prefix: str, job_id: str | None) -> str:
+    # "SCRAPER_USER_PAYLOAD=" becomes "SCRAPER_USER_PAYLOAD[<jobId>]=" so
+    # several jobs can share one stdout.
+    if job_id is None:
+        return prefix
+    return f"{prefix[:-1]}[{job_id}]="
+
+
+class BackgroundWriter:
+    # Runs a blocking write on its own thread, the way NdjsonCaptureStore
+    # writes segments, so a slow reader on the other end of a socket or fd
+    # never stalls the event loop. drain() holds the crawl back once more
+    # than max_pending_bytes are queued.
+    def __init__(
+        self,
+        write: Callable[[bytes], Any],
+        close: Callable[[], None],
+        *,
+        name: str,
+        max_pending_bytes: int = CHANNEL_MAX_PENDING_BYTES,
+    ) -> None:
+        self.name = name
+        self.max_pending_bytes = max_pending_bytes
+        self.error: BaseException | None = None
+        self._write = write
+        self._close = close
+        self._queue: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+        self._pending_bytes = 0
+        self._written = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def write(self, data: bytes) -> None:
+        self.raise_if_failed()
+        with self._written:
+            self._pending_bytes += len(data)
+        self._queue.put(data)
+
+    async def drain(self) -> None:
+        while self._pending_bytes > self.max_pending_bytes and self.error is None:
+            await asyncio.to_thread(self._wait_for_write, CHANNEL_DRAIN_POLL_SECONDS)
+        self.raise_if_failed()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._close()
+        self.raise_if_failed()
+
+    def raise_if_failed(self) -> None:
+        if self.error is not None:
+            raise RuntimeError(f"{self.name} write failed") from self.error
+
+    def _wait_for_write(self, timeout_seconds: float) -> None:
+        with self._written:
+            self._written.wait_for(
+                lambda: self._pending_bytes <= self.max_pending_bytes
+                or self.error is not None,
+                timeout_seconds,
+            )
+
+    def _run(self) -> None:
+        try:
+            while (data := self._queue.get()) is not None:
+                # Whatever queued up while the last write blocked goes out
+                # in one write.
+                chunks = [data]
+                stopping = False
+                while True:
+                    try:
+                        chunk = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if chunk is None:
+                        stopping = True
+                        break
+                    chunks.append(chunk)
+                data = b"".join(chunks)
+                self._write(data)
+                with self._written:
+                    self._pending_bytes -= len(data)
+                    self._written.notify_all()
+                if stopping:
+                    break
+        except BaseException as error:
+            with self._written:
+                self.error = error
+                self._written.notify_all()
+
+
+class CandidateChannel:
+    # Candidates written a batch at a time through a BatchFlusher. On a
+    # dedicated fd or socket the stream is plain NDJSON behind one header
+    # line; on stdout every record keeps the SCRAPER_USER_PAYLOAD= prefix so
+    # it can still share the pipe with logs.
+    def __init__(
+        self,
+        write: Callable[[bytes], None],
+        transport: dict[str, Any],
+        record_prefix: bytes = b"",
+        close: Callable[[], None] | None = None,
+        batch_size: int = DEFAULT_CHANNEL_BATCH_SIZE,
+        flush_interval_ms: float = DEFAULT_CHANNEL_FLUSH_INTERVAL_MS,
+        drain: LineDrain | None = None,
+    ) -> None:
+        self.transport = transport
+        # Set when write only queues; waits until the queue is short again.
+        self.drain = drain
+        self.record_count = 0
+        self.batch_count = 0
+        self.byte_count = 0
+        self._write = write
+        self._close = close
+        self._record_prefix = record_prefix
+        self._batches: BatchFlusher[bytes] = BatchFlusher(
+            self._write_records,
+            name="Candidate channel",
+            batch_size=batch_size,
+            flush_interval_ms=flush_interval_ms,
+        )
+        self._closed = False
+
+    def header(self) -> dict[str, Any]:
+        return {
+            "format": CANDIDATE_CHANNEL_FORMAT,
+            "version": CANDIDATE_CHANNEL_VERSION,
+            "transport": self.transport,
+            "batchSize": self._batches.batch_size,
+            "flushIntervalMs": round(self._batches.flush_interval_seconds * 1000),
+            "jsonBackend": json_codec.JSON_BACKEND,
+        }
+
+    def write_header(self) -> None:
+        # Stdout records are self-describing through their prefix; only a
+        # dedicated channel opens with the header line itself.
+        if not self._record_prefix:
+            self._write(json_codec.dumps_bytes(self.header()) + b"\n")
+
+    def emit(self, payload: Any) -> int:
+        # Returns the serialised size of the record itself.
+        if self._closed:
+            raise RuntimeError("Candidate channel is closed")
+        record = json_codec.dumps_bytes(payload)
+        self._batches.add(self._record_prefix + record + b"\n")
+        return len(record)
+
+    def flush(self) -> None:
+        self._batches.flush()
+
+    def _write_records(self, records: list[bytes]) -> None:
+        # Counted only once write accepted the batch.
+        data = b"".join(records)
+        self._write(data)
+        self.record_count += len(records)
+        self.batch_count += 1
+        self.byte_count += len(data)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            if self._close is not None:
+                self._close()
+
+
+def open_candidate_channel(
+    fd: int | None = None,
+    socket_path: str | None = None,
+    batch_size: int = DEFAULT_CHANNEL_BATCH_SIZE,
+    flush_interval_ms: float = DEFAULT_CHANNEL_FLUSH_INTERVAL_MS,
+) -> CandidateChannel:
+    if fd is not None and socket_path is not None:
+        raise ValueError("Pass at most one of fd and socket_path")
+    if socket_path is not None:
+        # The consumer listens; the scraper connects as the only writer.
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            client.connect(socket_path)
+        except OSError:
+            client.close()
+            raise
+        writer = BackgroundWriter(
+            client.sendall, client.close, name="Candidate channel"
+        )
+        channel = CandidateChannel(
+            writer.write,
+            {"type": "unix", "path": socket_path},
+            close=writer.close,
+            batch_size=batch_size,
+            flush_interval_ms=flush_interval_ms,
+            drain=writer.drain,
+        )
+    elif fd is not None:
+        stream = open(fd, "wb", buffering=0)
+
+        def write_all(data: bytes) -> None:
+            view = memoryview(data)
+            while view:
+                view = view[stream.write(view) :]
+
+        writer = BackgroundWriter(write_all, stream.close, name="Candidate channel")
+        channel = CandidateChannel(
+            writer.write,
+            {"type": "fd", "fd": fd},
+            close=writer.close,
+            batch_size=batch_size,
+            flush_interval_ms=flush_interval_ms,
+            drain=writer.drain,
+        )
+    else:
+        channel = CandidateChannel(
+            write_stdout_line,
+            {"type": "stdout"},
+            record_prefix=USER_PAYLOAD_PREFIX.encode("ascii"),
+            batch_size=batch_size,
+            flush_interval_ms=flush_interval_ms,
+        )
+    channel.write_header()
+    return channel
+
+
+class ScraperOutput:
+    def __init__(
+        self,
+        job_id: str | None = None,
+        write_line: LineWriter = write_stdout_line,
+        candidate_channel: CandidateChannel | None = None,
+        drain: LineDrain | None = None,
+    ) -> None:
+        self.job_id = job_id
+        self.write_line = write_line
+        # Waits until write_line's buffer is below its limit, for writers
+        # that buffer instead of blocking.
+        self.drain = drain
+        self.candidate_channel = candidate_channel
+        self.capture_stats: dict[str, Any] | None = None
+        self._line_candidate_bytes = 0
+        # Serialised sizes of projected records and of the full payloads
+        # they were cut down from.
+        self.projected_record_bytes = 0
+        self.projected_payload_bytes = 0
+        if candidate_channel is not None:
+            # Announced on stdout so the consumer knows where candidates go
+            # and which channel version to expect before any arrive.
+            self.emit_json(CANDIDATE_CHANNEL_PREFIX, candidate_channel.header())
+
+    @property
+    def candidate_bytes(self) -> int:
+        # Bytes of candidate records actually written, prefixes included.
+        if self.candidate_channel is not None:
+            return self.candidate_channel.byte_count
+        return self._line_candidate_bytes
+
+    def emit_user_payload(
+        self, payload: Any, full_payload: Any = None
+    ) -> Awaitable[None] | None:
+        # The emitter awaits the returned drain, so a slow reader holds back
+        # the crawl instead of its output piling up in memory.
+        drain = self.drain
+        if self.candidate_channel is not None:
+            record_size = self.candidate_channel.emit(payload)
+            drain = self.candidate_channel.drain
+        else:
+            prefix = tag_prefix(USER_PAYLOAD_PREFIX, self.job_id)
+            record = json_codec.dumps_bytes(payload)
+            line = prefix.encode("ascii") + record + b"\n"
+            self.write_line(line)
+            self._line_candidate_bytes += len(line)
+            record_size = len(record)
+        if full_payload is not None and full_payload is not payload:
+            # Projected records only: the full payload is serialised solely
+            # to report what projection saved.
+            self.projected_record_bytes += record_size
+            self.projected_payload_bytes += len(json_codec.dumps_bytes(full_payload))
+        if drain is not None:
+            return drain()
+        return None
+
+    def candidate_stats(self) -> dict[str, int]:
+        return {
+            "emittedCandidateBytes": self.candidate_bytes,
+            "projectedPayloadBytes": self.projected_payload_bytes,
+            "projectedRecordBytes": self.projected_record_bytes,
+            "projectionBytesSaved": (
+                self.projected_payload_bytes - self.projected_record_bytes
+            ),
+        }
+
+    def emit_capture_stats(self, stats: dict[str, Any]) -> None:
+        self.capture_stats = stats
+        self.emit_json(CAPTURE_STATS_PREFIX, stats)
+
+    def emit_json(self, prefix: str, value: Any) -> None:
+        # Buffered candidates go out first, so stats and results never
+        # overtake the candidates they describe.
+        self.flush()
+        write_prefixed_line(tag_prefix(prefix, self.job_id), value, self.write_line)
+
+    def emit_text(self, prefix: str, text: str) -> None:
+        self.flush()
+        write_prefixed_text(tag_prefix(prefix, self.job_id), text, self.write_line)
+
+    def flush(self) -> None:
+        if self.candidate_channel is not None:
+            self.candidate_channel.flush()
@@ -0,0 +1,103 @@
+import sqlite3
+
+from candidate_dedup import (
+    CandidateDedupIndex,
+    candidate_content_hash,
+    candidate_identities,
+    payload_hash,
+)
+
+SUMMARY = {"id": "a", "full_name": "Ada Lovelace"}
+FULL_PROFILE = {
+    "id": "a",
+    "full_name": "Ada Lovelace",
+    "experience": [{"company_name": "Analytical Engines"}],
+}
+
+
+def test_identities_follow_the_payload_key_aliases():
+    payload = {
+        "result": {"candidateId": "42"},
+        "linkedinUrl": "https://www.LinkedIn.com/in/Ada/?trk=x",
+        "email": "Ada@Example.com",
+    }
+    assert candidate_identities(payload) == [
+        "id:42",
+        "linkedin:linkedin.com/in/ada",
+        "email:ada@example.com",
+    ]
+
+
+def test_summary_and_full_profile_are_each_emitted_once_per_run():
+    index = CandidateDedupIndex()
+    added = [index.add(payload) for payload in (SUMMARY, FULL_PROFILE) * 2]
+    assert added == [True, True, False, False]
+
+
+def test_index_file_suppresses_known_payloads_in_later_runs(tmp_path):
+    index_path = tmp_path / "dedup.sqlite"
+    with CandidateDedupIndex(index_path) as index:
+        assert [index.add(SUMMARY), index.add(FULL_PROFILE)] == [True, True]
+    with CandidateDedupIndex(index_path) as index:
+        assert [index.add(SUMMARY), index.add(FULL_PROFILE)] == [False, False]
+        assert index.add({**FULL_PROFILE, "full_name": "Ada King"})
+
+
+def test_seeded_identities_are_suppressed_whatever_their_content():
+    index = CandidateDedupIndex()
+    index.seed(["id:a"])
+    assert not index.add(FULL_PROFILE)
+    assert index.add({"id": "b"})
+
+
+def test_identity_only_index_is_migrated(tmp_path):
+    index_path = tmp_path / "dedup.sqlite"
+    connection = sqlite3.connect(index_path)
+    connection.execute(
+        "CREATE TABLE seen_candidates "
+        "(identity TEXT PRIMARY KEY, first_seen_at TEXT NOT NULL)"
+    )
+    connection.execute("INSERT INTO seen_candidates VALUES ('id:a', '2026-01-01')")
+    connection.commit()
+    connection.close()
+
+    with CandidateDedupIndex(index_path) as index:
+        # Identity-only rows say nothing about content, so the payload is
+        # emitted once more and then known.
+        assert index.add(SUMMARY)
+    with CandidateDedupIndex(index_path) as index:
+        assert not index.add(SUMMARY)
+
+
+def test_raw_payload_hash_index_starts_over(tmp_path):
+    index_path = tmp_path / "dedup.sqlite"
+    connection = sqlite3.connect(index_path)
+    connection.execute(
+        "CREATE TABLE seen_candidates (identity TEXT NOT NULL, "
+        "content_hash TEXT NOT NULL, first_seen_at TEXT NOT NULL, "
+        "PRIMARY KEY (identity, content_hash))"
+    )
+    connection.execute(
+        "INSERT INTO seen_candidates VALUES ('id:a', ?, '2026-01-01')",
+        (payload_hash(FULL_PROFILE),),
+    )
+    connection.execute("PRAGMA user_version = 1")
+    connection.commit()
+    connection.close()
+
+    with CandidateDedupIndex(index_path) as index:
+        assert index.add(FULL_PROFILE)
+    connection = sqlite3.connect(index_path)
+    assert connection.execute("PRAGMA user_version").fetchone()[0] == 2
+    assert connection.execute(
+        "SELECT content_hash FROM seen_candidates"
+    ).fetchall() == [(candidate_content_hash(FULL_PROFILE),)]
+    connection.close()
+
+
+def test_volatile_fields_do_not_make_a_known_payload_new(tmp_path):
+    index_path = tmp_path / "dedup.sqlite"
+    with CandidateDedupIndex(index_path) as index:
+        assert index.add({**FULL_PROFILE, "fetchedAt": "2026-01-01", "score": 0.4})
+    with CandidateDedupIndex(index_path) as index:
+        assert not index.add({**FULL_PROFILE, "fetchedAt": "2026-02-01", "score": 0.7})
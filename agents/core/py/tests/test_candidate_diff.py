@@ -0,0 +1,138 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from candidate_dedup import CandidateDedupIndex
+from candidate_diff import (
+    CANDIDATE_CHANGED,
+    CANDIDATE_NEW,
+    CANDIDATE_UNCHANGED,
+    CandidateDiffStore,
+    candidate_content_hash,
+    DEFAULT_DIFF_FIELDS,
+)
+
+SEARCH_URL = "https://juicebox.example/search/1"
+SUMMARY = {"id": "a", "full_name": "Ada Lovelace"}
+FULL_PROFILE = {
+    "id": "a",
+    "full_name": "Ada Lovelace",
+    "experience": [{"company_name": "Analytical Engines"}],
+}
+
+
+def run_crawl(store_path, payloads, crawl_completed=True):
+    store = CandidateDiffStore(store_path, SEARCH_URL)
+    store.open()
+    statuses = [store.classify(payload) for payload in payloads]
+    store.close(crawl_completed=crawl_completed)
+    return statuses, store.counts
+
+
+def test_summary_and_full_profile_do_not_overwrite_each_other(tmp_path):
+    store_path = tmp_path / "diff.sqlite"
+    statuses, _ = run_crawl(store_path, [SUMMARY, FULL_PROFILE])
+    assert statuses == [CANDIDATE_NEW, CANDIDATE_NEW]
+    for _ in range(2):
+        statuses, counts = run_crawl(store_path, [SUMMARY, FULL_PROFILE])
+        assert statuses == [CANDIDATE_UNCHANGED, CANDIDATE_UNCHANGED]
+        assert counts.emitted == 0
+
+
+def test_changed_content_replaces_the_stale_hash(tmp_path):
+    store_path = tmp_path / "diff.sqlite"
+    moved = {**FULL_PROFILE, "experience": [{"company_name": "Royal Society"}]}
+    run_crawl(store_path, [FULL_PROFILE])
+    assert run_crawl(store_path, [moved])[0] == [CANDIDATE_CHANGED]
+    # The old content was dropped once the crawl completed, so going back
+    # to it is a change too.
+    assert run_crawl(store_path, [FULL_PROFILE])[0] == [CANDIDATE_CHANGED]
+
+
+def test_completed_crawl_tombstones_missing_candidates(tmp_path):
+    store_path = tmp_path / "diff.sqlite"
+    run_crawl(store_path, [SUMMARY, FULL_PROFILE, {"id": "b"}])
+
+    _, counts = run_crawl(store_path, [{"id": "b"}], crawl_completed=False)
+    assert counts.removed == 0
+    _, counts = run_crawl(store_path, [{"id": "b"}])
+    assert counts.removed == 1
+    assert run_crawl(store_path, [SUMMARY])[0] == [CANDIDATE_NEW]
+
+
+def test_single_hash_store_is_migrated(tmp_path):
+    store_path = tmp_path / "diff.sqlite"
+    connection = sqlite3.connect(store_path)
+    connection.execute(
+        "CREATE TABLE candidate_hashes (search_url TEXT NOT NULL, "
+        "identity TEXT NOT NULL, content_hash TEXT NOT NULL, "
+        "first_seen_at TEXT NOT NULL, last_seen_at TEXT NOT NULL, "
+        "removed_at TEXT, PRIMARY KEY (search_url, identity))"
+    )
+    connection.execute(
+        "INSERT INTO candidate_hashes VALUES (?, 'id:a', ?, '2026-01-01', "
+        "'2026-01-01', NULL)",
+        (SEARCH_URL, candidate_content_hash(SUMMARY, DEFAULT_DIFF_FIELDS)),
+    )
+    connection.commit()
+    connection.close()
+
+    statuses, _ = run_crawl(store_path, [SUMMARY, FULL_PROFILE])
+    assert statuses == [CANDIDATE_UNCHANGED, CANDIDATE_CHANGED]
+    assert run_crawl(store_path, [SUMMARY, FULL_PROFILE])[0] == [
+        CANDIDATE_UNCHANGED,
+        CANDIDATE_UNCHANGED,
+    ]
+
+
+def test_dedup_index_does_not_hide_candidates_from_the_diff_store(tmp_path):
+    cdp_capture = pytest.importorskip("cdp_capture")
+    store_path = tmp_path / "diff.sqlite"
+    index_path = tmp_path / "dedup.sqlite"
+
+    for _ in range(3):
+        diff_store = CandidateDiffStore(store_path, SEARCH_URL)
+        diff_store.open()
+        with CandidateDedupIndex(index_path) as dedup_index:
+            emitter = cdp_capture.ProfilePayloadEmitter(
+                cdp_capture.CaptureState(),
+                lambda record, payload: None,
+                dedup_index,
+                diff_store,
+            )
+            asyncio.run(emitter.emit([{"id": "a"}]))
+        diff_store.close(crawl_completed=True)
+        assert diff_store.counts.removed == 0
+
+    connection = sqlite3.connect(store_path)
+    assert connection.execute(
+        "SELECT removed_at FROM candidate_hashes WHERE identity = 'id:a'"
+    ).fetchall() == [(None,)]
+    connection.close()
+
+
+def test_candidate_is_matched_on_any_identity(tmp_path):
+    store_path = tmp_path / "diff.sqlite"
+    by_url = {"full_name": "Ada Lovelace", "linkedin_url": "linkedin.com/in/ada"}
+    with_id = {**by_url, "id": "a"}
+    run_crawl(store_path, [by_url])
+
+    # Gaining an id field would otherwise move the candidate to a new
+    # identity: reported as new, and the old one tombstoned as removed.
+    statuses, counts = run_crawl(store_path, [with_id])
+    assert statuses == [CANDIDATE_UNCHANGED]
+    assert counts.removed == 0
+    statuses, counts = run_crawl(store_path, [{**by_url, "rank": 7}])
+    assert statuses == [CANDIDATE_UNCHANGED]
+    assert counts.removed == 0
+
+
+def test_candidates_seen_through_disjoint_identities_are_merged(tmp_path):
+    store_path = tmp_path / "diff.sqlite"
+    by_url = {"full_name": "Ada Lovelace", "linkedin_url": "linkedin.com/in/ada"}
+    run_crawl(store_path, [by_url, {"id": "a", "full_name": "Ada Lovelace"}])
+
+    statuses, counts = run_crawl(store_path, [{**by_url, "id": "a"}])
+    assert statuses == [CANDIDATE_UNCHANGED]
+    assert counts.removed == 0
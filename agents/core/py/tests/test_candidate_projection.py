@@ -0,0 +1,77 @@
+from candidate_projection import (
+    CandidateProjector,
+    project_candidate,
+    project_value,
+)
+
+
+def test_top_level_aliases_resolve_to_canonical_keys():
+    record = project_candidate(
+        {
+            "candidateId": "42",
+            "fullName": "Ada Lovelace",
+            "headline": "Analyst",
+            "linkedinUrl": "https://linkedin.com/in/ada",
+            "summary": "  ",
+            "description": "Wrote the first program",
+            "tracking": {"impressionId": "x"},
+            "score": None,
+        }
+    )
+    assert record == {
+        "id": "42",
+        "full_name": "Ada Lovelace",
+        "summary": "Wrote the first program",
+        "job_title": "Analyst",
+        "linkedin_url": "https://linkedin.com/in/ada",
+    }
+    # Keys follow the schema's order, not the payload's.
+    assert list(record) == ["id", "full_name", "summary", "job_title", "linkedin_url"]
+
+
+def test_result_wrapper_keys_win():
+    record = project_candidate({"id": "outer", "result": {"id": "inner"}})
+    assert record == {"id": "inner"}
+
+
+def test_nested_entries_keep_only_schema_fields():
+    record = project_candidate(
+        {
+            "id": "a",
+            "experience": [
+                {
+                    "company_name": "Analytical Engines",
+                    "company": {"name": "AE", "logo_blob": "x" * 100},
+                    "title": {"name": "Analyst", "embedding": [0.1, 0.2]},
+                    "internal_rank": 3,
+                }
+            ],
+            "education": [{"school": {"name": "Home", "location": {"country": "uk"}}}],
+        }
+    )
+    assert record["experience"] == [
+        {
+            "company_name": "Analytical Engines",
+            "company": {"name": "AE"},
+            "title": {"name": "Analyst"},
+        }
+    ]
+    assert record["education"] == [
+        {"school": {"name": "Home", "location": {"country": "uk"}}}
+    ]
+
+
+def test_unexpected_shapes_pass_through():
+    projection = {"name": None}
+    assert project_value("plain text", projection) == "plain text"
+    assert project_value(["a", {"name": "b", "x": 1}], projection) == [
+        "a",
+        {"name": "b"},
+    ]
+
+
+def test_projector_counts_projected_candidates():
+    projector = CandidateProjector()
+    projector.project({"id": "a"})
+    projector.project({"id": "b"})
+    assert projector.to_json() == {"projectedCandidates": 2}
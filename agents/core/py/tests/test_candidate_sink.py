@@ -0,0 +1,105 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from candidate_sink import CandidateContext, SqliteCandidateSink
+
+SEARCH_URL = "https://juicebox.example/search/1"
+CAPTURED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def read_rows(store_path):
+    connection = sqlite3.connect(store_path)
+    try:
+        return connection.execute(
+            "SELECT identity, run_id, page_number, first_captured_at, "
+            "captured_at, payload FROM candidates ORDER BY identity"
+        ).fetchall()
+    finally:
+        connection.close()
+
+
+def test_upsert_keeps_one_row_per_candidate(tmp_path):
+    store_path = tmp_path / "candidates.sqlite"
+    first_run = SqliteCandidateSink(store_path, SEARCH_URL, "run-1")
+    first_run.open()
+    first_run.write({"id": "a"}, CandidateContext(CAPTURED_AT, page_number=2))
+    first_run.write({"id": "b"}, CandidateContext(CAPTURED_AT, page_number=2))
+    first_run.close()
+
+    later = CAPTURED_AT + timedelta(days=1)
+    second_run = SqliteCandidateSink(store_path, SEARCH_URL, "run-2")
+    second_run.open()
+    # No page number (a replay) keeps the one already stored.
+    second_run.write({"id": "a", "full_name": "Ada"}, CandidateContext(later))
+    second_run.close()
+
+    assert read_rows(store_path) == [
+        (
+            "id:a",
+            "run-2",
+            2,
+            CAPTURED_AT.isoformat(),
+            later.isoformat(),
+            '{"id":"a","full_name":"Ada"}',
+        ),
+        (
+            "id:b",
+            "run-1",
+            2,
+            CAPTURED_AT.isoformat(),
+            CAPTURED_AT.isoformat(),
+            '{"id":"b"}',
+        ),
+    ]
+    assert second_run.written_count == 1
+
+
+def test_rows_are_written_a_batch_at_a_time(tmp_path):
+    store_path = tmp_path / "candidates.sqlite"
+
+    async def run():
+        sink = SqliteCandidateSink(
+            store_path, SEARCH_URL, batch_size=3, flush_interval_ms=10_000
+        )
+        sink.open()
+        for index in range(4):
+            sink.write({"id": str(index)}, CandidateContext(CAPTURED_AT))
+        # The fourth row waits for the next batch or the flush timer.
+        assert len(read_rows(store_path)) == 3
+        sink.close()
+
+    asyncio.run(run())
+    assert len(read_rows(store_path)) == 4
+
+
+def test_failed_upsert_is_raised_and_not_counted(tmp_path):
+    store_path = tmp_path / "candidates.sqlite"
+    sink = SqliteCandidateSink(store_path, SEARCH_URL, batch_size=10)
+    sink.open()
+    connection = sqlite3.connect(store_path)
+    connection.execute("DROP TABLE candidates")
+    connection.commit()
+    connection.close()
+
+    async def run():
+        sink.write({"id": "a"}, CandidateContext(CAPTURED_AT))
+        with pytest.raises(RuntimeError, match="SQLite candidate sink write failed"):
+            sink.flush()
+
+    asyncio.run(run())
+    assert sink.written_count == 0
+    # The first error sticks: later writes and close report it too.
+    with pytest.raises(RuntimeError, match="SQLite candidate sink write failed"):
+        sink.write({"id": "b"}, CandidateContext(CAPTURED_AT))
+    with pytest.raises(RuntimeError, match="SQLite candidate sink write failed"):
+        sink.close()
+
+
+def test_write_before_open_is_an_error(tmp_path):
+    sink = SqliteCandidateSink(tmp_path / "candidates.sqlite", SEARCH_URL)
+    with pytest.raises(RuntimeError, match="not open"):
+        sink.write({"id": "a"}, CandidateContext(CAPTURED_AT))
+    assert sink.to_json()["runId"] == sink.run_id
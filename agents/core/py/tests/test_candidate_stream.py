@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from candidate_stream import CandidateStream
+
+
+async def collect(stream):
+    return [item async for item in stream]
+
+
+def test_unbatched_stream_yields_each_candidate_until_end():
+    async def run():
+        stream = CandidateStream()
+        for index in range(3):
+            await stream.put({"id": index})
+        stream.end()
+        return await collect(stream)
+
+    assert asyncio.run(run()) == [{"id": 0}, {"id": 1}, {"id": 2}]
+
+
+def test_batches_fill_up_to_batch_size():
+    async def run():
+        stream = CandidateStream(batch_size=2, max_latency_ms=1000)
+        for index in range(5):
+            await stream.put(index)
+        stream.end()
+        return await collect(stream)
+
+    assert asyncio.run(run()) == [[0, 1], [2, 3], [4]]
+
+
+def test_partial_batch_is_yielded_after_the_latency_bound():
+    async def run():
+        stream = CandidateStream(batch_size=10, max_latency_ms=20)
+        await stream.put("a")
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        batch = await anext(stream)
+        return batch, loop.time() - started_at
+
+    batch, waited = asyncio.run(run())
+    assert batch == ["a"]
+    assert waited < 0.5
+
+
+def test_full_queue_holds_the_producer_back():
+    async def run():
+        stream = CandidateStream(max_queued=2)
+        put_count = 0
+
+        async def produce():
+            nonlocal put_count
+            for index in range(5):
+                await stream.put(index)
+                put_count += 1
+            stream.end()
+
+        producer = asyncio.create_task(produce())
+        await asyncio.sleep(0.01)
+        blocked_at = put_count
+        items = await collect(stream)
+        await producer
+        return blocked_at, items
+
+    blocked_at, items = asyncio.run(run())
+    assert blocked_at == 2
+    assert items == [0, 1, 2, 3, 4]
+
+
+def test_aclose_releases_blocked_producers():
+    async def run():
+        closed = []
+        stream = CandidateStream(max_queued=1, on_close=closed.append)
+        await stream.put("kept")
+        producer = asyncio.create_task(stream.put("blocked"))
+        await asyncio.sleep(0.01)
+        assert not producer.done()
+        async with stream:
+            pass
+        await asyncio.wait_for(producer, timeout=1)
+        # Puts after closing are dropped rather than queued.
+        await stream.put("late")
+        return closed == [stream], await collect(stream)
+
+    called_on_close, items = asyncio.run(run())
+    assert called_on_close
+    assert items == []
+
+
+def test_batch_size_must_be_positive():
+    with pytest.raises(ValueError):
+        CandidateStream(batch_size=0)
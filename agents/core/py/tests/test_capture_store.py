@@ -0,0 +1,60 @@
+from capture_store import (
+    INDEX_FILENAME,
+    NdjsonCaptureStore,
+    encode_capture_line,
+    find_capture_record,
+    iter_capture_files,
+    read_capture_file,
+    read_capture_index,
+)
+
+
+def write_records(output_dir, count, **store_options):
+    store = NdjsonCaptureStore(output_dir, **store_options)
+    store.start()
+    for index in range(count):
+        store.append(
+            {"requestId": f"r{index}", "url": f"https://j/api/profile/{index}"},
+            raw_json=b'{"pageResults":[{"id":"%d"}]}' % index,
+        )
+    store.close()
+    return store
+
+
+def test_segments_rotate_at_the_size_limit(tmp_path):
+    line_size = len(
+        encode_capture_line(
+            {"requestId": "r0", "url": "https://j/api/profile/0"},
+            b'{"pageResults":[{"id":"0"}]}',
+            None,
+        )
+    )
+    store = write_records(tmp_path, 5, segment_max_bytes=line_size * 2)
+    assert store.error is None
+    assert store.written_record_count == 5
+    segments = iter_capture_files(tmp_path)
+    assert [len(read_capture_file(path)) for path in segments] == [2, 2, 1]
+
+
+def test_index_points_at_each_record(tmp_path):
+    write_records(tmp_path, 4, segment_max_bytes=200)
+    entries = read_capture_index(tmp_path)
+    assert [entry.request_id for entry in entries] == ["r0", "r1", "r2", "r3"]
+    record = find_capture_record(tmp_path, request_id="r2")
+    assert record["json"] == {"pageResults": [{"id": "2"}]}
+    assert find_capture_record(tmp_path, url="https://j/api/profile/3")[
+        "requestId"
+    ] == "r3"
+    assert find_capture_record(tmp_path, request_id="missing") is None
+
+
+def test_torn_index_line_is_skipped(tmp_path):
+    write_records(tmp_path, 2)
+    with (tmp_path / INDEX_FILENAME).open("ab") as index_file:
+        index_file.write(b'{"requestId": "r2", "segm')
+    assert len(read_capture_index(tmp_path)) == 2
+
+
+def test_multiline_bodies_are_reencoded():
+    line = encode_capture_line({"requestId": "r"}, b'{\n "a": 1\n}', {"a": 1})
+    assert line == b'{"requestId":"r","json":{"a":1}}\n'
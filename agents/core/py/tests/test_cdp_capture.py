@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import pytest
+
+cdp_capture = pytest.importorskip("cdp_capture")
+
+SEARCH_API = "https://juicebox.example/api/profile/search"
+
+
+class BlockedBodySession:
+    # Holds every Network.getResponseBody call until released.
+    def __init__(self) -> None:
+        self.released = asyncio.Event()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, method, params=None):
+        if method != "Network.getResponseBody":
+            return {}
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await self.released.wait()
+        finally:
+            self.in_flight -= 1
+        body = {"pageResults": [{"id": params["requestId"]}]}
+        return {"body": json.dumps(body), "base64Encoded": False}
+
+    async def detach(self):
+        pass
+
+
+class IdleConnection:
+    def add_reconnect_callback(self, callback):
+        pass
+
+    def remove_reconnect_callback(self, callback):
+        pass
+
+
+def test_response_bodies_are_fetched_by_a_bounded_worker_pool():
+    async def run():
+        emitted = []
+        capture = cdp_capture.JuiceboxProfileCdpCapture(
+            cdp_url="ws://browser",
+            on_profile_payload=lambda record, payload: emitted.append(record),
+            connection=IdleConnection(),
+            fetch_worker_count=2,
+            max_queued_responses=3,
+        )
+        session = BlockedBodySession()
+        target = cdp_capture.CaptureTarget(
+            target_id="T1",
+            session=session,
+            stats=cdp_capture.TargetCaptureStats("T1", "page", SEARCH_API),
+            page=None,
+        )
+
+        async def attach_fake_target():
+            capture._targets["T1"] = target
+            capture._primary_target = target
+
+        capture._attach_all_targets = attach_fake_target
+        await capture.start()
+        for index in range(8):
+            request_id = f"r{index}"
+            request = {"url": SEARCH_API, "method": "POST", "headers": {}}
+            capture._on_request_will_be_sent(
+                target, {"requestId": request_id, "request": request}
+            )
+            capture._on_response_received(
+                target, {"requestId": request_id, "response": {"url": SEARCH_API}}
+            )
+            capture._on_loading_finished(target, {"requestId": request_id})
+        # Events arrive faster than the workers start: the queue holds three
+        # and the rest are dropped rather than buffered without bound.
+        assert capture.state.dropped_response_count == 5
+        await asyncio.sleep(0.05)
+        assert session.max_in_flight == 2
+
+        session.released.set()
+        assert await capture.flush(1)
+        stats = cdp_capture.capture_stats(capture.state)
+        await capture.stop()
+        return emitted, stats
+
+    emitted, stats = asyncio.run(run())
+    assert sorted(record["id"] for record in emitted) == ["r0", "r1", "r2"]
+    assert stats["maxQueuedResponses"] == 3
+    assert stats["droppedResponses"] == 5
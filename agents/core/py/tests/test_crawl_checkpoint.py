@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from candidate_dedup import CandidateDedupIndex
+from crawl_checkpoint import CrawlCheckpoint, load_checkpoint, save_checkpoint
+
+TARGET_URL = "https://juicebox.example/search/1"
+
+
+def checkpoint(completed_pages):
+    return CrawlCheckpoint(
+        target_url=TARGET_URL,
+        completed_pages=completed_pages,
+        results_url=f"{TARGET_URL}?page={completed_pages}",
+        results_url_page=completed_pages,
+        emitted_candidate_ids=["id:a", "linkedin:linkedin.com/in/b"],
+        unique_candidate_count=2,
+        capture_stats={"apiRequests": 4},
+    )
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "crawl" / "checkpoint.json"
+    save_checkpoint(path, checkpoint(3))
+    loaded = load_checkpoint(path)
+    assert loaded.updated_at
+    assert loaded.to_json() == {
+        **checkpoint(3).to_json(),
+        "updatedAt": loaded.updated_at,
+    }
+    # Only the checkpoint itself is left behind.
+    assert [child.name for child in path.parent.iterdir()] == ["checkpoint.json"]
+
+
+def test_failed_save_keeps_the_previous_checkpoint(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    save_checkpoint(path, checkpoint(1))
+    broken = checkpoint(2)
+    broken.capture_stats = {"unserialisable": object()}
+    with pytest.raises(TypeError):
+        save_checkpoint(path, broken)
+    assert load_checkpoint(path).completed_pages == 1
+    assert [child.name for child in tmp_path.iterdir()] == ["checkpoint.json"]
+
+
+def test_unknown_version_is_rejected(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    path.write_text(json.dumps({**checkpoint(1).to_json(), "version": 99}))
+    with pytest.raises(ValueError, match="Unsupported checkpoint version"):
+        load_checkpoint(path)
+
+
+def test_resume_suppresses_candidates_the_checkpoint_emitted(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    save_checkpoint(path, checkpoint(2))
+    index = CandidateDedupIndex()
+    index.seed(load_checkpoint(path).emitted_candidate_ids)
+    # Matched on any identity, whatever the content.
+    assert not index.add({"id": "a", "full_name": "Ada Lovelace"})
+    assert not index.add({"linkedin_url": "https://linkedin.com/in/b"})
+    assert index.add({"id": "c"})
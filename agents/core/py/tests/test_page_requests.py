@@ -0,0 +1,86 @@
+import json
+
+from page_requests import (
+    PageRequestTemplate,
+    build_page_fetch_expression,
+    build_page_request,
+    build_results_page_url,
+    replayable_headers,
+)
+
+SEARCH_API = "https://juicebox.example/api/profile/search"
+
+
+def template(**changes):
+    values = {"url": SEARCH_API, "method": "POST", "headers": {}}
+    values.update(changes)
+    return PageRequestTemplate(**values)
+
+
+def test_page_number_in_a_nested_body_keeps_its_type():
+    request = build_page_request(
+        template(post_data='{"query": {"q": "ml", "page": "2"}}'),
+        page_number=5,
+        template_page_number=2,
+    )
+    assert request is not None
+    assert json.loads(request.post_data) == {"query": {"q": "ml", "page": "5"}}
+
+
+def test_offset_moves_by_the_page_size():
+    request = build_page_request(
+        template(post_data='{"offset": 0, "limit": 25}'), page_number=3
+    )
+    assert request is not None
+    assert json.loads(request.post_data) == {"offset": 50, "limit": 25}
+
+    # Without a size in the body, the size learned from the response is used.
+    request = build_page_request(
+        template(post_data='{"offset": 0}', page_size=10), page_number=2
+    )
+    assert request is not None
+    assert json.loads(request.post_data) == {"offset": 10}
+
+
+def test_query_string_page_is_rewritten():
+    request = build_page_request(
+        template(url=f"{SEARCH_API}?q=ml&page=1", method="GET"), page_number=4
+    )
+    assert request is not None
+    assert request.url == f"{SEARCH_API}?q=ml&page=4"
+
+
+def test_unpaginated_request_cannot_be_replayed():
+    assert build_page_request(template(post_data='{"q": "ml"}'), 2) is None
+    assert build_page_request(template(post_data="not json"), 2) is None
+    same = template(post_data='{"q": "ml"}')
+    assert build_page_request(same, 1) is same
+
+
+def test_replayable_headers_drop_what_fetch_sets_itself():
+    headers = replayable_headers(
+        {
+            ":authority": "juicebox.example",
+            "Content-Type": "application/json",
+            "Cookie": "session=1",
+            "sec-ch-ua": "x",
+            "X-Api-Version": 2,
+        }
+    )
+    assert headers == {"Content-Type": "application/json", "X-Api-Version": "2"}
+
+
+def test_fetch_expression_omits_the_body_for_get():
+    expression = build_page_fetch_expression(
+        template(method="GET", post_data='{"page": 1}')
+    )
+    assert '"body"' not in expression
+    assert '"credentials": "include"' in expression
+
+
+def test_results_page_url_needs_a_page_number_in_the_query():
+    url = "https://juicebox.example/search?id=7&page=2"
+    assert build_results_page_url(url, 5, url_page_number=2) == (
+        "https://juicebox.example/search?id=7&page=5"
+    )
+    assert build_results_page_url("https://juicebox.example/search?offset=0", 2) is None
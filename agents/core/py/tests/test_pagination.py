@@ -0,0 +1,62 @@
+from pagination import (
+    PaginationInfo,
+    extract_empty_page_pagination,
+    extract_pagination,
+)
+
+PROFILES = [{"id": str(index)} for index in range(10)]
+
+
+def test_page_count_prefers_reported_pages_over_totals():
+    assert PaginationInfo(10, total_results=95, total_pages=4).page_count() == 4
+    assert PaginationInfo(10, total_results=95, page_size=10).page_count() == 10
+    assert PaginationInfo(10, total_results=95).page_count() is None
+    assert PaginationInfo(10, total_results=95).page_count(20) == 5
+
+
+def test_is_last_page():
+    # has_more wins over every count.
+    assert not PaginationInfo(0, has_more=True).is_last_page(9)
+    assert PaginationInfo(10, has_more=False).is_last_page(1)
+    assert PaginationInfo(0).is_last_page(1)
+    assert PaginationInfo(10, total_pages=3).is_last_page(3)
+    assert not PaginationInfo(10, total_pages=3).is_last_page(2)
+    # A short page is the last one when nothing else is reported.
+    assert PaginationInfo(4, page_size=10).is_last_page(1)
+    assert not PaginationInfo(10, page_size=10).is_last_page(1)
+    assert not PaginationInfo(4).is_last_page(1)
+
+
+def test_metadata_is_read_from_the_closest_node():
+    payload = {
+        "total": 500,
+        "data": {
+            "pageResults": PROFILES,
+            "pagination": {"total": 95, "pageSize": "10", "nextCursor": None},
+        },
+    }
+    pagination = extract_pagination(payload, ("data", "pageResults"), PROFILES)
+    assert pagination == PaginationInfo(
+        results_count=10, total_results=95, page_size=10, has_more=False
+    )
+    assert pagination.to_json()["totalPages"] == 10
+
+
+def test_elasticsearch_style_totals():
+    payload = {"hits": {"total": {"value": 30, "relation": "eq"}, "items": []}}
+    assert extract_pagination(payload, ("hits", "items"), []).total_results == 30
+
+
+def test_empty_page_with_metadata_is_a_last_page():
+    payload = {"data": {"pageResults": [], "meta": {"totalResults": 20}}}
+    pagination = extract_empty_page_pagination(payload)
+    assert pagination is not None
+    assert pagination.results_count == 0
+    assert pagination.is_last_page(3)
+
+
+def test_empty_list_without_metadata_is_not_a_results_page():
+    assert extract_empty_page_pagination({"profiles": []}) is None
+    assert extract_empty_page_pagination({"profiles": [], "hasMore": True}) == (
+        PaginationInfo(results_count=0, has_more=True)
+    )
@@ -0,0 +1,77 @@
+import pytest
+
+from phase_timings import (
+    TIMING_SAMPLE_SIZE,
+    PhaseTimings,
+    TimingHistogram,
+    write_prometheus_textfile,
+)
+
+
+def test_quantiles_over_a_small_sample():
+    histogram = TimingHistogram()
+    for milliseconds in range(1, 101):
+        histogram.record(milliseconds / 1000)
+    assert histogram.quantile(0.5) == pytest.approx(0.050)
+    assert histogram.quantile(0.95) == pytest.approx(0.095)
+    assert histogram.to_json() == {
+        "count": 100,
+        "p50Ms": 50.0,
+        "p95Ms": 95.0,
+        "maxMs": 100.0,
+        "totalMs": 5050.0,
+    }
+    assert TimingHistogram().quantile(0.5) == 0.0
+
+
+def test_reservoir_keeps_constant_memory_and_exact_totals():
+    histogram = TimingHistogram()
+    recorded = TIMING_SAMPLE_SIZE * 10
+    for index in range(recorded):
+        histogram.record(index / recorded)
+    assert len(histogram._samples) == TIMING_SAMPLE_SIZE
+    assert histogram.count == recorded
+    assert histogram.max_seconds == (recorded - 1) / recorded
+    assert histogram.total_seconds == pytest.approx((recorded - 1) / 2)
+    # A uniform sample of 0..1 puts the median near the middle, not at
+    # the first values recorded.
+    assert 0.4 < histogram.quantile(0.5) < 0.6
+
+
+def test_merge_adds_counts_and_keeps_the_slowest():
+    first, second = PhaseTimings(), PhaseTimings()
+    first.record("getResponseBody", 0.010)
+    second.record("getResponseBody", 0.030)
+    second.record("cardWalk", 1.5)
+    first.merge(second)
+    summary = first.to_json()
+    assert list(summary) == ["cardWalk", "getResponseBody"]
+    assert summary["getResponseBody"]["count"] == 2
+    assert summary["getResponseBody"]["maxMs"] == 30.0
+
+
+def test_measure_records_failed_phases_too():
+    timings = PhaseTimings()
+    with pytest.raises(RuntimeError):
+        with timings.measure("login"):
+            raise RuntimeError("agent failed")
+    assert timings.to_json()["login"]["count"] == 1
+
+
+def test_prometheus_textfile(tmp_path):
+    timings = PhaseTimings()
+    timings.record("parse", 0.25)
+    path = tmp_path / "scraper.prom"
+    write_prometheus_textfile(path, timings, {"job": 'a"b'})
+    lines = path.read_text().splitlines()
+    assert "# TYPE scraper_phase_duration_seconds summary" in lines
+    assert (
+        'scraper_phase_duration_seconds{phase="parse",job="a\\"b",quantile="0.5"} '
+        "0.250000"
+    ) in lines
+    assert (
+        'scraper_phase_duration_seconds_count{phase="parse",job="a\\"b"} 1'
+    ) in lines
+    assert (
+        'scraper_phase_duration_seconds_max{phase="parse",job="a\\"b"} 0.250000'
+    ) in lines
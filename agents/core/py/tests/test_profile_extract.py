@@ -0,0 +1,77 @@
+from profile_extract import (
+    ProfileExtractor,
+    extract_page_results,
+    find_page_results_path,
+    find_profile_payloads_path,
+    url_pattern,
+)
+
+SEARCH_RESPONSE = {
+    "meta": {"took": 12},
+    "data": {
+        "filters": [{"label": "Location"}],
+        "pageResults": [{"id": "1", "name": "Ada"}, {"id": "2", "name": "Grace"}],
+    },
+}
+
+
+def test_page_results_are_found_under_a_preferred_key():
+    path, results = find_page_results_path(SEARCH_RESPONSE)
+    assert path == ("data", "pageResults")
+    assert [result["id"] for result in results] == ["1", "2"]
+
+
+def test_first_match_is_in_document_order():
+    payload = {"a": {"b": {"profile": {"name": "first"}}}, "c": {"name": "second"}}
+    path, profiles = find_profile_payloads_path(payload)
+    assert path == ("a", "b", "profile")
+    assert profiles == [{"name": "first"}]
+
+
+def test_deeply_nested_payload_does_not_recurse():
+    payload = {"profiles": [{"name": "deep"}]}
+    for _ in range(5000):
+        payload = {"wrapper": payload}
+    path, profiles = find_profile_payloads_path(payload)
+    assert len(path) == 5001
+    assert profiles == [{"name": "deep"}]
+
+
+def test_single_profile_response_is_not_a_results_page():
+    assert extract_page_results({"profile": {"name": "Ada", "experience": []}}) is None
+    assert extract_page_results(SEARCH_RESPONSE) is not None
+
+
+def test_url_pattern_collapses_ids():
+    assert url_pattern("https://j.example/api/profile/123?x=1") == (
+        "j.example/api/profile/*"
+    )
+    assert url_pattern("https://j.example/api/profile/a1b2c3d4") == (
+        "j.example/api/profile/*"
+    )
+    assert url_pattern("https://j.example/api/search") == "j.example/api/search"
+
+
+def test_learned_path_is_reused_until_it_stops_matching():
+    extractor = ProfileExtractor()
+    url = "https://j.example/api/profile/search"
+    assert len(extractor.extract(SEARCH_RESPONSE, url)) == 2
+    assert extractor.learned_paths == {
+        "j.example/api/profile/search": ("data", "pageResults")
+    }
+
+    assert len(extractor.extract(SEARCH_RESPONSE, url)) == 2
+    assert (extractor.fast_path_hits, extractor.fast_path_misses) == (1, 0)
+
+    # A different shape falls back to the full walk and relearns the path.
+    moved = {"results": [{"id": "3", "name": "Hedy"}]}
+    assert extractor.extract(moved, url) == [{"id": "3", "name": "Hedy"}]
+    assert extractor.fast_path_misses == 1
+    assert extractor.learned_paths["j.example/api/profile/search"] == ("results",)
+
+
+def test_without_a_url_nothing_is_learned():
+    extractor = ProfileExtractor()
+    assert len(extractor.extract(SEARCH_RESPONSE)) == 2
+    assert extractor.learned_paths == {}
+    assert extractor.extract({"status": "ok"}) == []
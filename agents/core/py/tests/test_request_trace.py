@@ -0,0 +1,96 @@
+import json
+
+import request_trace
+from request_trace import PendingRequestTable, RequestTimeline, RequestTraceRecorder
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_oldest_entries_go_first_once_full():
+    evicted = []
+    table = PendingRequestTable(max_entries=3, on_evict=evicted.append)
+    for index in range(5):
+        table[f"r{index}"] = index
+    assert list(table.items()) == [("r2", 2), ("r3", 3), ("r4", 4)]
+    assert evicted == [0, 1]
+    assert table.evicted_count == 2
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(request_trace.time, "monotonic", clock)
+    evicted = []
+    table = PendingRequestTable(ttl_seconds=10, on_evict=evicted.append)
+    table["stale"] = "stale"
+    clock.now += 5
+    table["fresh"] = "fresh"
+    # Updating an entry keeps the time it was first added.
+    table["stale"] = "stale again"
+    clock.now += 6
+    table["new"] = "new"
+    assert list(table.values()) == ["fresh", "new"]
+    assert evicted == ["stale again"]
+
+
+def test_pop_and_get():
+    table = PendingRequestTable()
+    table["a"] = 1
+    assert table.get("a") == 1
+    assert table.pop("a") == 1
+    assert table.pop("a", 0) == 0
+    assert table.get("a") is None
+    assert len(table) == 0
+
+
+def test_trace_events_nest_each_step_in_its_request(tmp_path):
+    recorder = RequestTraceRecorder()
+    started = recorder.started_at
+    recorder.record(
+        RequestTimeline(
+            url="https://j/api/profile/search",
+            target_id="T1",
+            requested_at=started + 0.001,
+            response_received_at=started + 0.002,
+            fetch_started_at=started + 0.004,
+            emitted_at=started + 0.005,
+            outcome="emitted",
+        )
+    )
+    recorder.record(RequestTimeline(url="never-started", target_id="T1"))
+    events = recorder.trace_events()
+
+    assert [(event["name"], event["ph"]) for event in events] == [
+        ("https://j/api/profile/search", "b"),
+        ("waitForResponse", "b"),
+        ("waitForResponse", "e"),
+        ("download", "b"),
+        ("download", "e"),
+        ("getResponseBody", "b"),
+        ("getResponseBody", "e"),
+        ("https://j/api/profile/search", "e"),
+    ]
+    assert events[0]["args"] == {"outcome": "emitted"}
+    assert events[0]["ts"] == 1000.0
+    assert events[-1]["ts"] == 5000.0
+
+    path = tmp_path / "trace.json"
+    recorder.write(path)
+    assert len(json.loads(path.read_text())["traceEvents"]) == len(events)
+
+
+def test_recorder_keeps_the_most_recent_requests():
+    recorder = RequestTraceRecorder(max_requests=2)
+    for index in range(3):
+        recorder.record(
+            RequestTimeline(
+                url=f"u{index}", target_id="T1", requested_at=recorder.started_at
+            )
+        )
+    names = [event["name"] for event in recorder.trace_events() if event["ph"] == "b"]
+    assert names == ["u1", "u2"]
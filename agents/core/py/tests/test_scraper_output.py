@@ -0,0 +1,146 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+import json_codec
+from scraper_output import (
+    BackgroundWriter,
+    CandidateChannel,
+    ScraperOutput,
+    open_candidate_channel,
+)
+
+
+class FlakyWriter:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.written: list[bytes] = []
+
+    def __call__(self, data: bytes) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise OSError("pipe closed")
+        self.written.append(data)
+
+
+def test_failed_write_keeps_the_batch_and_is_not_counted():
+    writer = FlakyWriter(failures=1)
+    channel = CandidateChannel(writer, {"type": "test"}, batch_size=1)
+    with pytest.raises(RuntimeError, match="Candidate channel write failed"):
+        channel.emit({"id": "a"})
+    assert channel.record_count == 0
+    assert channel.batch_count == 0
+    assert writer.written == []
+
+
+def test_timer_flush_error_is_raised_from_the_next_emit_and_close():
+    async def run() -> CandidateChannel:
+        channel = CandidateChannel(
+            FlakyWriter(failures=1), {"type": "test"}, flush_interval_ms=1
+        )
+        channel.emit({"id": "a"})
+        await asyncio.sleep(0.05)
+        with pytest.raises(RuntimeError) as raised:
+            channel.emit({"id": "b"})
+        assert isinstance(raised.value.__cause__, OSError)
+        return channel
+
+    channel = asyncio.run(run())
+    with pytest.raises(RuntimeError, match="Candidate channel write failed"):
+        channel.close()
+    assert channel.record_count == 0
+
+
+def test_candidate_bytes_count_what_was_written():
+    lines: list[bytes] = []
+    output = ScraperOutput("job", write_line=lines.append)
+    output.emit_user_payload({"id": "a"})
+    assert lines == [b'SCRAPER_USER_PAYLOAD[job]={"id":"a"}\n']
+    assert output.candidate_bytes == len(lines[0])
+
+    written = FlakyWriter(failures=0)
+    channel = CandidateChannel(written, {"type": "test"})
+    output = ScraperOutput(write_line=lines.append, candidate_channel=channel)
+    output.emit_user_payload({"id": "a"})
+    assert output.candidate_bytes == len(b"".join(written.written))
+
+
+def test_projection_savings_compare_full_payload_and_record_sizes():
+    lines: list[bytes] = []
+    output = ScraperOutput(write_line=lines.append)
+    full_payload = {"id": "a", "raw": "x" * 100}
+    record = {"id": "a"}
+    output.emit_user_payload(record, full_payload)
+    # Unprojected records pass the same object and are not counted.
+    output.emit_user_payload(full_payload, full_payload)
+
+    stats = output.candidate_stats()
+    assert stats["emittedCandidateBytes"] == sum(map(len, lines))
+    assert stats["projectedRecordBytes"] == len(b'{"id":"a"}')
+    assert stats["projectedPayloadBytes"] == len(json_codec.dumps_bytes(full_payload))
+    assert stats["projectionBytesSaved"] == (
+        stats["projectedPayloadBytes"] - stats["projectedRecordBytes"]
+    )
+
+
+def test_background_writer_holds_emitters_back_only_past_its_limit():
+    released = threading.Event()
+    written: list[bytes] = []
+
+    def blocking_write(data: bytes) -> None:
+        released.wait()
+        written.append(data)
+
+    async def run() -> None:
+        writer = BackgroundWriter(
+            blocking_write, lambda: None, name="Test writer", max_pending_bytes=8
+        )
+        # Queued without waiting on the blocked write.
+        writer.write(b"0123")
+        await asyncio.wait_for(writer.drain(), timeout=1)
+        writer.write(b"456789")
+        drain = asyncio.ensure_future(writer.drain())
+        await asyncio.sleep(0.05)
+        assert not drain.done()
+        released.set()
+        await asyncio.wait_for(drain, timeout=1)
+        writer.close()
+
+    asyncio.run(run())
+    assert b"".join(written) == b"0123456789"
+
+
+def test_background_writer_error_is_raised_from_write_and_close():
+    def failing_write(data: bytes) -> None:
+        raise OSError("pipe closed")
+
+    writer = BackgroundWriter(failing_write, lambda: None, name="Test writer")
+    writer.write(b"a")
+    writer._thread.join(timeout=1)
+    with pytest.raises(RuntimeError, match="Test writer write failed"):
+        writer.write(b"b")
+    with pytest.raises(RuntimeError, match="Test writer write failed"):
+        writer.close()
+
+
+def test_fd_channel_writes_header_and_records():
+    read_fd, write_fd = os.pipe()
+    channel = open_candidate_channel(fd=write_fd, batch_size=2)
+    output = ScraperOutput(write_line=lambda line: None, candidate_channel=channel)
+
+    async def emit_all() -> None:
+        for index in range(3):
+            await output.emit_user_payload({"id": str(index)})
+
+    asyncio.run(emit_all())
+    channel.close()
+    with os.fdopen(read_fd, "rb") as reader:
+        lines = reader.read().splitlines()
+    assert json_codec.loads(lines[0])["transport"] == {"type": "fd", "fd": write_fd}
+    assert [json_codec.loads(line) for line in lines[1:]] == [
+        {"id": "0"},
+        {"id": "1"},
+        {"id": "2"},
+    ]